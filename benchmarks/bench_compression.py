@@ -0,0 +1,114 @@
+"""
+    CPU cost against bytes saved for compressing typical GET responses
+
+    Payloads are built with the same serializer GET / uses, from task
+    documents shaped like production ones. Every available encoder is
+    measured at a few levels; brotli is included when installed.
+
+    Usage:
+        python benchmarks/bench_compression.py [--sizes 1 50 500 10000]
+"""
+import argparse
+import base64
+import gzip
+import io
+import json
+import os
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'functions'))
+
+from common.serializer import write_json_array  # noqa: E402
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+DEFAULT_SIZES = [1, 50, 500, 10_000]
+PRIORITIES = ["low", "medium", "high"]
+STATUSES = ["todo", "in-progress", "in-review", "done", "blocked"]
+WORDS = ("review update deploy fix customer report billing export import "
+         "migrate dashboard latency index query cache release").split()
+
+
+def payload(size):
+    documents = []
+    for i in range(size):
+        words = [WORDS[(i * 7 + j) % len(WORDS)] for j in range(30)]
+        documents.append({
+            "_id": str(uuid.UUID(int=i * 2654435761)),
+            "title": f"{WORDS[i % len(WORDS)].title()} task {i}",
+            "description": ' '.join(words),
+            "priority": PRIORITIES[i % len(PRIORITIES)],
+            "status": STATUSES[i % len(STATUSES)],
+            "version": 1 + i % 4,
+        })
+    buffer = io.StringIO()
+    write_json_array(documents, buffer)
+    return buffer.getvalue().encode('utf-8')
+
+
+def encoders():
+    for level in (1, 6, 9):
+        yield f'gzip-{level}', \
+            lambda raw, level=level: gzip.compress(raw, level, mtime=0)
+    if brotli is not None:
+        for quality in (1, 5, 11):
+            yield f'br-{quality}', \
+                lambda raw, quality=quality: brotli.compress(raw,
+                                                             quality=quality)
+
+
+def measure(raw, compress):
+    repeats = max(1, min(200, 2_000_000 // max(len(raw), 1)))
+    started = time.process_time()
+    for _ in range(repeats):
+        compressed = compress(raw)
+    cpu_ms = (time.process_time() - started) * 1000 / repeats
+    # API Gateway carries compressed bodies base64 encoded.
+    wire = len(base64.b64encode(compressed))
+    return cpu_ms, wire
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help='tasks per response')
+    parser.add_argument('--json', action='store_true',
+                        help='print results as JSON')
+    args = parser.parse_args()
+
+    results = []
+    for size in args.sizes:
+        raw = payload(size)
+        for name, compress in encoders():
+            cpu_ms, wire = measure(raw, compress)
+            results.append({
+                'tasks': size,
+                'encoder': name,
+                'raw_bytes': len(raw),
+                'wire_bytes': wire,
+                'saved_pct': round(100 * (1 - wire / len(raw)), 1),
+                'cpu_ms': round(cpu_ms, 3),
+                'mb_per_s': round(len(raw) / (1024 * 1024)
+                                  / max(cpu_ms / 1000, 1e-9), 1),
+            })
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    if brotli is None:
+        print("brotli not installed, measuring gzip only")
+    print(f"{'tasks':>7} {'encoder':<9}{'raw':>11}{'wire':>11}"
+          f"{'saved %':>9}{'cpu ms':>10}{'MB/s':>9}")
+    for r in results:
+        print(f"{r['tasks']:>7} {r['encoder']:<9}{r['raw_bytes']:>11}"
+              f"{r['wire_bytes']:>11}{r['saved_pct']:>9}{r['cpu_ms']:>10}"
+              f"{r['mb_per_s']:>9}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,147 @@
+"""
+    Latency of the async GET /dashboard fan-out against synchronous reads
+
+    Three ways of getting the dashboard data, newest tasks, blocked tasks
+    and counts, are timed against the same seeded mongod:
+
+    - sync_handlers: GET /stats plus two GET / calls through the
+      synchronous handlers, what a client assembling the dashboard from
+      the existing endpoints costs in handler time
+    - sync_sequential: the reads GET /dashboard makes, one after another
+      on the synchronous MongoClient
+    - async_dashboard: the GET /dashboard handler, whose reads run
+      concurrently on the AsyncMongoClient
+
+    Stored stats are left warm, so every scenario does the same three
+    point and index reads. The gap between the last two is the time
+    saved by concurrency and grows with the round trip time to the
+    server, so point MONGO_BENCH_URI at a remote deployment to see what a
+    Lambda in another availability zone would.
+
+    Usage:
+        MONGO_BENCH_URI=mongodb://... python benchmarks/bench_dashboard.py
+            [--size 10000] [--calls 300] [--limit 10] [--json]
+
+    mongomock has no async client, so a mongod is required.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from importlib import import_module
+
+import harness
+from pymongo import AsyncMongoClient
+from common import async_db
+from common.changes import get_marker
+from common.db import client_options
+from common.indexes import ensure_indexes
+
+SCENARIOS = ('sync_handlers', 'sync_sequential', 'async_dashboard')
+
+
+def sync_handlers(limit):
+    stats = harness.handler('GET /stats')
+    get = harness.handler('GET /')
+    responses = [
+        stats(harness.http_event('GET /stats'), None),
+        get(harness.http_event('GET /', query={'limit': str(limit)}), None),
+        get(harness.http_event('GET /', query={'limit': str(limit),
+                                               'status': 'blocked'}), None),
+    ]
+    return all(r['statusCode'] == 200 for r in responses)
+
+
+def sync_sequential(db, projection, limit):
+    get_marker(db)
+    for query in ({}, {"status": "blocked"}):
+        list(db.tasks.find(query, projection, sort=[("created_at", -1)],
+                           limit=limit, batch_size=limit))
+    return True
+
+
+def async_dashboard(limit):
+    dashboard = harness.handler('GET /dashboard')
+    response = dashboard(harness.http_event(
+        'GET /dashboard', query={'limit': str(limit)}), None)
+    return response['statusCode'] == 200
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--size', type=int, default=10_000,
+                        help='tasks seeded before the run')
+    parser.add_argument('--calls', type=int, default=300,
+                        help='timed calls per scenario')
+    parser.add_argument('--warmup', type=int, default=20)
+    parser.add_argument('--limit', type=int, default=10,
+                        help='tasks per dashboard list')
+    parser.add_argument('--json', action='store_true',
+                        help='print results as JSON')
+    args = parser.parse_args()
+
+    uri = os.environ.get('MONGO_BENCH_URI')
+    if not uri:
+        sys.exit("set MONGO_BENCH_URI to a mongod: mongomock has no async "
+                 "client")
+    client, _, backend = harness.connect(uri)
+    harness.use_client(client)
+    async_db._client = AsyncMongoClient(uri, **client_options())
+    db = client[harness.DATABASE_NAME]
+    ensure_indexes(db)
+    harness.seed(client, args.size)
+    projection = import_module('dashboard-task.handler').SUMMARY_PROJECTION
+    cache = import_module('get-task.handler').response_cache
+    # Store the stats once so no scenario pays for the aggregation.
+    harness.handler('GET /stats')(harness.http_event('GET /stats'), None)
+
+    calls = {
+        'sync_handlers': lambda: sync_handlers(args.limit),
+        'sync_sequential': lambda: sync_sequential(db, projection,
+                                                   args.limit),
+        'async_dashboard': lambda: async_dashboard(args.limit),
+    }
+    results = []
+    for name in SCENARIOS:
+        call = calls[name]
+        for _ in range(args.warmup):
+            call()
+        latencies = []
+        errors = 0
+        for _ in range(args.calls):
+            # GET / would otherwise answer from its response cache.
+            cache.clear()
+            started = time.perf_counter()
+            if not call():
+                errors += 1
+            latencies.append(time.perf_counter() - started)
+        latencies.sort()
+        results.append({
+            'scenario': name,
+            'calls': args.calls,
+            'errors': errors,
+            'p50_ms': round(harness.percentile(latencies, 0.50) * 1000, 3),
+            'p95_ms': round(harness.percentile(latencies, 0.95) * 1000, 3),
+            'p99_ms': round(harness.percentile(latencies, 0.99) * 1000, 3),
+            'mean_ms': round(statistics.fmean(latencies) * 1000, 3),
+        })
+    async_db.reset_async_client()
+
+    if args.json:
+        print(json.dumps({'backend': backend, 'size': args.size,
+                          'results': results}, indent=2))
+    else:
+        print(f"backend: {backend}, size: {args.size}")
+        print(f"{'scenario':<18}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+              f"{'mean ms':>10}{'errors':>8}")
+        for r in results:
+            print(f"{r['scenario']:<18}{r['p50_ms']:>9}{r['p95_ms']:>9}"
+                  f"{r['p99_ms']:>9}{r['mean_ms']:>10}{r['errors']:>8}")
+    if any(r['errors'] for r in results):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+"""
+    Compares the legacy GET / serialization path against streaming
+
+    legacy: dumps(list(cursor)), the original get-task implementation
+    stream: write_json_array(cursor, buffer), the current implementation
+
+    Each measurement runs in a fresh interpreter so peak RSS is not shared
+    between runs. Documents come from a generator that stands in for a
+    pymongo cursor, so no database is needed.
+
+    Usage:
+        python benchmarks/bench_get_serialization.py [--sizes 10000 100000]
+"""
+import argparse
+import io
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'functions'))
+
+DEFAULT_SIZES = [10_000, 100_000, 500_000]
+PRIORITIES = ["low", "medium", "high"]
+STATUSES = ["todo", "in-progress", "in-review", "done", "blocked"]
+
+
+def fake_cursor(size):
+    for i in range(size):
+        yield {
+            "_id": str(uuid.UUID(int=i)),
+            "title": f"Task number {i}",
+            "description": "Lorem ipsum dolor sit amet, " * 6,
+            "priority": PRIORITIES[i % len(PRIORITIES)],
+            "status": STATUSES[i % len(STATUSES)],
+        }
+
+
+def run_legacy(size):
+    from bson.json_util import dumps
+    return dumps(list(fake_cursor(size)))
+
+
+def run_stream(size):
+    from common.serializer import write_json_array
+    buffer = io.StringIO()
+    write_json_array(fake_cursor(size), buffer)
+    return buffer.getvalue()
+
+
+MODES = {'legacy': run_legacy, 'stream': run_stream}
+
+
+def measure(mode, size):
+    # Import outside the timed region so both modes pay the same start-up.
+    import bson.json_util  # noqa: F401
+    import common.serializer  # noqa: F401
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    started = time.perf_counter()
+    body = MODES[mode](size)
+    elapsed = time.perf_counter() - started
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {
+        'mode': mode,
+        'size': size,
+        'seconds': round(elapsed, 4),
+        'peak_rss_mb': round((rss_after - rss_before) / 1024, 1),
+        'body_mb': round(len(body) / (1024 * 1024), 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--json', action='store_true',
+                        help='print results as JSON')
+    parser.add_argument('--run', nargs=2, metavar=('MODE', 'SIZE'),
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        print(json.dumps(measure(args.run[0], int(args.run[1]))))
+        return
+
+    results = []
+    for size in args.sizes:
+        for mode in MODES:
+            output = subprocess.run(
+                [sys.executable, __file__, '--run', mode, str(size)],
+                check=True, capture_output=True, text=True).stdout
+            results.append(json.loads(output))
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'mode':<8}{'tasks':>10}{'seconds':>10}"
+          f"{'peak RSS MB':>14}{'body MB':>10}")
+    for r in results:
+        print(f"{r['mode']:<8}{r['size']:>10}{r['seconds']:>10}"
+              f"{r['peak_rss_mb']:>14}{r['body_mb']:>10}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,298 @@
+"""
+    Benchmarks the real handlers against a local database
+
+    Each scenario calls a handler through its route key, the same function
+    API Gateway invokes, against mongomock (in memory) or a local mongod
+    when MONGO_BENCH_URI is set. For every dataset size it reports latency
+    percentiles, peak memory allocated per call (tracemalloc) and database
+    round trips per call.
+
+    Results are written as JSON, by default to
+    benchmarks/results/handlers-<commit>.json, so two commits can be
+    compared with --compare.
+
+    Usage:
+        python benchmarks/bench_handlers.py [--sizes 1000 10000]
+            [--calls 200] [--scenarios get_page post ...]
+            [--output PATH] [--compare BASELINE.json] [--json]
+
+    mongomock latencies measure handler and driver-facing Python work
+    only; use a local mongod for numbers that include the server.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from importlib import import_module
+
+import harness
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), 'results')
+DEFAULT_SIZES = [1000, 10_000]
+FULL_TASK = {
+    "title": "Benchmark task",
+    "description": "Created by bench_handlers.py",
+    "priority": "medium",
+    "status": "todo",
+}
+
+"""
+    Scenarios: name to (route key, event factory, expected status codes,
+    clear the GET / response cache before each call)
+
+    Event factories take the run state, holding the seeded ids and the ids
+    created by POST; DELETE removes those so the dataset size holds.
+"""
+
+
+def _get_page(state):
+    return harness.http_event('GET /', query={'limit': '50'})
+
+
+def _get_filtered(state):
+    return harness.http_event('GET /', query={'limit': '50',
+                                              'status': 'todo,done'})
+
+
+def _get_one(state):
+    return harness.http_event('GET /task/{task_id}',
+                              {'task_id': random.choice(state['ids'])})
+
+
+def _stats(state):
+    return harness.http_event('GET /stats')
+
+
+def _post(state):
+    return harness.http_event('POST /create', body=json.dumps(FULL_TASK))
+
+
+def _post_replay(state):
+    # Every call after the first is a retry answered from the stored key.
+    return harness.http_event('POST /create', body=json.dumps(FULL_TASK),
+                              headers={'idempotency-key': 'bench-replay'})
+
+
+def _put(state):
+    return harness.http_event('PUT /edit/{task_id}',
+                              {'task_id': random.choice(state['ids'])},
+                              body=json.dumps(FULL_TASK))
+
+
+def _patch(state):
+    return harness.http_event('PATCH /edit/{task_id}',
+                              {'task_id': random.choice(state['ids'])},
+                              body=json.dumps({"status": "in-progress"}))
+
+
+def _delete(state):
+    task_id = (state['created'] or state['ids']).pop()
+    return harness.http_event('DELETE /delete/{task_id}',
+                              {'task_id': task_id})
+
+
+SCENARIOS = {
+    'get_page': ('GET /', _get_page, (200,), True),
+    'get_page_cached': ('GET /', _get_page, (200,), False),
+    'get_filtered': ('GET /', _get_filtered, (200,), True),
+    'get_one': ('GET /task/{task_id}', _get_one, (200,), False),
+    'stats': ('GET /stats', _stats, (200,), False),
+    'post': ('POST /create', _post, (201,), False),
+    'post_replay': ('POST /create', _post_replay, (201,), False),
+    'put': ('PUT /edit/{task_id}', _put, (200,), False),
+    'patch': ('PATCH /edit/{task_id}', _patch, (200,), False),
+    'delete': ('DELETE /delete/{task_id}', _delete, (200,), False),
+}
+
+
+"""
+    Runs one scenario: warmup calls, timed calls, then traced calls
+
+    Args:
+        name (str): Scenario name
+        state (dict): Seeded and created ids
+        counter (harness.RoundTripCounter): Round trips of the backend
+        calls (int): Timed calls
+        alloc_calls (int): Calls measured under tracemalloc
+
+    Returns:
+        dict - one result row
+"""
+
+
+def run_scenario(name, state, counter, calls, alloc_calls, warmup):
+    route_key, make_event, expected, clear_cache = SCENARIOS[name]
+    function = harness.handler(route_key)
+    cache = import_module('get-task.handler').response_cache
+    errors = 0
+
+    def call():
+        nonlocal errors
+        event = make_event(state)
+        if clear_cache:
+            cache.clear()
+        started = time.perf_counter()
+        response = function(event, None)
+        elapsed = time.perf_counter() - started
+        if response['statusCode'] not in expected:
+            errors += 1
+        elif name == 'post':
+            state['created'].append(json.loads(response['body'])['task_id'])
+        return elapsed
+
+    for _ in range(warmup):
+        call()
+    errors = 0
+    counter.reset()
+    latencies = sorted(call() for _ in range(calls))
+    round_trips = counter.total / calls
+
+    allocated = []
+    tracemalloc.start()
+    for _ in range(alloc_calls):
+        event = make_event(state)
+        if clear_cache:
+            cache.clear()
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        response = function(event, None)
+        _, peak = tracemalloc.get_traced_memory()
+        allocated.append(peak - before)
+        if name == 'post' and response['statusCode'] == 201:
+            state['created'].append(json.loads(response['body'])['task_id'])
+    tracemalloc.stop()
+
+    return {
+        'scenario': name,
+        'calls': calls,
+        'errors': errors,
+        'p50_ms': round(harness.percentile(latencies, 0.50) * 1000, 3),
+        'p95_ms': round(harness.percentile(latencies, 0.95) * 1000, 3),
+        'p99_ms': round(harness.percentile(latencies, 0.99) * 1000, 3),
+        'mean_ms': round(statistics.fmean(latencies) * 1000, 3),
+        'round_trips': round(round_trips, 2),
+        'peak_alloc_kib': (round(statistics.fmean(allocated) / 1024, 1)
+                           if allocated else None),
+    }
+
+
+def git_commit():
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+            text=True, check=True, cwd=os.path.dirname(__file__)
+        ).stdout.strip()
+        dirty = subprocess.run(
+            ['git', 'status', '--porcelain', '--untracked-files=no'],
+            capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(__file__)).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+    return commit + ('-dirty' if dirty else '')
+
+
+"""
+    Prints the change of every shared result row against a baseline
+
+    Args:
+        results (list): Result rows of this run
+        baseline_path (str): JSON file written by an earlier run
+"""
+
+
+def compare(results, baseline_path):
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    previous = {(r['size'], r['scenario']): r for r in baseline['results']}
+    print(f"\nvs {baseline['meta']['commit']} ({baseline_path})")
+    print(f"{'size':>7} {'scenario':<16}{'p50':>9}{'p95':>9}"
+          f"{'round trips':>13}")
+    for r in results:
+        old = previous.get((r['size'], r['scenario']))
+        if old is None:
+            continue
+        p50 = (r['p50_ms'] - old['p50_ms']) / old['p50_ms'] * 100
+        p95 = (r['p95_ms'] - old['p95_ms']) / old['p95_ms'] * 100
+        trips = r['round_trips'] - old['round_trips']
+        print(f"{r['size']:>7} {r['scenario']:<16}{p50:>+8.1f}%{p95:>+8.1f}%"
+              f"{trips:>+13.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help='tasks seeded before each round')
+    parser.add_argument('--scenarios', nargs='+', choices=list(SCENARIOS),
+                        default=list(SCENARIOS))
+    parser.add_argument('--calls', type=int, default=200,
+                        help='timed calls per scenario')
+    parser.add_argument('--warmup', type=int, default=10)
+    parser.add_argument('--alloc-calls', type=int, default=20,
+                        help='calls measured under tracemalloc')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='results file, default '
+                        'benchmarks/results/handlers-<commit>.json')
+    parser.add_argument('--compare', metavar='BASELINE',
+                        help='results file of an earlier run')
+    parser.add_argument('--json', action='store_true',
+                        help='print results as JSON')
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    client, counter, backend = harness.connect()
+    harness.use_client(client)
+    if backend == 'mongod':
+        from common.indexes import ensure_indexes
+        ensure_indexes(client[harness.DATABASE_NAME])
+
+    results = []
+    for size in args.sizes:
+        state = {'ids': harness.seed(client, size), 'created': []}
+        for name in args.scenarios:
+            row = run_scenario(name, state, counter, args.calls,
+                               args.alloc_calls, args.warmup)
+            results.append(dict(row, size=size))
+
+    commit = git_commit()
+    report = {
+        'meta': {
+            'commit': commit,
+            'backend': backend,
+            'timestamp': datetime.datetime.now(
+                datetime.timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'pymongo': import_module('pymongo').version,
+        },
+        'results': results,
+    }
+    output = args.output or os.path.join(RESULTS_DIR,
+                                         f'handlers-{commit}.json')
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"backend: {backend}, commit: {commit}, results: {output}")
+        print(f"{'size':>7} {'scenario':<16}{'p50 ms':>9}{'p95 ms':>9}"
+              f"{'p99 ms':>9}{'trips':>7}{'alloc KiB':>11}{'errors':>8}")
+        for r in results:
+            print(f"{r['size']:>7} {r['scenario']:<16}{r['p50_ms']:>9}"
+                  f"{r['p95_ms']:>9}{r['p99_ms']:>9}{r['round_trips']:>7}"
+                  f"{r['peak_alloc_kib']:>11}{r['errors']:>8}")
+    if args.compare:
+        compare(results, args.compare)
+    if any(r['errors'] for r in results):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
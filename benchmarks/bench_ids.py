@@ -0,0 +1,138 @@
+"""
+    Insert throughput and index size of uuid4 against UUIDv7 task ids
+
+    Each scheme gets its own scratch collection carrying the task indexes
+    that contain _id (the _id index plus the status and priority compound
+    indexes). Tasks built like POST /create builds them are inserted one
+    per insert_one, as the handler does, or with insert_many when
+    --batch is above 1. The report lists inserts per second, latency
+    percentiles of the slowest tenth of the run, when random keys have
+    the largest B-tree to touch, and on mongod the size of every index
+    after a checkpoint.
+
+    Usage:
+        python benchmarks/bench_ids.py [--count 200000] [--batch 1]
+            [--json]
+
+    Index sizes need a local mongod (MONGO_BENCH_URI); mongomock keeps no
+    B-tree, so it only shows the cost of generating the ids.
+"""
+import argparse
+import json
+import time
+import uuid
+
+import harness
+from common.ids import new_task_id, utc_timestamp
+from common.indexes import INDEX_SPECS, ensure_indexes
+
+SCHEMES = {
+    'uuid4': lambda: str(uuid.uuid4()),
+    'uuid7': new_task_id,
+}
+# Only indexes holding _id values grow differently between the schemes.
+ID_INDEXES = [spec for spec in INDEX_SPECS['tasks']
+              if ("_id", 1) in spec['keys']]
+
+
+def document(new_id, i):
+    now = utc_timestamp()
+    return {
+        "_id": new_id(),
+        "title": f"Task number {i}",
+        "description": f"Description of task {i}. " * 8,
+        "priority": harness.PRIORITIES[i % len(harness.PRIORITIES)],
+        "status": harness.STATUSES[i % len(harness.STATUSES)],
+        "version": 1,
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+"""
+    Index sizes in bytes of a collection, None when the backend has none
+
+    Args:
+        db (pymongo.database.Database): Benchmark database
+        name (str): Collection name
+        backend (str): Backend name returned by harness.connect
+
+    Returns:
+        dict|None
+"""
+
+
+def index_sizes(db, name, backend):
+    if backend != 'mongod':
+        return None
+    # A checkpoint writes the B-trees out so their on-disk size is final.
+    db.client.admin.command('fsync')
+    stats = next(db[name].aggregate([{"$collStats": {"storageStats": {}}}]))
+    return stats['storageStats']['indexSizes']
+
+
+def run_scheme(db, backend, scheme, count, batch):
+    name = f'bench_ids_{scheme}'
+    db[name].drop()
+    ensure_indexes(db, {name: ID_INDEXES})
+    collection = db[name]
+    new_id = SCHEMES[scheme]
+    latencies = []
+    started = time.perf_counter()
+    for start in range(0, count, batch):
+        documents = [document(new_id, i)
+                     for i in range(start, min(count, start + batch))]
+        call_started = time.perf_counter()
+        if batch == 1:
+            collection.insert_one(documents[0])
+        else:
+            collection.insert_many(documents, ordered=False)
+        latencies.append(time.perf_counter() - call_started)
+    elapsed = time.perf_counter() - started
+    tail = sorted(latencies[-max(1, len(latencies) // 10):])
+    sizes = index_sizes(db, name, backend)
+    db[name].drop()
+    return {
+        'scheme': scheme,
+        'count': count,
+        'batch': batch,
+        'inserts_per_s': round(count / elapsed),
+        'tail_p50_ms': round(harness.percentile(tail, 0.50) * 1000, 3),
+        'tail_p99_ms': round(harness.percentile(tail, 0.99) * 1000, 3),
+        'index_kib': ({index: round(size / 1024)
+                       for index, size in sizes.items()}
+                      if sizes is not None else None),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--count', type=int, default=200_000,
+                        help='tasks inserted per scheme')
+    parser.add_argument('--batch', type=int, default=1,
+                        help='documents per insert call, 1 for insert_one')
+    parser.add_argument('--json', action='store_true',
+                        help='print results as JSON')
+    args = parser.parse_args()
+
+    client, _, backend = harness.connect()
+    db = client[harness.DATABASE_NAME]
+    results = [run_scheme(db, backend, scheme, args.count, args.batch)
+               for scheme in SCHEMES]
+
+    if args.json:
+        print(json.dumps({'backend': backend, 'results': results}, indent=2))
+        return
+    print(f"backend: {backend}")
+    print(f"{'scheme':<8}{'inserts/s':>11}{'tail p50 ms':>13}"
+          f"{'tail p99 ms':>13}  index KiB")
+    for r in results:
+        sizes = r['index_kib']
+        sizes = ', '.join(f'{index}={size}' for index, size in sizes.items()) \
+            if sizes is not None else 'n/a'
+        print(f"{r['scheme']:<8}{r['inserts_per_s']:>11}"
+              f"{r['tail_p50_ms']:>13}{r['tail_p99_ms']:>13}  {sizes}")
+
+
+if __name__ == '__main__':
+    main()
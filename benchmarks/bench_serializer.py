@@ -0,0 +1,84 @@
+"""
+    Micro-benchmark of task encoding: bson.json_util.dumps vs encode
+
+    Lists of task documents shaped like production ones are encoded with
+    the previous encoder (bson.json_util.dumps) and with
+    common.serializer.encode; both produce identical text.
+
+    Usage:
+        python benchmarks/bench_serializer.py [--sizes 1 10 100 1000 10000]
+"""
+import argparse
+import json
+import os
+import sys
+import timeit
+import uuid
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'functions'))
+
+from bson.json_util import dumps  # noqa: E402
+from common.serializer import encode  # noqa: E402
+
+DEFAULT_SIZES = [1, 10, 100, 1000, 10_000]
+PRIORITIES = ["low", "medium", "high"]
+STATUSES = ["todo", "in-progress", "in-review", "done", "blocked"]
+
+
+def tasks(size):
+    return [{
+        "_id": str(uuid.uuid4()),
+        "title": f"Task number {i}",
+        "description": f"Description of task {i}. " * 8,
+        "priority": PRIORITIES[i % len(PRIORITIES)],
+        "status": STATUSES[i % len(STATUSES)],
+        "version": 1 + i % 5,
+    } for i in range(size)]
+
+
+ENCODERS = {'json_util.dumps': dumps, 'encode': encode}
+
+
+def measure(function, documents):
+    # Aim for roughly 0.2s of work per measurement, best of 5.
+    number = max(1, 20_000 // len(documents))
+    best = min(timeit.repeat(lambda: function(documents), number=number,
+                             repeat=5))
+    return best / number
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help='tasks per encoded list')
+    parser.add_argument('--json', action='store_true',
+                        help='print results as JSON')
+    args = parser.parse_args()
+
+    results = []
+    for size in args.sizes:
+        documents = tasks(size)
+        assert encode(documents) == dumps(documents)
+        timings = {name: measure(function, documents)
+                   for name, function in ENCODERS.items()}
+        for name, seconds in timings.items():
+            results.append({
+                'tasks': size,
+                'encoder': name,
+                'ms': round(seconds * 1000, 4),
+                'us_per_task': round(seconds * 1e6 / size, 3),
+                'speedup': round(timings['json_util.dumps'] / seconds, 2),
+            })
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'tasks':>7} {'encoder':<17}{'ms':>11}{'us/task':>10}"
+          f"{'speedup':>9}")
+    for r in results:
+        print(f"{r['tasks']:>7} {r['encoder']:<17}{r['ms']:>11}"
+              f"{r['us_per_task']:>10}{r['speedup']:>9}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,256 @@
+"""
+    Shared pieces for benchmarks that run the real handlers
+
+    - a database backend: a local mongod when MONGO_BENCH_URI is set,
+      otherwise mongomock, an in-memory stand-in (pip install mongomock)
+    - round trip counting for either backend
+    - HTTP API (payload format 2.0) events for every route
+    - seed data shaped like production tasks
+
+    Handlers are looked up through the router's route table, so they run
+    exactly as deployed and share the client installed by use_client.
+    Their EMF metrics are off unless METRICS_ENABLED is set, as they
+    would interleave with the benchmark output on stdout.
+"""
+import os
+import sys
+import time
+import uuid
+from importlib import import_module
+from urllib.parse import urlencode
+
+FUNCTIONS_DIR = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..', 'functions'))
+sys.path.insert(0, FUNCTIONS_DIR)
+os.environ.setdefault('METRICS_ENABLED', 'false')
+
+from pymongo import MongoClient, monitoring  # noqa: E402
+from common import db as common_db  # noqa: E402
+from common.monitoring import COLLECTION_OPERATIONS  # noqa: E402
+
+DATABASE_NAME = 'tasks_dashboard'
+PRIORITIES = ["low", "medium", "high"]
+STATUSES = ["todo", "in-progress", "in-review", "done", "blocked"]
+SEED_CHUNK_SIZE = 1000
+
+
+
+"""
+    Counts commands sent to the server, by name
+"""
+
+
+class RoundTripCounter(monitoring.CommandListener):
+
+    def __init__(self):
+        self.commands = {}
+
+    @property
+    def total(self):
+        return sum(self.commands.values())
+
+    def reset(self):
+        self.commands = {}
+
+    def record(self, name):
+        self.commands[name] = self.commands.get(name, 0) + 1
+
+    def started(self, event):
+        if event.command_name not in ('hello', 'isMaster', 'ismaster',
+                                      'endSessions'):
+            self.record(event.command_name)
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+"""
+    Proxies a mongomock client, counting collection operations
+
+    mongomock never talks to a server, so command monitoring sees nothing;
+    each call in COLLECTION_OPERATIONS is recorded as one round trip
+    instead. Cursors returned by find are counted once, which holds while
+    a page fits in one batch.
+"""
+
+
+class CountingClient:
+
+    def __init__(self, client, counter):
+        self._client = client
+        self._counter = counter
+
+    def __getattr__(self, name):
+        return CountingDatabase(getattr(self._client, name), self._counter)
+
+    def __getitem__(self, name):
+        return CountingDatabase(self._client[name], self._counter)
+
+    def close(self):
+        self._client.close()
+
+
+class CountingDatabase:
+
+    def __init__(self, database, counter):
+        self._database = database
+        self._counter = counter
+
+    def __getattr__(self, name):
+        return CountingCollection(getattr(self._database, name),
+                                  self._counter)
+
+    def __getitem__(self, name):
+        return CountingCollection(self._database[name], self._counter)
+
+
+class CountingCollection:
+
+    def __init__(self, collection, counter):
+        self._collection = collection
+        self._counter = counter
+
+    def __getattr__(self, name):
+        attribute = getattr(self._collection, name)
+        if name not in COLLECTION_OPERATIONS:
+            return attribute
+
+        def counted(*args, **kwargs):
+            self._counter.record(name)
+            return attribute(*args, **kwargs)
+        return counted
+
+
+"""
+    Opens the benchmark database backend
+
+    Args:
+        uri (str|None): mongod connection string, defaults to the
+            MONGO_BENCH_URI environment variable
+
+    Returns:
+        tuple - (client, counter, backend name)
+"""
+
+
+def connect(uri=None):
+    uri = uri or os.environ.get('MONGO_BENCH_URI')
+    counter = RoundTripCounter()
+    if uri:
+        client = MongoClient(uri, event_listeners=[counter],
+                             **common_db.client_options())
+        client.admin.command('ping')
+        counter.reset()
+        return client, counter, 'mongod'
+    try:
+        import mongomock
+    except ImportError:
+        sys.exit("mongomock is not installed: pip install mongomock, or set "
+                 "MONGO_BENCH_URI to a local mongod")
+    return (CountingClient(mongomock.MongoClient(), counter), counter,
+            'mongomock')
+
+
+"""
+    Makes every handler use the given client, as if get_client created it
+"""
+
+
+def use_client(client):
+    common_db._client = client
+
+
+def handler(route_key):
+    module_name, function_name = \
+        import_module('router.handler').ROUTES[route_key]
+    return getattr(import_module(module_name), function_name)
+
+
+def task(i):
+    return {
+        "_id": str(uuid.uuid4()),
+        "title": f"Task number {i}",
+        "description": f"Description of task {i}. " * 8,
+        "priority": PRIORITIES[i % len(PRIORITIES)],
+        "status": STATUSES[i % len(STATUSES)],
+        "version": 1,
+    }
+
+
+"""
+    Replaces the benchmark database with size generated tasks
+
+    Args:
+        client: client returned by connect
+        size (int): Number of tasks to insert
+
+    Returns:
+        list - _id of every seeded task
+"""
+
+
+def seed(client, size):
+    db = client[DATABASE_NAME]
+    db.tasks.delete_many({})
+    db.meta.delete_many({})
+    ids = []
+    for start in range(0, size, SEED_CHUNK_SIZE):
+        documents = [task(i) for i in range(start,
+                                            min(size, start + SEED_CHUNK_SIZE))]
+        db.tasks.insert_many(documents)
+        ids.extend(document['_id'] for document in documents)
+    return ids
+
+
+"""
+    Builds an HTTP API payload format 2.0 event
+
+    Args:
+        route_key (str): Route key, e.g. "PUT /edit/{task_id}"
+        path_parameters (dict|None): Values for the route's placeholders
+        query (dict|None): Query string parameters
+        body (str|None): Raw request body
+        headers (dict|None): Request headers, lower case as API Gateway
+            sends them
+
+    Returns:
+        dict
+"""
+
+
+def http_event(route_key, path_parameters=None, query=None, body=None,
+               headers=None):
+    method, path = route_key.split(' ', 1)
+    for name, value in (path_parameters or {}).items():
+        path = path.replace('{' + name + '}', value)
+    event = {
+        'version': '2.0',
+        'routeKey': route_key,
+        'rawPath': path,
+        'rawQueryString': urlencode(query or {}),
+        'headers': dict(headers or {}),
+        'requestContext': {
+            'http': {'method': method, 'path': path},
+            'requestId': str(uuid.uuid4()),
+            'timeEpoch': int(time.time() * 1000),
+        },
+        'isBase64Encoded': False,
+    }
+    if query:
+        event['queryStringParameters'] = dict(query)
+    if path_parameters:
+        event['pathParameters'] = dict(path_parameters)
+    if body is not None:
+        event['body'] = body
+    return event
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1,
+                int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
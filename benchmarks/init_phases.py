@@ -0,0 +1,118 @@
+"""
+    Measures init-phase time of every handler in a fresh interpreter
+
+    Phases:
+    - import_pymongo: importing the driver (shared by every handler)
+    - import_handler: importing the handler module on top of the driver
+    - client_setup: first common.db.get_client() call
+    - first_command: first round trip (ping), only with --ping
+
+    Usage:
+        python benchmarks/init_phases.py [--runs 5] [--ping] [--json]
+
+    --ping needs MONGO_HOST to point at a reachable server.
+"""
+import argparse
+import glob
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+FUNCTIONS_DIR = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..', 'functions'))
+
+CHILD = r'''
+import json
+import sys
+import time
+
+functions_dir, handler_dir, ping = sys.argv[1], sys.argv[2], sys.argv[3]
+sys.path[:0] = [handler_dir, functions_dir]
+modules_before = len(sys.modules)
+
+started = time.perf_counter()
+import pymongo  # noqa: E402,F401
+pymongo_done = time.perf_counter()
+import handler  # noqa: E402,F401
+handler_done = time.perf_counter()
+from common.db import get_client  # noqa: E402
+client = get_client()
+client_done = time.perf_counter()
+first_command = None
+if ping == '1':
+    client.admin.command('ping')
+    first_command = (time.perf_counter() - client_done) * 1000
+
+print(json.dumps({
+    'import_pymongo': (pymongo_done - started) * 1000,
+    'import_handler': (handler_done - pymongo_done) * 1000,
+    'client_setup': (client_done - handler_done) * 1000,
+    'first_command': first_command,
+    'modules_loaded': len(sys.modules) - modules_before,
+}))
+'''
+
+PHASES = ('import_pymongo', 'import_handler', 'client_setup', 'first_command')
+
+
+def handler_dirs():
+    return sorted(os.path.dirname(path) for path in
+                  glob.glob(os.path.join(FUNCTIONS_DIR, '*', 'handler.py')))
+
+
+"""
+    Runs one handler's init phases in a fresh interpreter
+
+    Args:
+        handler_dir (str): Directory holding handler.py
+        ping (bool): Also time the first database round trip
+
+    Returns:
+        dict - milliseconds per phase plus modules_loaded
+"""
+
+
+def measure(handler_dir, ping=False):
+    output = subprocess.run(
+        [sys.executable, '-c', CHILD, FUNCTIONS_DIR, handler_dir,
+         '1' if ping else '0'],
+        check=True, capture_output=True, text=True).stdout
+    return json.loads(output)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--runs', type=int, default=5,
+                        help='interpreters per handler, median is reported')
+    parser.add_argument('--ping', action='store_true',
+                        help='time the first round trip to MONGO_HOST')
+    parser.add_argument('--json', action='store_true',
+                        help='print results as JSON')
+    args = parser.parse_args()
+
+    results = {}
+    for handler_dir in handler_dirs():
+        runs = [measure(handler_dir, args.ping) for _ in range(args.runs)]
+        result = {}
+        for phase in PHASES:
+            values = [run[phase] for run in runs if run[phase] is not None]
+            result[phase] = round(statistics.median(values), 2) \
+                if values else None
+        result['modules_loaded'] = runs[0]['modules_loaded']
+        results[os.path.basename(handler_dir)] = result
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'handler':<20}" + ''.join(f"{phase:>16}" for phase in PHASES)
+          + f"{'modules':>10}")
+    for name, result in results.items():
+        cells = ''.join(f"{'-' if result[phase] is None else result[phase]:>16}"
+                        for phase in PHASES)
+        print(f"{name:<20}{cells}{result['modules_loaded']:>10}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,325 @@
+"""
+    Load-test driver replaying HTTP API v2 events against the handlers
+
+    Events for the task routes are generated in a configurable mix and
+    sent to the handler functions through a thread or process pool, either
+    as fast as the workers allow (closed loop) or at a fixed request rate
+    (open loop). The database is mongomock, or a local mongod when
+    MONGO_BENCH_URI is set.
+
+    Reports throughput, p50/p95/p99 latency and error rate per operation,
+    plus peak connections: sampled from mongod's serverStatus, or with
+    mongomock the peak number of requests in flight, which is how many
+    connections a real pool would have needed.
+
+    Latency runs from when a request was due to when its response came
+    back, so time spent queued behind busy workers is included and an
+    overloaded open loop shows up as growing latency.
+
+    Usage:
+        python benchmarks/loadtest.py [--mix get=70,post=10,put=15,delete=5]
+            [--concurrency 8] [--pool thread|process] [--rate 200]
+            [--duration 10] [--size 10000] [--json]
+
+    With --pool process and mongomock every worker seeds its own copy of
+    the dataset, since mongomock data lives in one process.
+"""
+import argparse
+import json
+import random
+import statistics
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import harness
+from bench_handlers import SCENARIOS
+
+DEFAULT_MIX = 'get=70,post=10,put=15,delete=5'
+OPERATIONS = {
+    'get': 'get_page_cached',
+    'get_filtered': 'get_filtered',
+    'get_one': 'get_one',
+    'post': 'post',
+    'put': 'put',
+    'patch': 'patch',
+    'delete': 'delete',
+}
+SAMPLE_INTERVAL = 0.05
+
+# Per-process worker state, set up by init_worker.
+worker = {}
+
+
+"""
+    Parses a mix such as "get=70,post=10" into operation weights
+
+    Raises:
+        argparse.ArgumentTypeError: on an unknown operation or bad weight
+"""
+
+
+def parse_mix(value):
+    mix = {}
+    for item in value.split(','):
+        name, _, weight = item.partition('=')
+        if name not in OPERATIONS:
+            raise argparse.ArgumentTypeError(
+                f"unknown operation {name!r}, expected one of "
+                f"{', '.join(OPERATIONS)}")
+        try:
+            mix[name] = float(weight)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"bad weight for {name}")
+    if not any(weight > 0 for weight in mix.values()):
+        raise argparse.ArgumentTypeError("mix needs a positive weight")
+    return mix
+
+
+"""
+    Prepares a worker: connects, installs the client and loads task ids
+
+    Args:
+        ids (list|None): Seeded task ids, or None to seed size tasks here
+        size (int): Tasks to seed when ids is None
+        client: Client to share, threads reuse the driver's; processes
+            connect on their own
+"""
+
+
+def init_worker(ids, size, client=None):
+    if client is None:
+        client, _, _ = harness.connect()
+    harness.use_client(client)
+    if ids is None:
+        ids = harness.seed(client, size)
+    worker['state'] = {'ids': list(ids), 'created': []}
+    worker['lock'] = threading.Lock()
+
+
+"""
+    Sends one request to its handler inside a worker
+
+    Args:
+        name (str): Operation name from OPERATIONS
+
+    Returns:
+        tuple - (status code or None, error message or None)
+"""
+
+
+def execute(name):
+    scenario = OPERATIONS[name]
+    route_key, make_event, expected, _ = SCENARIOS[scenario]
+    state = worker['state']
+    try:
+        with worker['lock']:
+            event = make_event(state)
+        response = harness.handler(route_key)(event, None)
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}"
+    status = response['statusCode']
+    if status not in expected:
+        return status, response.get('body')
+    if scenario == 'post':
+        with worker['lock']:
+            state['created'].append(json.loads(response['body'])['task_id'])
+    return status, None
+
+
+"""
+    Samples the peak number of server connections while a run is going
+
+    Only used with mongod; the sampler's own connection is subtracted.
+"""
+
+
+class ConnectionSampler(threading.Thread):
+
+    def __init__(self, client):
+        super().__init__(daemon=True)
+        self.client = client
+        self.baseline = self.current()
+        self.peak = 0
+        self.done = threading.Event()
+
+    def current(self):
+        status = self.client.admin.command('serverStatus')
+        return status['connections']['current']
+
+    def run(self):
+        while not self.done.wait(SAMPLE_INTERVAL):
+            self.peak = max(self.peak, self.current() - self.baseline)
+
+    def stop(self):
+        self.done.set()
+        self.join()
+        return self.peak
+
+
+def summarize(name, records, elapsed):
+    latencies = sorted(latency for latency, _, _ in records)
+    errors = sum(1 for _, _, error in records if error is not None)
+    return {
+        'operation': name,
+        'requests': len(records),
+        'throughput_rps': round(len(records) / elapsed, 1),
+        'error_rate': round(errors / len(records), 4) if records else 0.0,
+        'p50_ms': round(harness.percentile(latencies, 0.50) * 1000, 3),
+        'p95_ms': round(harness.percentile(latencies, 0.95) * 1000, 3),
+        'p99_ms': round(harness.percentile(latencies, 0.99) * 1000, 3),
+        'mean_ms': round(statistics.fmean(latencies) * 1000, 3),
+    }
+
+
+"""
+    Runs the load test
+
+    In the closed loop a new request is sent as soon as one of the
+    concurrency slots frees up. In the open loop requests are due every
+    1 / rate seconds whatever the workers are doing.
+
+    Returns:
+        dict - report with overall and per operation rows
+"""
+
+
+def run(mix, concurrency, pool, rate, duration, max_requests, size, seed):
+    random.seed(seed)
+    client, _, backend = harness.connect()
+    if pool == 'process' and backend == 'mongomock':
+        initargs = (None, size)
+    else:
+        initargs = (harness.seed(client, size), size)
+    if backend == 'mongod':
+        from common.indexes import ensure_indexes
+        ensure_indexes(client[harness.DATABASE_NAME])
+
+    if pool == 'process':
+        executor = ProcessPoolExecutor(concurrency, initializer=init_worker,
+                                       initargs=initargs)
+    else:
+        init_worker(*initargs, client=client)
+        executor = ThreadPoolExecutor(concurrency)
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    records = {name: [] for name in names}
+    errors = {}
+    slots = threading.Semaphore(concurrency)
+    lock = threading.Lock()
+    in_flight = 0
+    peak_in_flight = 0
+    sampler = ConnectionSampler(client) if backend == 'mongod' else None
+
+    def done(future, name, due):
+        nonlocal in_flight
+        finished = time.perf_counter()
+        try:
+            status, error = future.result()
+        except Exception as e:
+            status, error = None, f"{type(e).__name__}: {e}"
+        with lock:
+            in_flight -= 1
+            records[name].append((finished - due, status, error))
+            if error is not None:
+                key = f"{name} {status}: {str(error)[:80]}"
+                errors[key] = errors.get(key, 0) + 1
+        if rate is None:
+            slots.release()
+
+    with executor:
+        # Wake every worker before the clock starts.
+        list(executor.map(time.sleep, [0.01] * concurrency))
+        if sampler:
+            sampler.start()
+        started = time.perf_counter()
+        sent = 0
+        while True:
+            now = time.perf_counter()
+            if now - started >= duration or \
+                    (max_requests and sent >= max_requests):
+                break
+            if rate is None:
+                slots.acquire()
+                due = time.perf_counter()
+            else:
+                due = started + sent / rate
+                if due > now:
+                    time.sleep(due - now)
+            name = random.choices(names, weights)[0]
+            with lock:
+                in_flight += 1
+                peak_in_flight = max(peak_in_flight, in_flight)
+            future = executor.submit(execute, name)
+            future.add_done_callback(
+                lambda f, name=name, due=due: done(f, name, due))
+            sent += 1
+    elapsed = time.perf_counter() - started
+    peak_connections = sampler.stop() if sampler else peak_in_flight
+
+    every = [record for rows in records.values() for record in rows]
+    return {
+        'meta': {
+            'backend': backend,
+            'pool': pool,
+            'concurrency': concurrency,
+            'rate': rate,
+            'size': size,
+            'mix': mix,
+            'elapsed_s': round(elapsed, 2),
+            'peak_connections': peak_connections,
+            'peak_connections_source': ('serverStatus' if sampler
+                                        else 'requests in flight'),
+        },
+        'overall': summarize('all', every, elapsed),
+        'operations': [summarize(name, rows, elapsed)
+                       for name, rows in records.items() if rows],
+        'errors': errors,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--mix', type=parse_mix, default=DEFAULT_MIX,
+                        help=f'operation weights (default {DEFAULT_MIX})')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--pool', choices=('thread', 'process'),
+                        default='thread')
+    parser.add_argument('--rate', type=float,
+                        help='requests per second, default closed loop')
+    parser.add_argument('--duration', type=float, default=10,
+                        help='seconds to send requests for')
+    parser.add_argument('--requests', type=int,
+                        help='stop after this many requests')
+    parser.add_argument('--size', type=int, default=10_000,
+                        help='tasks seeded before the run')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', action='store_true',
+                        help='print the report as JSON')
+    args = parser.parse_args()
+    if isinstance(args.mix, str):
+        args.mix = parse_mix(args.mix)
+
+    report = run(args.mix, args.concurrency, args.pool, args.rate,
+                 args.duration, args.requests, args.size, args.seed)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    meta = report['meta']
+    print(f"backend: {meta['backend']}, pool: {meta['pool']} x "
+          f"{meta['concurrency']}, rate: {meta['rate'] or 'closed loop'}, "
+          f"elapsed: {meta['elapsed_s']}s")
+    print(f"peak connections: {meta['peak_connections']} "
+          f"({meta['peak_connections_source']})")
+    print(f"{'operation':<14}{'requests':>9}{'req/s':>9}{'errors':>8}"
+          f"{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    for r in report['operations'] + [report['overall']]:
+        print(f"{r['operation']:<14}{r['requests']:>9}"
+              f"{r['throughput_rps']:>9}{r['error_rate']:>8.2%}"
+              f"{r['p50_ms']:>9}{r['p95_ms']:>9}{r['p99_ms']:>9}")
+    for error, count in sorted(report['errors'].items()):
+        print(f"  {count} x {error}")
+
+
+if __name__ == '__main__':
+    main()
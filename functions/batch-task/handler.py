@@ -0,0 +1,168 @@
+import json
+import logging
+from pymongo import UpdateOne, DeleteOne
+from pymongo.errors import BulkWriteError
+from common.changes import bump_collection_version
+from common.db import get_client
+from common.metrics import instrument, phase
+from common.schema import changed_fields_update
+from common.validation import check_fields
+
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+MAX_OPERATIONS = 1000
+
+"""
+    POST /batch - Update and delete many tasks by id in one request
+
+    Request Body:
+    - operations: array (required) - At most 1000 operations, each one of
+      - {"action": "update", "task_id": string, "fields": object}
+      - {"action": "delete", "task_id": string}
+      fields are validated like PUT /edit/{task_id} but any subset of
+      fields is allowed
+
+    All operations are validated before anything is written, then sent as
+    a single unordered bulk_write. An update whose fields already hold
+    the values leaves the task, its version and updated_at untouched.
+
+    Response Codes:
+    - 200: All operations were applied
+    - 207: Some operations failed, see errors
+    - 400: Bad request (validation errors)
+    - 500: Server error
+
+    Returns:
+    - JSON response with status code, headers and body
+      {"matched_count": int, "modified_count": int, "deleted_count": int,
+       "errors": [{"index": int, "error": string}]}
+"""
+
+
+@instrument
+def batch(event, context):
+    try:
+        client = get_client()
+        if client is None:
+            logger.error("MongoDB client is not initialized")
+            return {
+                'statusCode': 500,
+                'headers': {
+                    'Content-Type': 'application/json',
+                },
+                'body': json.dumps({'error': 'Internal server error'})
+            }
+        if "body" not in event:
+            logger.error("No body in the event")
+            return {
+                'statusCode': 400,
+                'headers': {
+                    'Content-Type': 'application/json',
+                },
+                'body': json.dumps({'error': 'Bad Request'})
+            }
+        with phase('parse'):
+            payload = json.loads(event['body'])
+        operations = payload.get('operations') \
+            if isinstance(payload, dict) else None
+        if (not isinstance(operations, list) or not operations
+                or len(operations) > MAX_OPERATIONS):
+            logger.error("Invalid batch payload")
+            return {
+                'statusCode': 400,
+                'headers': {
+                    'Content-Type': 'application/json',
+                },
+                'body': json.dumps({'error': 'Bad Request'})
+            }
+
+        requests = []
+        errors = []
+        with phase('validate'):
+            for index, operation in enumerate(operations):
+                request = build_request(operation)
+                if request is None:
+                    errors.append({'index': index,
+                                   'error': 'Invalid operation'})
+                requests.append(request)
+        if errors:
+            logger.error("Invalid operations in batch")
+            return {
+                'statusCode': 400,
+                'headers': {
+                    'Content-Type': 'application/json',
+                },
+                'body': json.dumps({'error': 'Bad Request',
+                                    'errors': errors})
+            }
+
+        db = client.tasks_dashboard
+        tasks = db.tasks
+        try:
+            with phase('db'):
+                result = tasks.bulk_write(requests, ordered=False)
+            counts = {
+                'matched_count': result.matched_count,
+                'modified_count': result.modified_count,
+                'deleted_count': result.deleted_count,
+            }
+        except BulkWriteError as e:
+            counts = {
+                'matched_count': e.details.get('nMatched', 0),
+                'modified_count': e.details.get('nModified', 0),
+                'deleted_count': e.details.get('nRemoved', 0),
+            }
+            for error in e.details.get('writeErrors', []):
+                logger.error(f"Error in batch: {error.get('errmsg')}")
+                errors.append({'index': error['index'],
+                               'error': 'Failed to apply operation'})
+        if counts['modified_count'] or counts['deleted_count']:
+            with phase('db'):
+                bump_collection_version(db)
+
+        return {
+            'statusCode': 207 if errors else 200,
+            'headers': {
+                'Content-Type': 'application/json'
+            },
+            'body': json.dumps(dict(counts, errors=errors))
+        }
+
+    except Exception as e:
+        logger.error(f"Error applying batch: {str(e)}")
+        return {
+            'statusCode': 500,
+            'headers': {
+                'Content-Type': 'application/json',
+            },
+            'body': json.dumps({'error': 'Internal server error'})
+        }
+
+
+"""
+    Converts one batch operation into a bulk_write request
+
+    Args:
+        operation (dict): Operation from the request body
+
+    Returns:
+        UpdateOne|DeleteOne|None - None when the operation is invalid
+"""
+
+
+def build_request(operation):
+    if not isinstance(operation, dict):
+        return None
+    task_id = operation.get('task_id')
+    if not isinstance(task_id, str) or len(task_id) == 0:
+        return None
+    action = operation.get('action')
+    if action == 'update':
+        fields = operation.get('fields')
+        if not check_fields(fields):
+            return None
+        return UpdateOne({"_id": task_id}, changed_fields_update(fields))
+    if action == 'delete':
+        return DeleteOne({"_id": task_id})
+    return None
@@ -0,0 +1,143 @@
+import unittest
+from unittest.mock import patch, MagicMock
+import json
+import os
+import logging
+
+logging.disable(logging.CRITICAL)
+
+os.environ['MONGO_HOST'] = 'mongodb://mockhost:27017'
+
+from handler import batch
+from common.schema import changed_fields_update
+from common.test_support import RoundTripAssertions
+
+from pymongo import UpdateOne, DeleteOne
+from pymongo.errors import BulkWriteError
+
+NOW = "2024-01-01T00:00:00.000Z"
+
+
+class TestBatchHandler(RoundTripAssertions, unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        logging.disable(logging.CRITICAL)
+
+    @classmethod
+    def tearDownClass(cls):
+        logging.disable(logging.NOTSET)
+
+    def test_successful_batch(self):
+        with patch('handler.get_client') as mock_get_client, \
+                patch('common.schema.utc_timestamp', return_value=NOW):
+            mock_client = mock_get_client.return_value
+            mock_collection = MagicMock()
+            mock_client.tasks_dashboard.tasks = mock_collection
+
+            mock_result = MagicMock()
+            mock_result.matched_count = 1
+            mock_result.modified_count = 1
+            mock_result.deleted_count = 1
+            mock_collection.bulk_write.return_value = mock_result
+
+            event = {
+                "body": json.dumps({"operations": [
+                    {"action": "update", "task_id": "task-1",
+                     "fields": {"status": "done"}},
+                    {"action": "delete", "task_id": "task-2"}
+                ]})
+            }
+            context = {}
+            response = batch(event, context)
+
+            self.assertEqual(response['statusCode'], 200)
+            response_body = json.loads(response['body'])
+            self.assertEqual(response_body, {
+                'matched_count': 1, 'modified_count': 1,
+                'deleted_count': 1, 'errors': []})
+            mock_collection.bulk_write.assert_called_once_with([
+                UpdateOne({"_id": "task-1"},
+                          changed_fields_update({"status": "done"})),
+                DeleteOne({"_id": "task-2"})
+            ], ordered=False)
+
+    def test_invalid_operations_are_rejected_before_writing(self):
+        with patch('handler.get_client') as mock_get_client:
+            mock_client = mock_get_client.return_value
+            event = {
+                "body": json.dumps({"operations": [
+                    {"action": "update", "task_id": "task-1",
+                     "fields": {"status": "done"}},
+                    {"action": "update", "task_id": "task-2",
+                     "fields": {"priority": "urgent"}},
+                    {"action": "archive", "task_id": "task-3"},
+                    {"action": "delete"}
+                ]})
+            }
+            context = {}
+            response = batch(event, context)
+
+            self.assertEqual(response['statusCode'], 400)
+            response_body = json.loads(response['body'])
+            self.assertEqual([e['index'] for e in response_body['errors']],
+                             [1, 2, 3])
+            mock_client.tasks_dashboard.tasks.bulk_write.assert_not_called()
+
+    def test_partial_failure(self):
+        with patch('handler.get_client') as mock_get_client:
+            mock_client = mock_get_client.return_value
+            mock_collection = MagicMock()
+            mock_client.tasks_dashboard.tasks = mock_collection
+            mock_collection.bulk_write.side_effect = BulkWriteError({
+                'nMatched': 1, 'nModified': 1, 'nRemoved': 0,
+                'writeErrors': [{'index': 1, 'errmsg': 'write failed'}]})
+
+            event = {
+                "body": json.dumps({"operations": [
+                    {"action": "update", "task_id": "task-1",
+                     "fields": {"status": "done"}},
+                    {"action": "delete", "task_id": "task-2"}
+                ]})
+            }
+            context = {}
+            response = batch(event, context)
+
+            self.assertEqual(response['statusCode'], 207)
+            response_body = json.loads(response['body'])
+            self.assertEqual(response_body['modified_count'], 1)
+            self.assertEqual(response_body['errors'][0]['index'], 1)
+
+    def test_bad_request(self):
+        with patch('handler.get_client'):
+            for event in [{}, {"body": "[]"},
+                          {"body": json.dumps({"operations": []})}]:
+                context = {}
+                response = batch(event, context)
+
+                self.assertEqual(response['statusCode'], 400)
+                self.assertIn('Bad Request', response['body'])
+
+    def test_client_not_initialized(self):
+        with patch('handler.get_client', return_value=None):
+            event = {"body": json.dumps({"operations": [
+                {"action": "delete", "task_id": "task-1"}]})}
+            context = {}
+            response = batch(event, context)
+
+            self.assertEqual(response['statusCode'], 500)
+            self.assertIn('Internal server error', response['body'])
+
+    def test_round_trips_per_request(self):
+        with patch('handler.get_client') as mock_get_client:
+            mock_client = mock_get_client.return_value
+            operations = [{"action": "delete", "task_id": f"task-{i}"}
+                          for i in range(100)]
+
+            # One bulk_write for every operation plus the version bump.
+            batch({"body": json.dumps({"operations": operations})}, {})
+            self.assertRoundTripsAtMost(mock_client, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import os
+import asyncio
+import logging
+from pymongo import AsyncMongoClient
+from common.db import client_options
+from common.monitoring import event_listeners
+
+logger = logging.getLogger()
+
+"""
+    AsyncMongoClient and event loop for handlers that fan out reads
+
+    Lambda calls handlers synchronously, so async handlers are driven by
+    run() from a plain function. The loop is created once per container
+    and reused by every invocation: an AsyncMongoClient's connection pool
+    belongs to the loop it first ran on, and asyncio.run would close that
+    loop after each call, leaving the warm client unusable. The client
+    takes the same options and command monitor as common.db.
+"""
+
+_client = None
+_loop = None
+
+
+"""
+    Returns the container's shared AsyncMongoClient, creating it on first
+    use
+
+    Returns:
+        AsyncMongoClient|None - None when creation fails; the next call
+        tries again
+"""
+
+
+def get_async_client():
+    global _client
+    if _client is None:
+        try:
+            _client = AsyncMongoClient(host=os.environ.get('MONGO_HOST'),
+                                       event_listeners=event_listeners(),
+                                       **client_options())
+        except Exception as e:
+            logger.error(f"MongoDB connection error: {e}")
+            return None
+    return _client
+
+
+"""
+    Runs a coroutine to completion on the container's event loop
+
+    Args:
+        coroutine: Coroutine to run
+
+    Returns:
+        The coroutine's result
+"""
+
+
+def run(coroutine):
+    global _loop
+    if _loop is None or _loop.is_closed():
+        _loop = asyncio.new_event_loop()
+    return _loop.run_until_complete(coroutine)
+
+
+"""
+    Closes and forgets the shared async client; the next
+    get_async_client reconnects
+"""
+
+
+def reset_async_client():
+    global _client
+    if _client is not None:
+        run(_client.close())
+    _client = None
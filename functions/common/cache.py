@@ -0,0 +1,70 @@
+import time
+from collections import OrderedDict
+
+"""
+    Bounded LRU cache with a TTL for serialized responses
+
+    Lives in module scope, so entries survive across invocations of a warm
+    container. Entries are bounded both by count and by the total length
+    of their bodies, and expire after ttl_seconds even if never evicted.
+
+    Args:
+        max_entries (int): Maximum number of cached responses
+        max_bytes (int): Maximum total body length across entries
+        ttl_seconds (float): Lifetime of an entry
+        clock (callable): Monotonic clock, replaceable in tests
+"""
+
+
+class ResponseCache:
+
+    def __init__(self, max_entries=128, max_bytes=32 * 1024 * 1024,
+                 ttl_seconds=30, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.size = 0
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] <= self.clock():
+            self._remove(key)
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key, response):
+        size = len(response.get('body') or '')
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (self.clock() + self.ttl_seconds, response, size)
+        self.size += size
+        while len(self._entries) > self.max_entries \
+                or self.size > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+
+    def clear(self):
+        self._entries.clear()
+        self.size = 0
+
+    def stats(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'entries': len(self._entries),
+            'bytes': self.size,
+        }
+
+    def _remove(self, key):
+        _, _, size = self._entries.pop(key)
+        self.size -= size
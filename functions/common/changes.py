@@ -0,0 +1,98 @@
+from pymongo.errors import DuplicateKeyError
+
+"""
+    Collection version marker for the tasks collection
+
+    A single document in tasks_dashboard.meta counts writes to the tasks
+    collection. Every handler that writes tasks bumps it, so readers can
+    tell whether anything changed with one point read by _id instead of
+    re-reading the tasks. Writes made outside the API do not bump it, so
+    caches keyed on it should still expire on their own.
+"""
+
+MARKER_ID = "tasks"
+
+
+def bump_collection_version(db):
+    db.meta.update_one({"_id": MARKER_ID}, {"$inc": {"version": 1}},
+                       upsert=True)
+
+
+def get_collection_version(db):
+    marker = db.meta.find_one({"_id": MARKER_ID}, {"version": 1})
+    # A marker created by a snapshot before any write may lack a version.
+    return (marker or {}).get("version", 0)
+
+
+"""
+    Reads the whole marker document, with any snapshots stored on it
+
+    get_marker_async does the same through an AsyncMongoClient database.
+
+    Returns:
+        dict - empty when nothing has been written yet
+"""
+
+
+def get_marker(db):
+    return db.meta.find_one({"_id": MARKER_ID}) or {}
+
+
+async def get_marker_async(db):
+    return await db.meta.find_one({"_id": MARKER_ID}) or {}
+
+
+"""
+    Stores a value computed at a collection version on the marker
+
+    The write only applies while the marker is still at that version, so
+    a snapshot raced by a write is dropped instead of stored as current.
+    save_snapshot_async does the same through an AsyncMongoClient
+    database.
+
+    Args:
+        db (pymongo.database.Database): Tasks database
+        version (int): Collection version the value was computed at
+        field (str): Marker field to set
+        value: Value to store
+
+    Returns:
+        bool - whether the value was stored
+"""
+
+
+def save_snapshot(db, version, field, value):
+    try:
+        result = db.meta.update_one(_snapshot_query(version),
+                                    _snapshot_update(version, field, value),
+                                    upsert=True)
+    except DuplicateKeyError:
+        return False
+    return bool(result.matched_count or result.upserted_id is not None)
+
+
+async def save_snapshot_async(db, version, field, value):
+    try:
+        result = await db.meta.update_one(
+            _snapshot_query(version), _snapshot_update(version, field, value),
+            upsert=True)
+    except DuplicateKeyError:
+        return False
+    return bool(result.matched_count or result.upserted_id is not None)
+
+
+def _snapshot_query(version):
+    query = {"_id": MARKER_ID, "version": version}
+    if version == 0:
+        # No write has created the marker yet, or a snapshot created it
+        # before the version field was written.
+        query["version"] = {"$in": [0, None]}
+    return query
+
+
+def _snapshot_update(version, field, value):
+    update = {"$set": {field: value}}
+    if version == 0:
+        # An upsert does not copy the $in above into the new marker.
+        update["$setOnInsert"] = {"version": 0}
+    return update
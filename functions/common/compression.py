@@ -0,0 +1,83 @@
+import os
+import gzip
+import base64
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+MIN_BYTES = int(os.environ.get('COMPRESSION_MIN_BYTES', '1024'))
+GZIP_LEVEL = int(os.environ.get('COMPRESSION_GZIP_LEVEL', '6'))
+BROTLI_QUALITY = int(os.environ.get('COMPRESSION_BROTLI_QUALITY', '5'))
+
+# Preferred first when the client weighs encodings equally.
+SUPPORTED_ENCODINGS = ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+"""
+    Picks the response encoding from an Accept-Encoding header
+
+    Args:
+        event (dict): API Gateway event
+
+    Returns:
+        str|None - "br", "gzip", or None for identity
+"""
+
+
+def negotiate_encoding(event):
+    headers = event.get('headers') or {}
+    accept = headers.get('accept-encoding')
+    if not accept:
+        return None
+    weights = {}
+    for item in accept.split(','):
+        coding, _, params = item.strip().partition(';')
+        coding = coding.strip().lower()
+        weight = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        weights[coding] = weight
+    best, best_weight = None, 0.0
+    for encoding in SUPPORTED_ENCODINGS:
+        weight = weights.get(encoding, weights.get('*', 0.0))
+        if weight > best_weight:
+            best, best_weight = encoding, weight
+    return best
+
+
+"""
+    Compresses a response body with the negotiated encoding
+
+    Bodies shorter than COMPRESSION_MIN_BYTES (default 1024) are returned
+    unchanged, since compression costs more than it saves there.
+
+    Args:
+        response (dict): Lambda proxy response with a string body
+        encoding (str|None): Result of negotiate_encoding
+
+    Returns:
+        dict - a new response with a base64 body, isBase64Encoded and
+        Content-Encoding set, or the response unchanged
+"""
+
+
+def compress_response(response, encoding):
+    body = response.get('body')
+    headers = dict(response.get('headers') or {}, Vary='Accept-Encoding')
+    if (encoding is None or not body or response.get('isBase64Encoded')
+            or len(body) < MIN_BYTES):
+        return dict(response, headers=headers)
+    raw = body.encode('utf-8')
+    if encoding == 'br':
+        compressed = brotli.compress(raw, quality=BROTLI_QUALITY)
+    else:
+        compressed = gzip.compress(raw, compresslevel=GZIP_LEVEL, mtime=0)
+    headers['Content-Encoding'] = encoding
+    return dict(response, headers=headers, isBase64Encoded=True,
+                body=base64.b64encode(compressed).decode('ascii'))
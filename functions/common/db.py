@@ -0,0 +1,77 @@
+import os
+import logging
+from pymongo import MongoClient
+from common.monitoring import event_listeners
+
+logger = logging.getLogger()
+
+_client = None
+
+"""
+    Client options tuned for Lambda, each overridable by environment
+
+    - MONGO_HOST: connection string
+    - MONGO_MAX_POOL_SIZE: connections per container (default 10); a
+      container serves one request at a time, so a small pool is enough
+    - MONGO_SERVER_SELECTION_TIMEOUT_MS: how long an operation waits for a
+      usable server (default 5000), well inside the API Gateway timeout
+    - MONGO_MAX_IDLE_TIME_MS: close pooled connections idle this long
+      (default 60000), so frozen containers do not hold stale sockets
+    - MONGO_COMPRESSORS: wire compressors in preference order, e.g.
+      "zstd,snappy,zlib"; zstd and snappy need the zstandard and
+      python-snappy packages and are skipped by pymongo when missing
+"""
+
+
+def client_options():
+    options = {
+        'maxPoolSize': int(os.environ.get('MONGO_MAX_POOL_SIZE', '10')),
+        'serverSelectionTimeoutMS': int(
+            os.environ.get('MONGO_SERVER_SELECTION_TIMEOUT_MS', '5000')),
+        'maxIdleTimeMS': int(os.environ.get('MONGO_MAX_IDLE_TIME_MS',
+                                            '60000')),
+    }
+    compressors = os.environ.get('MONGO_COMPRESSORS')
+    if compressors:
+        options['compressors'] = compressors
+    return options
+
+
+"""
+    Returns the container's shared MongoClient, creating it on first use
+
+    Creating the client does not wait for the server: the first operation
+    connects, so cold starts skip the separate ping round trip. When
+    creation fails (bad URI, DNS SRV lookup errors) None is returned and
+    the next call tries again, so one failure does not poison a warm
+    container. The command monitor from common.monitoring is registered
+    unless MONGO_COMMAND_MONITORING is "false".
+
+    Returns:
+        MongoClient|None
+"""
+
+
+def get_client():
+    global _client
+    if _client is None:
+        try:
+            _client = MongoClient(host=os.environ.get('MONGO_HOST'),
+                                  event_listeners=event_listeners(),
+                                  **client_options())
+        except Exception as e:
+            logger.error(f"MongoDB connection error: {e}")
+            return None
+    return _client
+
+
+"""
+    Closes and forgets the shared client; the next get_client reconnects
+"""
+
+
+def reset_client():
+    global _client
+    if _client is not None:
+        _client.close()
+    _client = None
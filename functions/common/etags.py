@@ -0,0 +1,137 @@
+"""
+    Helpers for the versions exposed as ETags
+
+    Tasks carry an integer version that every write increments. Tasks
+    written before versioning have no version field and count as 0.
+    Listings use the collection version from common.changes instead.
+"""
+import json
+import hashlib
+
+# Content-codings compress_response can apply; see common.compression.
+CONTENT_CODINGS = ('br', 'gzip')
+
+
+def format_etag(version):
+    return f'"{version or 0}"'
+
+
+"""
+    Reads the If-Match header of an HTTP API event
+
+    Args:
+        event (dict): API Gateway event
+
+    Returns:
+        list|None - accepted versions, or None when the header is absent
+        or "*". An empty list means no version can match (for example a
+        weak or malformed tag), which callers report as 412.
+"""
+
+
+def parse_if_match(event):
+    headers = event.get('headers') or {}
+    value = headers.get('if-match')
+    if value is None or value.strip() == '*':
+        return None
+    versions = []
+    for tag in value.split(','):
+        tag = tag.strip()
+        if len(tag) < 2 or tag[0] != '"' or tag[-1] != '"':
+            continue
+        # Tags of compressed GET responses carry the coding after the
+        # version (see encoded_etag); the version is the same.
+        version, _, coding = tag[1:-1].partition('-')
+        if coding and coding not in CONTENT_CODINGS:
+            continue
+        try:
+            versions.append(int(version))
+        except ValueError:
+            continue
+    return versions
+
+
+"""
+    Builds the Mongo condition matching any of the given versions
+
+    Args:
+        versions (list): Versions from parse_if_match
+
+    Returns:
+        dict
+"""
+
+
+def version_condition(versions):
+    if 0 in versions:
+        # A missing version field is version 0.
+        return {'$in': versions + [None]}
+    return {'$in': versions}
+
+
+"""
+    Builds a strong ETag for a listing of the collection
+
+    Args:
+        collection_version (int): Value from get_collection_version
+        params (dict): Query parameters that shape the response
+
+    Returns:
+        str
+"""
+
+
+def collection_etag(collection_version, params):
+    digest = hashlib.sha1(
+        json.dumps(params, sort_keys=True).encode('utf-8')).hexdigest()
+    return f'"c{collection_version}-{digest[:16]}"'
+
+
+"""
+    Appends the content-coding of a response to its strong ETag
+
+    A gzip or br body is a different representation from the identity
+    one, so it needs its own strong validator (RFC 9110 section 8.8.3).
+
+    Args:
+        etag (str): ETag of the identity representation
+        encoding (str|None): Result of negotiate_encoding
+
+    Returns:
+        str - e.g. '"c5-0123456789abcdef-gzip"', unchanged for identity
+"""
+
+
+def encoded_etag(etag, encoding):
+    if encoding is None:
+        return etag
+    return f'{etag[:-1]}-{encoding}"'
+
+
+"""
+    Checks the If-None-Match header of an HTTP API event
+
+    Args:
+        event (dict): API Gateway event
+        etag (str): Current ETag of the resource
+
+    Returns:
+        boolean - True when the client already holds this representation
+"""
+
+
+def if_none_match(event, etag):
+    headers = event.get('headers') or {}
+    value = headers.get('if-none-match')
+    if value is None:
+        return False
+    for tag in value.split(','):
+        tag = tag.strip()
+        if tag == '*':
+            return True
+        # If-None-Match uses the weak comparison.
+        if tag.startswith('W/'):
+            tag = tag[2:]
+        if tag == etag:
+            return True
+    return False
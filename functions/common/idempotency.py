@@ -0,0 +1,190 @@
+import os
+import hashlib
+import datetime
+from pymongo.errors import DuplicateKeyError
+
+"""
+    Idempotency keys for POST requests
+
+    - IDEMPOTENCY_TTL_SECONDS: how long a key and its response are kept
+      (default 86400)
+    - IDEMPOTENCY_LEASE_SECONDS: how long a pending claim is held before
+      a retry may take it over (default 30, keep it above the function
+      timeout)
+
+    A client retrying a request sends the same Idempotency-Key header.
+    The first request claims the key with an insert into
+    tasks_dashboard.idempotency_keys, which the unique _id index makes
+    atomic. The claim holds the response the request will return, since
+    the task id is generated before the insert, and is marked done once
+    the task is written. Retries read the key by _id and get that
+    response back without writing again. A TTL index on created_at
+    removes keys after IDEMPOTENCY_TTL_SECONDS.
+
+    Only successful responses are replayed: a request whose insert fails
+    releases its key, so a retry runs again. Once the task is written the
+    key is marked done even if a later step fails.
+
+    A claim is a lease until locked_until. A request that dies before
+    inserting, e.g. on a Lambda timeout, leaves its key pending; once the
+    lease has run out a retry takes the key over with a conditional
+    update on the lease it read, so only one retry wins, and inserts the
+    task promised by the stored response. Release is conditional on the
+    lease too, so a request that lost its claim cannot drop the new one.
+"""
+
+IDEMPOTENCY_TTL_SECONDS = int(os.environ.get('IDEMPOTENCY_TTL_SECONDS',
+                                             '86400'))
+IDEMPOTENCY_LEASE_SECONDS = int(os.environ.get('IDEMPOTENCY_LEASE_SECONDS',
+                                               '30'))
+MAX_KEY_LENGTH = 255
+PENDING = "pending"
+DONE = "done"
+
+
+"""
+    Reads the Idempotency-Key header of an HTTP API event
+
+    Args:
+        event (dict): API Gateway event
+
+    Returns:
+        str|None - None when the header is absent
+
+    Raises:
+        ValueError: when the key is empty or longer than MAX_KEY_LENGTH
+"""
+
+
+def idempotency_key(event):
+    headers = event.get('headers') or {}
+    key = headers.get('idempotency-key')
+    if key is None:
+        return None
+    key = key.strip()
+    if not key or len(key) > MAX_KEY_LENGTH:
+        raise ValueError(
+            f"Idempotency-Key must be 1 to {MAX_KEY_LENGTH} characters")
+    return key
+
+
+"""
+    Digest of a request body, to tell a retry from a reused key
+
+    Args:
+        body (str): Raw request body
+
+    Returns:
+        str
+"""
+
+
+def fingerprint(body):
+    return hashlib.sha256(body.encode('utf-8')).hexdigest()
+
+
+def find_key(db, key):
+    return db.idempotency_keys.find_one({"_id": key})
+
+
+"""
+    Claims a key for the current request
+
+    Args:
+        db (pymongo.database.Database): Tasks database
+        key (str): Idempotency key
+        request_fingerprint (str): Value of fingerprint for the body
+        response (dict): Response to replay once the key is done
+
+    Returns:
+        datetime|None - end of the lease, None when another request
+        claimed the key first
+"""
+
+
+def claim_key(db, key, request_fingerprint, response):
+    now = _now()
+    locked_until = now + datetime.timedelta(seconds=IDEMPOTENCY_LEASE_SECONDS)
+    try:
+        db.idempotency_keys.insert_one({
+            "_id": key,
+            "fingerprint": request_fingerprint,
+            "status": PENDING,
+            "response": response,
+            # BSON dates, which the TTL index needs.
+            "created_at": now,
+            "locked_until": locked_until,
+        })
+    except DuplicateKeyError:
+        return None
+    return locked_until
+
+
+"""
+    Tells whether the lease of a pending key has run out
+
+    Keys claimed before leases were added count from created_at.
+
+    Args:
+        record (dict): Stored key document
+
+    Returns:
+        bool
+"""
+
+
+def lease_expired(record):
+    locked_until = record.get('locked_until')
+    if locked_until is None:
+        created_at = record.get('created_at')
+        if created_at is None:
+            return False
+        locked_until = created_at + datetime.timedelta(
+            seconds=IDEMPOTENCY_LEASE_SECONDS)
+    # pymongo returns naive UTC datetimes unless the client is tz_aware.
+    if locked_until.tzinfo is None:
+        locked_until = locked_until.replace(tzinfo=datetime.timezone.utc)
+    return locked_until <= _now()
+
+
+"""
+    Takes over a pending key whose lease has run out
+
+    The update only matches while the key still holds the lease that was
+    read, so of several retries racing for the key only one gets it.
+
+    Args:
+        db (pymongo.database.Database): Tasks database
+        key (str): Idempotency key
+        record (dict): Stored key document, as read
+
+    Returns:
+        datetime|None - end of the new lease, None when another request
+        took the key or it changed since it was read
+"""
+
+
+def take_over_key(db, key, record):
+    locked_until = _now() + datetime.timedelta(
+        seconds=IDEMPOTENCY_LEASE_SECONDS)
+    result = db.idempotency_keys.update_one(
+        {"_id": key, "status": PENDING,
+         "locked_until": record.get('locked_until')},
+        {"$set": {"locked_until": locked_until}})
+    return locked_until if result.modified_count == 1 else None
+
+
+def complete_key(db, key):
+    db.idempotency_keys.update_one({"_id": key}, {"$set": {"status": DONE}})
+
+
+def release_key(db, key, locked_until):
+    db.idempotency_keys.delete_one(
+        {"_id": key, "status": PENDING, "locked_until": locked_until})
+
+
+def _now():
+    # BSON dates hold milliseconds: truncate so a lease read back compares
+    # equal to the one written.
+    now = datetime.datetime.now(datetime.timezone.utc)
+    return now.replace(microsecond=now.microsecond // 1000 * 1000)
@@ -0,0 +1,71 @@
+import os
+import time
+import datetime
+import threading
+
+"""
+    Identifiers and timestamps assigned to tasks on write
+
+    Task ids are UUIDv7 strings (RFC 9562): a 48 bit Unix millisecond
+    timestamp followed by random bits. New ids sort after older ones, so
+    inserts append to the right edge of the _id index instead of touching
+    random pages of it. They keep the 36 character string form of the
+    uuid4 ids already stored, which still resolve everywhere since _id is
+    only ever compared as a string. Those uuid4 ids are random, so _id
+    order is not creation order across both schemes: sort on created_at
+    for that.
+
+    Timestamps are ISO 8601 UTC strings with millisecond precision, which
+    sort like the instants they denote and keep task documents made of
+    strings and integers only (see common.serializer).
+"""
+
+_lock = threading.Lock()
+_last_ms = 0
+_counter = 0
+
+
+"""
+    Generates a time-ordered task id
+
+    Within one millisecond the 12 bit rand_a field is used as a counter
+    seeded at random (RFC 9562 method 1), so ids from one container are
+    strictly increasing; on overflow the timestamp is advanced by one.
+
+    Returns:
+        str - e.g. "0192a6e4-8f5b-7c3e-9a1d-2b4c6d8e0f12"
+"""
+
+
+def new_task_id():
+    global _last_ms, _counter
+    random_bits = int.from_bytes(os.urandom(10), 'big')
+    with _lock:
+        now_ms = time.time_ns() // 1_000_000
+        if now_ms > _last_ms:
+            _last_ms = now_ms
+            # Leave headroom so the counter rarely overflows.
+            _counter = (random_bits >> 68) & 0x7ff
+        else:
+            _counter += 1
+            if _counter > 0xfff:
+                _last_ms += 1
+                _counter = 0
+        timestamp, counter = _last_ms, _counter
+    value = (timestamp & 0xffffffffffff) << 80 | 0x7 << 76 | counter << 64 \
+        | 0b10 << 62 | random_bits & 0x3fffffffffffffff
+    text = f'{value:032x}'
+    return f'{text[:8]}-{text[8:12]}-{text[12:16]}-{text[16:20]}-{text[20:]}'
+
+
+"""
+    Current time as an ISO 8601 UTC string
+
+    Returns:
+        str - e.g. "2024-10-18T09:30:00.123Z"
+"""
+
+
+def utc_timestamp():
+    now = datetime.datetime.now(datetime.timezone.utc)
+    return now.isoformat(timespec='milliseconds').replace('+00:00', 'Z')
@@ -0,0 +1,182 @@
+import sys
+import json
+import argparse
+from pymongo import IndexModel
+from common.idempotency import IDEMPOTENCY_TTL_SECONDS
+
+DATABASE_NAME = "tasks_dashboard"
+
+"""
+    Indexes every handler relies on, keyed by collection name
+
+    Keyset pagination sorts on _id, so filtered listings need the filter
+    fields ahead of _id to avoid an in-memory sort. GET /dashboard lists
+    the newest tasks by created_at, since _id order is only creation order
+    among UUIDv7 ids. GET /search needs the text index; a collection can
+    only have one. The TTL index expires
+    POST /create idempotency keys (see common.idempotency).
+"""
+
+INDEX_SPECS = {
+    "tasks": [
+        {"name": "status_1__id_1",
+         "keys": [("status", 1), ("_id", 1)]},
+        {"name": "priority_1__id_1",
+         "keys": [("priority", 1), ("_id", 1)]},
+        {"name": "status_1_priority_1__id_1",
+         "keys": [("status", 1), ("priority", 1), ("_id", 1)]},
+        {"name": "created_at_-1",
+         "keys": [("created_at", -1)]},
+        {"name": "status_1_created_at_-1",
+         "keys": [("status", 1), ("created_at", -1)]},
+        {"name": "title_text_description_text",
+         "keys": [("title", "text"), ("description", "text")],
+         "weights": {"title": 3, "description": 1}},
+    ],
+    "idempotency_keys": [
+        {"name": "created_at_1",
+         "keys": [("created_at", 1)],
+         "expireAfterSeconds": IDEMPOTENCY_TTL_SECONDS},
+    ],
+}
+
+# Options that change how an index behaves; anything else reported by
+# index_information (v, ns, ...) is informational and never drift.
+COMPARED_OPTIONS = ("unique", "sparse", "expireAfterSeconds",
+                    "partialFilterExpression")
+
+
+"""
+    Creates missing indexes and reports drift against INDEX_SPECS
+
+    Safe to run repeatedly: indexes that already match are left alone.
+    Indexes whose keys or options differ from the spec are only dropped
+    and recreated when repair is set.
+
+    Args:
+        db (pymongo.database.Database): Target database
+        specs (dict): Index specs keyed by collection name
+        dry_run (bool): Report what would change without writing
+        repair (bool): Recreate drifted indexes
+
+    Returns:
+        dict - per collection lists of created, unchanged, drifted,
+        recreated and extra index names
+"""
+
+
+def ensure_indexes(db, specs=INDEX_SPECS, dry_run=False, repair=False):
+    report = {}
+    for collection_name, collection_specs in specs.items():
+        collection = db[collection_name]
+        live = {name: _normalize(info)
+                for name, info in collection.index_information().items()}
+        result = {"created": [], "unchanged": [], "drifted": [],
+                  "recreated": [], "extra": []}
+        missing = []
+        for spec in collection_specs:
+            expected = _normalize(spec)
+            actual = live.get(spec["name"])
+            if actual is None:
+                missing.append(spec)
+                result["created"].append(spec["name"])
+            elif actual == expected:
+                result["unchanged"].append(spec["name"])
+            elif repair:
+                if not dry_run:
+                    collection.drop_index(spec["name"])
+                missing.append(spec)
+                result["recreated"].append(spec["name"])
+            else:
+                result["drifted"].append({
+                    "name": spec["name"],
+                    "expected": expected,
+                    "actual": actual,
+                })
+        spec_names = {spec["name"] for spec in collection_specs}
+        result["extra"] = sorted(name for name in live
+                                 if name != "_id_" and name not in spec_names)
+        if missing and not dry_run:
+            collection.create_indexes([_index_model(spec)
+                                       for spec in missing])
+        report[collection_name] = result
+    return report
+
+
+def _index_model(spec):
+    options = {key: value for key, value in spec.items() if key != "keys"}
+    return IndexModel(spec["keys"], **options)
+
+
+def _normalize(info):
+    keys = info.get("keys", info.get("key"))
+    text = any(direction == "text" for _, direction in keys)
+    if text:
+        # The server reports a text index as _fts/_ftsx keys plus weights,
+        # with weight 1 for fields the spec gave none.
+        weights = {field: 1 for field, direction in keys
+                   if direction == "text" and field != "_fts"}
+        weights.update(info.get("weights", {}))
+        keys = _text_keys(keys)
+    normalized = {"keys": [[field, int(direction)
+                            if isinstance(direction, (int, float))
+                            else direction]
+                           for field, direction in keys]}
+    if text:
+        normalized["weights"] = {field: int(weight)
+                                 for field, weight in weights.items()}
+        normalized["default_language"] = info.get("default_language",
+                                                  "english")
+    for option in COMPARED_OPTIONS:
+        if option in info:
+            normalized[option] = info[option]
+    return normalized
+
+
+def _text_keys(keys):
+    collapsed = []
+    for field, direction in keys:
+        if direction == "text" or field == "_ftsx":
+            if ("_fts", "text") not in collapsed:
+                collapsed.extend([("_fts", "text"), ("_ftsx", 1)])
+        else:
+            collapsed.append((field, direction))
+    return collapsed
+
+
+"""
+    Command line entry point for provisioning at deploy time
+
+    Usage (from the functions directory):
+        MONGO_HOST=... python -m common.indexes [--dry-run] [--repair]
+
+    Exits with status 1 when drift is left unrepaired.
+"""
+
+
+def main(argv=None):
+    from common.db import get_client
+
+    parser = argparse.ArgumentParser(
+        description="Provision MongoDB indexes for the task API")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="report changes without applying them")
+    parser.add_argument("--repair", action="store_true",
+                        help="drop and recreate drifted indexes")
+    args = parser.parse_args(argv)
+
+    client = get_client()
+    if client is None:
+        print("MongoDB client could not be created, check MONGO_HOST",
+              file=sys.stderr)
+        return 2
+    report = ensure_indexes(client[DATABASE_NAME], dry_run=args.dry_run,
+                            repair=args.repair)
+    print(json.dumps(report, indent=2))
+    if any(result["drifted"] for result in report.values()):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
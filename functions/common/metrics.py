@@ -0,0 +1,157 @@
+import os
+import sys
+import json
+import time
+import random
+import logging
+import functools
+import contextvars
+from contextlib import contextmanager
+from common.monitoring import track
+
+logger = logging.getLogger()
+
+"""
+    Per-request phase timing emitted as CloudWatch Embedded Metric Format
+
+    - METRICS_ENABLED: "false" turns instrumentation off (default "true")
+    - METRICS_SAMPLE_RATE: fraction of invocations measured, 0 to 1
+      (default 1)
+    - METRICS_NAMESPACE: CloudWatch namespace (default "TasksDashboard")
+
+    Each measured invocation prints one EMF record to stdout, which Lambda
+    ships to CloudWatch Logs where it becomes metrics: duration plus the
+    time spent in each phase (parse, validate, db, serialize) and the
+    MongoDB round trips counted by common.monitoring, with route and
+    status and with route and cold or warm start as dimensions. The
+    aws_request_id and the commands sent are properties of the record,
+    searchable in Logs Insights without becoming dimensions.
+"""
+
+ENABLED = os.environ.get('METRICS_ENABLED', 'true').lower() != 'false'
+SAMPLE_RATE = float(os.environ.get('METRICS_SAMPLE_RATE', '1'))
+NAMESPACE = os.environ.get('METRICS_NAMESPACE', 'TasksDashboard')
+PHASES = ('parse', 'validate', 'db', 'serialize')
+DIMENSIONS = [["route", "status"], ["route", "start"]]
+
+_phases = contextvars.ContextVar('metrics_phases', default=None)
+_cold_start = True
+
+
+"""
+    Times the enclosed block as one phase of the current request
+
+    Time adds up when a phase is entered more than once. Outside an
+    instrumented, sampled invocation this does nothing.
+
+    Args:
+        name (str): Phase name, one of PHASES
+"""
+
+
+@contextmanager
+def phase(name):
+    phases = _phases.get()
+    if phases is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        phases[name] = phases.get(name, 0.0) + \
+            (time.perf_counter() - started) * 1000
+
+
+"""
+    Wraps a handler to time it and emit its metrics
+
+    The route comes from the event routeKey and falls back to the handler
+    name for events without one.
+
+    Args:
+        handler (callable): Lambda handler taking (event, context)
+
+    Returns:
+        callable
+"""
+
+
+def instrument(handler):
+    @functools.wraps(handler)
+    def wrapper(event, context):
+        global _cold_start
+        cold_start, _cold_start = _cold_start, False
+        if not ENABLED or random.random() >= SAMPLE_RATE:
+            return handler(event, context)
+        phases = {}
+        token = _phases.set(phases)
+        status = 500
+        started = time.perf_counter()
+        try:
+            with track() as commands:
+                response = handler(event, context)
+            status = response.get('statusCode', 200)
+            return response
+        finally:
+            duration = (time.perf_counter() - started) * 1000
+            _phases.reset(token)
+            emit(emf_record(
+                (event or {}).get('routeKey') or handler.__name__, status,
+                cold_start, getattr(context, 'aws_request_id', None),
+                duration, phases, commands))
+    return wrapper
+
+
+"""
+    Builds the EMF record of one invocation
+
+    Args:
+        route (str): Route key, e.g. "GET /"
+        status (int): Response status code
+        cold_start (bool): First invocation of this container
+        request_id (str|None): aws_request_id from the Lambda context
+        duration (float): Handler time in milliseconds
+        phases (dict): Milliseconds per phase
+        commands (dict|None): Command stats from common.monitoring.track
+
+    Returns:
+        dict
+"""
+
+
+def emf_record(route, status, cold_start, request_id, duration, phases,
+               commands=None):
+    metrics = [{"Name": "duration", "Unit": "Milliseconds"}]
+    metrics.extend({"Name": name, "Unit": "Milliseconds"} for name in phases)
+    if commands is not None:
+        metrics.append({"Name": "db_round_trips", "Unit": "Count"})
+    record = {
+        "_aws": {
+            "Timestamp": int(time.time() * 1000),
+            "CloudWatchMetrics": [{
+                "Namespace": NAMESPACE,
+                "Dimensions": DIMENSIONS,
+                "Metrics": metrics,
+            }],
+        },
+        "route": route,
+        "status": str(status),
+        "start": "cold" if cold_start else "warm",
+        "aws_request_id": request_id,
+        "duration": round(duration, 3),
+    }
+    for name, value in phases.items():
+        record[name] = round(value, 3)
+    if commands is not None:
+        record["db_round_trips"] = commands['round_trips']
+        record["db_commands"] = commands['commands']
+    return record
+
+
+def emit(record):
+    try:
+        sys.stdout.write(json.dumps(record) + '\n')
+        sys.stdout.flush()
+    except Exception as e:
+        logger.error(f"Error emitting metrics: {e}")
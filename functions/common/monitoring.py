@@ -0,0 +1,153 @@
+import os
+import logging
+import contextvars
+from contextlib import contextmanager
+from pymongo import monitoring
+
+logger = logging.getLogger()
+
+"""
+    MongoDB command monitoring for the shared client
+
+    - MONGO_COMMAND_MONITORING: "false" leaves the listener off the client
+      (default "true")
+    - MONGO_SLOW_MS: log commands taking at least this long (default 100)
+
+    Every command the client sends is one round trip, including the
+    getMore calls a cursor makes when a result spans several batches.
+    Inside track() the commands of the current invocation are counted
+    and timed; slow commands are logged whether tracked or not, with
+    their filter shape (values replaced by 1) so no task data is logged.
+"""
+
+ENABLED = os.environ.get('MONGO_COMMAND_MONITORING',
+                         'true').lower() != 'false'
+SLOW_MS = float(os.environ.get('MONGO_SLOW_MS', '100'))
+
+# Collection methods that send commands; the test helpers count calls to
+# these on mocked collections as round trips.
+COLLECTION_OPERATIONS = frozenset([
+    'find', 'find_one', 'find_one_and_update', 'find_one_and_delete',
+    'insert_one', 'insert_many', 'update_one', 'update_many', 'replace_one',
+    'delete_one', 'delete_many', 'bulk_write', 'aggregate',
+    'count_documents', 'estimated_document_count', 'distinct',
+])
+
+_stats = contextvars.ContextVar('command_stats', default=None)
+
+
+"""
+    Counts and times the commands sent while the block runs
+
+    Yields:
+        dict - {"round_trips": int, "db_ms": float, "commands": {name: n}},
+        filled in as commands complete
+"""
+
+
+@contextmanager
+def track():
+    stats = {'round_trips': 0, 'db_ms': 0.0, 'commands': {}}
+    token = _stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _stats.reset(token)
+
+
+"""
+    Reduces a filter to its shape: keys and operators, values as 1
+
+    Args:
+        value: Filter or part of one
+
+    Returns:
+        Same structure with every leaf value replaced by 1
+"""
+
+
+def query_shape(value):
+    if isinstance(value, dict):
+        return {key: query_shape(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)) and value and \
+            all(isinstance(item, dict) for item in value):
+        return [query_shape(item) for item in value]
+    return 1
+
+
+"""
+    Finds the filter of a command, for the commands handlers send
+
+    Args:
+        command (dict): Command document from a CommandStartedEvent
+
+    Returns:
+        dict|None
+"""
+
+
+def command_filter(command):
+    for key in ('filter', 'query'):
+        if isinstance(command.get(key), dict):
+            return command[key]
+    for key in ('updates', 'deletes'):
+        statements = command.get(key)
+        if statements:
+            return statements[0].get('q')
+    pipeline = command.get('pipeline')
+    if pipeline and '$match' in pipeline[0]:
+        return pipeline[0]['$match']
+    return None
+
+
+"""
+    pymongo listener feeding track() and the slow command log
+
+    The started event carries the command and the finished one the
+    duration, so the name and filter shape of each command in flight are
+    kept until it finishes.
+"""
+
+
+class CommandMonitor(monitoring.CommandListener):
+
+    def __init__(self, slow_ms=None):
+        self.slow_ms = SLOW_MS if slow_ms is None else slow_ms
+        self._pending = {}
+
+    def started(self, event):
+        command = event.command
+        # getMore names its cursor id; the collection comes separately.
+        target = command.get('collection') or command.get(event.command_name)
+        self._pending[(event.connection_id, event.request_id)] = (
+            event.command_name, target, command_filter(command))
+
+    def succeeded(self, event):
+        self._finished(event)
+
+    def failed(self, event):
+        self._finished(event)
+
+    def _finished(self, event):
+        pending = self._pending.pop((event.connection_id, event.request_id),
+                                    None)
+        if pending is None:
+            return
+        name, target, query = pending
+        duration = event.duration_micros / 1000
+        stats = _stats.get()
+        if stats is not None:
+            stats['round_trips'] += 1
+            stats['db_ms'] += duration
+            stats['commands'][name] = stats['commands'].get(name, 0) + 1
+        if duration >= self.slow_ms:
+            shape = query_shape(query) if query is not None else None
+            logger.warning(f"Slow MongoDB command: {name} on {target} took "
+                           f"{duration:.1f}ms, filter shape {shape}")
+
+
+command_monitor = CommandMonitor()
+
+
+def event_listeners():
+    return [command_monitor] if ENABLED else []
@@ -0,0 +1,72 @@
+from common.ids import utc_timestamp
+
+TASK_FIELDS = ("title", "description", "priority", "status")
+TIMESTAMP_FIELDS = ("created_at", "updated_at")
+VALID_PRIORITIES = ("low", "medium", "high")
+VALID_STATUSES = ("todo", "in-progress", "in-review", "done", "blocked")
+
+FILTER_FIELDS = {
+    "status": VALID_STATUSES,
+    "priority": VALID_PRIORITIES,
+}
+
+
+"""
+    Builds a Mongo filter on the indexed status and priority fields
+
+    Args:
+        criteria (dict): Field name to a value or list of values
+
+    Returns:
+        dict
+
+    Raises:
+        ValueError: when a field or value is not allowed
+"""
+
+
+def build_filter(criteria):
+    query = {}
+    for field, values in criteria.items():
+        if field not in FILTER_FIELDS:
+            raise ValueError(f"invalid filter field: {field}")
+        if isinstance(values, str):
+            values = [values]
+        if not isinstance(values, list) or not values:
+            raise ValueError(f"invalid {field}: {values}")
+        for value in values:
+            if value not in FILTER_FIELDS[field]:
+                raise ValueError(f"invalid {field}: {value}")
+        values = list(dict.fromkeys(values))
+        query[field] = values[0] if len(values) == 1 else {'$in': values}
+    return query
+
+
+"""
+    Builds an update that only touches tasks whose fields would change
+
+    The update is a pipeline, so version and updated_at move only on
+    tasks where at least one field differs from the value being set.
+    Tasks that already hold every value are left byte for byte as they
+    were: they still count as matched but not as modified, and their
+    version (the ETag concurrent editors send in If-Match) stays put.
+    Values go through $literal so strings starting with "$" are not read
+    as field paths.
+
+    Args:
+        fields (dict): Validated task fields to set
+
+    Returns:
+        list - update pipeline for update_many or UpdateOne
+"""
+
+
+def changed_fields_update(fields):
+    changed = {"$or": [{"$ne": [f"${field}", {"$literal": value}]}
+                       for field, value in fields.items()]}
+    update = {field: {"$literal": value} for field, value in fields.items()}
+    update["updated_at"] = {"$cond": [changed, utc_timestamp(),
+                                      "$updated_at"]}
+    update["version"] = {"$cond": [
+        changed, {"$add": [{"$ifNull": ["$version", 0]}, 1]}, "$version"]}
+    return [{"$set": update}]
@@ -0,0 +1,74 @@
+import os
+import json
+from bson import json_util
+
+DEFAULT_BATCH_SIZE = int(os.environ.get('SERIALIZER_BATCH_SIZE', '1000'))
+
+# Task documents hold only str and int values (plus None/bool), which the
+# C accelerated json encoder handles without calling back into Python.
+# Anything else (ObjectId, datetime, Decimal128, ...) reaches
+# json_util.default, so output matches bson.json_util.dumps.
+_encoder = json.JSONEncoder(default=json_util.default)
+
+"""
+    Encodes a document, list of documents or any JSON value
+
+    Args:
+        value: Value to encode
+
+    Returns:
+        str - the same text bson.json_util.dumps(value) produces
+"""
+
+
+def encode(value):
+    return _encoder.encode(value)
+
+
+"""
+    Streams documents into a response buffer as a JSON array
+
+    Documents are collected from the cursor batch_size at a time and each
+    batch is encoded straight into the buffer, so the full result set is
+    never held as a Python list alongside its encoded form.
+
+    Args:
+        documents (iterable): Cursor or any iterable of documents
+        buffer (io.StringIO): Buffer the JSON array is written to
+        limit (int|None): Stop after this many documents
+        batch_size (int): Number of encoded documents per buffer write
+
+    Returns:
+        tuple (count, last_document, has_more)
+"""
+
+
+def write_json_array(documents, buffer, limit=None,
+                     batch_size=DEFAULT_BATCH_SIZE):
+    buffer.write('[')
+    batch = []
+    count = 0
+    last_document = None
+    has_more = False
+    for document in documents:
+        if limit is not None and count == limit:
+            has_more = True
+            break
+        batch.append(document)
+        count += 1
+        last_document = document
+        if len(batch) == batch_size:
+            _flush(buffer, batch, count)
+    if batch:
+        _flush(buffer, batch, count)
+    buffer.write(']')
+    return count, last_document, has_more
+
+
+def _flush(buffer, batch, count):
+    if count > len(batch):
+        buffer.write(',')
+    # Encoding the batch as one array and dropping the brackets keeps the
+    # per-call overhead of the encoder off the per-document path.
+    buffer.write(encode(batch)[1:-1])
+    batch.clear()
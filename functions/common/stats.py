@@ -0,0 +1,44 @@
+import os
+from common.schema import VALID_PRIORITIES, VALID_STATUSES
+
+# Recompute stored stats this often even without API writes, to pick up
+# writes made outside the API.
+STATS_TTL_SECONDS = float(os.environ.get('STATS_TTL_SECONDS', '60'))
+
+# Sorting on the grouped fields lets the planner walk the
+# status_1_priority_1__id_1 index instead of fetching documents.
+STATS_PIPELINE = [
+    {"$sort": {"status": 1, "priority": 1}},
+    {"$group": {"_id": {"status": "$status", "priority": "$priority"},
+                "count": {"$sum": 1}}},
+]
+
+
+"""
+    Folds the groups of STATS_PIPELINE into counts by status and priority
+
+    Tasks whose status or priority is missing or unknown count towards the
+    total only.
+
+    Args:
+        groups (iterable): Documents returned by STATS_PIPELINE
+
+    Returns:
+        dict - {"total": int, "status": {...}, "priority": {...}}
+"""
+
+
+def tally_stats(groups):
+    by_status = dict.fromkeys(VALID_STATUSES, 0)
+    by_priority = dict.fromkeys(VALID_PRIORITIES, 0)
+    total = 0
+    for group in groups:
+        count = group['count']
+        total += count
+        status = group['_id'].get('status')
+        priority = group['_id'].get('priority')
+        if status in by_status:
+            by_status[status] += count
+        if priority in by_priority:
+            by_priority[priority] += count
+    return {'total': total, 'status': by_status, 'priority': by_priority}
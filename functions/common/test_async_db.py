@@ -0,0 +1,55 @@
+import asyncio
+import unittest
+from unittest.mock import patch, AsyncMock
+
+from common import async_db
+from common.monitoring import command_monitor
+
+
+class TestAsyncClient(unittest.TestCase):
+
+    def tearDown(self):
+        async_db._client = None
+
+    def test_client_is_created_lazily_and_reused(self):
+        with patch('common.async_db.AsyncMongoClient') as mock_mongo, \
+                patch('common.monitoring.ENABLED', True):
+            self.assertIsNone(async_db._client)
+            first = async_db.get_async_client()
+            second = async_db.get_async_client()
+
+            self.assertIs(first, second)
+            mock_mongo.assert_called_once()
+            self.assertEqual(mock_mongo.call_args[1]['event_listeners'],
+                             [command_monitor])
+
+    def test_failure_is_retried_on_next_call(self):
+        with patch('common.async_db.AsyncMongoClient') as mock_mongo:
+            mock_mongo.side_effect = [Exception("DNS failure"), "client"]
+
+            self.assertIsNone(async_db.get_async_client())
+            self.assertEqual(async_db.get_async_client(), "client")
+
+    def test_reset_closes_client(self):
+        with patch('common.async_db.AsyncMongoClient') as mock_mongo:
+            mock_mongo.return_value.close = AsyncMock()
+            first = async_db.get_async_client()
+            async_db.reset_async_client()
+            async_db.get_async_client()
+
+            first.close.assert_awaited_once()
+            self.assertEqual(mock_mongo.call_count, 2)
+
+    def test_invocations_share_one_loop(self):
+        async def current_loop():
+            return asyncio.get_running_loop()
+
+        first = async_db.run(current_loop())
+        second = async_db.run(current_loop())
+
+        self.assertIs(first, second)
+        self.assertFalse(first.is_closed())
+
+
+if __name__ == '__main__':
+    unittest.main()
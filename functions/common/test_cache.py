@@ -0,0 +1,63 @@
+import unittest
+
+from common.cache import ResponseCache
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+def response(body):
+    return {'statusCode': 200, 'body': body}
+
+
+class TestResponseCache(unittest.TestCase):
+
+    def test_hit_and_miss_counters(self):
+        cache = ResponseCache()
+        self.assertIsNone(cache.get('a'))
+        cache.put('a', response('[]'))
+
+        self.assertEqual(cache.get('a'), response('[]'))
+        self.assertEqual(cache.stats(), {'hits': 1, 'misses': 1,
+                                         'entries': 1, 'bytes': 2})
+
+    def test_entries_expire(self):
+        clock = FakeClock()
+        cache = ResponseCache(ttl_seconds=10, clock=clock)
+        cache.put('a', response('[]'))
+        clock.now = 10
+
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.stats()['entries'], 0)
+
+    def test_least_recently_used_is_evicted(self):
+        cache = ResponseCache(max_entries=2)
+        cache.put('a', response('a'))
+        cache.put('b', response('b'))
+        cache.get('a')
+        cache.put('c', response('c'))
+
+        self.assertIsNotNone(cache.get('a'))
+        self.assertIsNone(cache.get('b'))
+        self.assertIsNotNone(cache.get('c'))
+
+    def test_bounded_by_bytes(self):
+        cache = ResponseCache(max_bytes=10)
+        cache.put('a', response('x' * 6))
+        cache.put('b', response('x' * 6))
+        cache.put('huge', response('x' * 11))
+
+        self.assertIsNone(cache.get('a'))
+        self.assertIsNotNone(cache.get('b'))
+        self.assertIsNone(cache.get('huge'))
+        self.assertEqual(cache.stats()['bytes'], 6)
+
+
+if __name__ == '__main__':
+    unittest.main()
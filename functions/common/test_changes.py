@@ -0,0 +1,77 @@
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, MagicMock
+
+import mongomock
+from pymongo.errors import DuplicateKeyError
+
+from common.changes import (bump_collection_version, get_collection_version,
+                            get_marker, get_marker_async, save_snapshot,
+                            save_snapshot_async)
+
+
+class TestChanges(unittest.TestCase):
+
+    def test_bump_and_read_version(self):
+        db = MagicMock()
+        db.meta.find_one.return_value = None
+
+        bump_collection_version(db)
+
+        db.meta.update_one.assert_called_once_with(
+            {"_id": "tasks"}, {"$inc": {"version": 1}}, upsert=True)
+        self.assertEqual(get_collection_version(db), 0)
+        self.assertEqual(get_marker(db), {})
+
+    def test_snapshot_is_stored_at_its_version(self):
+        db = MagicMock()
+        db.meta.update_one.return_value.matched_count = 1
+
+        self.assertTrue(save_snapshot(db, 3, 'stats', {'total': 1}))
+        db.meta.update_one.assert_called_once_with(
+            {"_id": "tasks", "version": 3},
+            {"$set": {"stats": {'total': 1}}}, upsert=True)
+
+    def test_snapshot_before_any_write(self):
+        db = mongomock.MongoClient().tasks_dashboard
+
+        self.assertTrue(save_snapshot(db, 0, 'stats', {'total': 1}))
+
+        self.assertEqual(get_collection_version(db), 0)
+        self.assertEqual(get_marker(db)['stats'], {'total': 1})
+        # The marker stays at version 0 for later snapshots and bumps.
+        self.assertTrue(save_snapshot(db, 0, 'stats', {'total': 2}))
+        bump_collection_version(db)
+        self.assertEqual(get_collection_version(db), 1)
+
+    def test_marker_without_version(self):
+        # As stored by snapshots written before the version was set.
+        db = mongomock.MongoClient().tasks_dashboard
+        db.meta.insert_one({"_id": "tasks", "stats": {}})
+
+        self.assertEqual(get_collection_version(db), 0)
+        self.assertTrue(save_snapshot(db, 0, 'stats', {'total': 1}))
+
+    def test_snapshot_raced_by_a_write_is_dropped(self):
+        db = MagicMock()
+        db.meta.update_one.side_effect = DuplicateKeyError("E11000")
+
+        self.assertFalse(save_snapshot(db, 3, 'stats', {}))
+
+    def test_async_marker_and_snapshot(self):
+        db = MagicMock()
+        db.meta.find_one = AsyncMock(return_value=None)
+        db.meta.update_one = AsyncMock(side_effect=[
+            MagicMock(matched_count=1), DuplicateKeyError("E11000")])
+
+        self.assertEqual(asyncio.run(get_marker_async(db)), {})
+        self.assertTrue(asyncio.run(save_snapshot_async(db, 0, 'stats', {})))
+        self.assertFalse(asyncio.run(save_snapshot_async(db, 3, 'stats', {})))
+        query, update = db.meta.update_one.call_args_list[0][0]
+        self.assertEqual(query, {"_id": "tasks",
+                                 "version": {"$in": [0, None]}})
+        self.assertEqual(update["$setOnInsert"], {"version": 0})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import base64
+import gzip
+import unittest
+from unittest.mock import patch
+
+from common import compression
+from common.compression import negotiate_encoding, compress_response
+
+
+def event(accept_encoding):
+    return {'headers': {'accept-encoding': accept_encoding}}
+
+
+class TestNegotiateEncoding(unittest.TestCase):
+
+    def test_no_header(self):
+        self.assertIsNone(negotiate_encoding({}))
+
+    def test_gzip(self):
+        with patch.object(compression, 'SUPPORTED_ENCODINGS', ('gzip',)):
+            self.assertEqual(negotiate_encoding(event('gzip, deflate')),
+                             'gzip')
+            self.assertIsNone(negotiate_encoding(event('deflate')))
+            self.assertIsNone(negotiate_encoding(event('gzip;q=0')))
+            self.assertEqual(negotiate_encoding(event('*')), 'gzip')
+
+    def test_brotli_preferred_when_available(self):
+        with patch.object(compression, 'SUPPORTED_ENCODINGS',
+                          ('br', 'gzip')):
+            self.assertEqual(negotiate_encoding(event('gzip, br')), 'br')
+            self.assertEqual(negotiate_encoding(event('gzip, br;q=0.5')),
+                             'gzip')
+
+
+class TestCompressResponse(unittest.TestCase):
+
+    def test_large_body_is_gzipped(self):
+        body = '[' + ','.join(['{"title": "Task"}'] * 200) + ']'
+        response = {'statusCode': 200,
+                    'headers': {'Content-Type': 'application/json'},
+                    'body': body}
+        compressed = compress_response(response, 'gzip')
+
+        self.assertTrue(compressed['isBase64Encoded'])
+        self.assertEqual(compressed['headers']['Content-Encoding'], 'gzip')
+        self.assertEqual(compressed['headers']['Vary'], 'Accept-Encoding')
+        self.assertEqual(
+            gzip.decompress(base64.b64decode(compressed['body'])).decode(),
+            body)
+        self.assertNotIn('Content-Encoding', response['headers'])
+
+    def test_small_body_is_left_alone(self):
+        response = {'statusCode': 200, 'headers': {}, 'body': '[]'}
+        result = compress_response(response, 'gzip')
+
+        self.assertEqual(result['body'], '[]')
+        self.assertNotIn('isBase64Encoded', result)
+        self.assertNotIn('Content-Encoding', result['headers'])
+
+    def test_identity(self):
+        response = {'statusCode': 200, 'headers': {}, 'body': 'x' * 5000}
+        result = compress_response(response, None)
+
+        self.assertEqual(result['body'], response['body'])
+        self.assertEqual(result['headers'], {'Vary': 'Accept-Encoding'})
+
+
+if __name__ == '__main__':
+    unittest.main()
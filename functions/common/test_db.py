@@ -0,0 +1,72 @@
+import os
+import unittest
+from unittest.mock import patch
+
+from common import db
+from common.monitoring import command_monitor
+
+
+class TestGetClient(unittest.TestCase):
+
+    def tearDown(self):
+        db._client = None
+
+    def test_client_is_created_lazily_and_reused(self):
+        with patch('common.db.MongoClient') as mock_mongo:
+            self.assertIsNone(db._client)
+            first = db.get_client()
+            second = db.get_client()
+
+            self.assertIs(first, second)
+            mock_mongo.assert_called_once()
+            mock_mongo.return_value.admin.command.assert_not_called()
+
+    def test_command_monitor_is_registered(self):
+        with patch('common.db.MongoClient') as mock_mongo, \
+                patch('common.monitoring.ENABLED', True):
+            db.get_client()
+
+            self.assertEqual(mock_mongo.call_args[1]['event_listeners'],
+                             [command_monitor])
+
+    def test_failure_is_retried_on_next_call(self):
+        with patch('common.db.MongoClient') as mock_mongo:
+            mock_mongo.side_effect = [Exception("DNS failure"), "client"]
+
+            self.assertIsNone(db.get_client())
+            self.assertEqual(db.get_client(), "client")
+
+    def test_reset_client_reconnects(self):
+        with patch('common.db.MongoClient') as mock_mongo:
+            first = db.get_client()
+            db.reset_client()
+            db.get_client()
+
+            first.close.assert_called_once()
+            self.assertEqual(mock_mongo.call_count, 2)
+
+    def test_options_from_environment(self):
+        env = {
+            'MONGO_MAX_POOL_SIZE': '2',
+            'MONGO_SERVER_SELECTION_TIMEOUT_MS': '1500',
+            'MONGO_MAX_IDLE_TIME_MS': '30000',
+            'MONGO_COMPRESSORS': 'zstd,snappy',
+        }
+        with patch.dict(os.environ, env):
+            self.assertEqual(db.client_options(), {
+                'maxPoolSize': 2,
+                'serverSelectionTimeoutMS': 1500,
+                'maxIdleTimeMS': 30000,
+                'compressors': 'zstd,snappy',
+            })
+
+    def test_default_options(self):
+        with patch.dict(os.environ, {}, clear=True):
+            options = db.client_options()
+
+            self.assertEqual(options['maxPoolSize'], 10)
+            self.assertNotIn('compressors', options)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import unittest
+
+from common.etags import (format_etag, parse_if_match, version_condition,
+                          collection_etag, encoded_etag, if_none_match)
+
+
+class TestEtags(unittest.TestCase):
+
+    def test_format_etag(self):
+        self.assertEqual(format_etag(3), '"3"')
+        self.assertEqual(format_etag(None), '"0"')
+
+    def test_parse_if_match(self):
+        self.assertIsNone(parse_if_match({}))
+        self.assertIsNone(parse_if_match({'headers': {'if-match': '*'}}))
+        self.assertEqual(
+            parse_if_match({'headers': {'if-match': '"2", "5"'}}), [2, 5])
+        self.assertEqual(
+            parse_if_match({'headers': {'if-match': 'W/"2"'}}), [])
+        self.assertEqual(
+            parse_if_match({'headers': {'if-match': '"abc"'}}), [])
+        # ETags of compressed GET /task responses name the same version.
+        self.assertEqual(
+            parse_if_match({'headers': {'if-match': '"3-gzip", "4-br"'}}),
+            [3, 4])
+        self.assertEqual(
+            parse_if_match({'headers': {'if-match': '"3-deflate"'}}), [])
+
+    def test_version_condition(self):
+        self.assertEqual(version_condition([2]), {'$in': [2]})
+        self.assertEqual(version_condition([0]), {'$in': [0, None]})
+
+
+    def test_collection_etag(self):
+        etag = collection_etag(4, {"status": "done", "limit": "10"})
+
+        self.assertEqual(etag, collection_etag(
+            4, {"limit": "10", "status": "done"}))
+        self.assertNotEqual(etag, collection_etag(5, {"status": "done",
+                                                      "limit": "10"}))
+        self.assertNotEqual(etag, collection_etag(4, {"status": "done"}))
+        self.assertTrue(etag.startswith('"') and etag.endswith('"'))
+
+    def test_encoded_etag(self):
+        self.assertEqual(encoded_etag('"c5-abc"', None), '"c5-abc"')
+        self.assertEqual(encoded_etag('"c5-abc"', 'gzip'), '"c5-abc-gzip"')
+        self.assertEqual(encoded_etag('"2"', 'br'), '"2-br"')
+
+    def test_if_none_match(self):
+        etag = '"c1-abc"'
+        self.assertFalse(if_none_match({}, etag))
+        self.assertTrue(if_none_match(
+            {'headers': {'if-none-match': '"c0-x", "c1-abc"'}}, etag))
+        self.assertTrue(if_none_match(
+            {'headers': {'if-none-match': 'W/"c1-abc"'}}, etag))
+        self.assertTrue(if_none_match(
+            {'headers': {'if-none-match': '*'}}, etag))
+        self.assertFalse(if_none_match(
+            {'headers': {'if-none-match': '"c2-abc"'}}, etag))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import datetime
+import unittest
+from unittest.mock import MagicMock
+
+from pymongo.errors import DuplicateKeyError
+
+from common.idempotency import (IDEMPOTENCY_LEASE_SECONDS, claim_key,
+                                fingerprint, idempotency_key, lease_expired,
+                                take_over_key)
+
+
+class TestIdempotency(unittest.TestCase):
+
+    def test_idempotency_key_header(self):
+        self.assertIsNone(idempotency_key({}))
+        self.assertEqual(idempotency_key(
+            {"headers": {"idempotency-key": " abc "}}), "abc")
+        for key in ("", "  ", "k" * 256):
+            with self.assertRaises(ValueError):
+                idempotency_key({"headers": {"idempotency-key": key}})
+
+    def test_fingerprint_tells_bodies_apart(self):
+        self.assertEqual(fingerprint('{"a": 1}'), fingerprint('{"a": 1}'))
+        self.assertNotEqual(fingerprint('{"a": 1}'), fingerprint('{"a": 2}'))
+
+    def test_claim_is_refused_when_taken(self):
+        db = MagicMock()
+
+        locked_until = claim_key(db, "k", "f", {})
+        claim = db.idempotency_keys.insert_one.call_args[0][0]
+        self.assertIsNotNone(claim['created_at'].tzinfo)
+        self.assertEqual(claim['locked_until'], locked_until)
+        self.assertEqual(locked_until - claim['created_at'],
+                         datetime.timedelta(seconds=IDEMPOTENCY_LEASE_SECONDS))
+        # Whole milliseconds, as BSON stores them.
+        self.assertEqual(locked_until.microsecond % 1000, 0)
+
+        db.idempotency_keys.insert_one.side_effect = \
+            DuplicateKeyError("E11000")
+        self.assertIsNone(claim_key(db, "k", "f", {}))
+
+    def test_lease_expired(self):
+        now = datetime.datetime.now(datetime.timezone.utc)
+        lease = datetime.timedelta(seconds=IDEMPOTENCY_LEASE_SECONDS)
+        # pymongo hands dates back naive.
+        past = (now - datetime.timedelta(seconds=1)).replace(tzinfo=None)
+        future = (now + datetime.timedelta(seconds=5)).replace(tzinfo=None)
+
+        self.assertTrue(lease_expired({"locked_until": past}))
+        self.assertFalse(lease_expired({"locked_until": future}))
+        # Keys claimed before leases count from created_at.
+        self.assertTrue(lease_expired({"created_at": past - lease}))
+        self.assertFalse(lease_expired({"created_at": past}))
+        self.assertFalse(lease_expired({}))
+
+    def test_take_over_is_conditional_on_the_lease_read(self):
+        db = MagicMock()
+        old = datetime.datetime(2024, 1, 1)
+        db.idempotency_keys.update_one.return_value = MagicMock(
+            modified_count=1)
+
+        self.assertIsNotNone(take_over_key(db, "k", {"locked_until": old}))
+        query = db.idempotency_keys.update_one.call_args[0][0]
+        self.assertEqual(query, {"_id": "k", "status": "pending",
+                                 "locked_until": old})
+
+        db.idempotency_keys.update_one.return_value = MagicMock(
+            modified_count=0)
+        self.assertIsNone(take_over_key(db, "k", {"locked_until": old}))
+
+
+if __name__ == '__main__':
+    unittest.main()
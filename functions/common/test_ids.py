@@ -0,0 +1,45 @@
+import re
+import time
+import uuid
+import unittest
+from unittest.mock import patch
+
+from common.ids import new_task_id, utc_timestamp
+
+
+class TestIds(unittest.TestCase):
+
+    def test_task_id_is_uuid7_string(self):
+        task_id = new_task_id()
+        parsed = uuid.UUID(task_id)
+
+        self.assertEqual(parsed.version, 7)
+        self.assertEqual(parsed.variant, uuid.RFC_4122)
+        # Same string form as the uuid4 ids already stored.
+        self.assertEqual(task_id, str(parsed))
+        self.assertEqual(len(task_id), len(str(uuid.uuid4())))
+        self.assertAlmostEqual(parsed.int >> 80, time.time() * 1000,
+                               delta=1000)
+
+    def test_task_ids_are_strictly_increasing(self):
+        ids = [new_task_id() for _ in range(10000)]
+
+        self.assertEqual(ids, sorted(ids))
+        self.assertEqual(len(set(ids)), len(ids))
+
+    def test_counter_overflow_advances_timestamp(self):
+        with patch.multiple('common.ids', _last_ms=0, _counter=0), \
+                patch('common.ids.time.time_ns', return_value=5_000_000_000):
+            ids = [uuid.UUID(new_task_id()) for _ in range(5000)]
+
+        self.assertEqual(ids, sorted(ids))
+        self.assertEqual(ids[0].int >> 80, 5000)
+        self.assertEqual(ids[-1].int >> 80, 5001)
+
+    def test_utc_timestamp_format(self):
+        self.assertRegex(utc_timestamp(),
+                         re.compile(r'^\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d\.\d{3}Z$'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,20 @@
+import io
+import unittest
+from unittest.mock import patch
+
+from common.indexes import main
+
+
+class TestIndexesMain(unittest.TestCase):
+
+    def test_exits_non_zero_without_client(self):
+        with patch('common.db.get_client', return_value=None), \
+                patch('sys.stderr', new_callable=io.StringIO) as stderr:
+            self.assertEqual(main([]), 2)
+
+        self.assertIn('MongoDB client could not be created',
+                      stderr.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import glob
+import json
+import os
+import subprocess
+import sys
+import unittest
+
+FUNCTIONS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Milliseconds a handler may add on top of importing pymongo, which every
+# handler pays and which dominates init (~150ms). Handlers measure ~5ms.
+HANDLER_IMPORT_BUDGET_MS = 100
+
+CHILD = r'''
+import json
+import sys
+import time
+
+sys.path[:0] = [sys.argv[2], sys.argv[1]]
+import pymongo  # noqa: E402,F401
+started = time.perf_counter()
+import handler  # noqa: E402,F401
+elapsed = (time.perf_counter() - started) * 1000
+from common import db  # noqa: E402
+print(json.dumps({'import_ms': elapsed,
+                  'client_created': db._client is not None}))
+'''
+
+
+class TestInitTime(unittest.TestCase):
+
+    def test_handlers_import_within_budget_without_connecting(self):
+        handler_dirs = sorted(os.path.dirname(path) for path in glob.glob(
+            os.path.join(FUNCTIONS_DIR, '*', 'handler.py')))
+        self.assertTrue(handler_dirs)
+        for handler_dir in handler_dirs:
+            with self.subTest(handler=os.path.basename(handler_dir)):
+                # An unroutable host makes any connection attempt at
+                # import show up as a timeout rather than pass silently.
+                env = dict(os.environ, MONGO_HOST='mongodb://10.255.255.1',
+                           MONGO_SERVER_SELECTION_TIMEOUT_MS='1')
+                output = subprocess.run(
+                    [sys.executable, '-c', CHILD, FUNCTIONS_DIR, handler_dir],
+                    check=True, capture_output=True, text=True, env=env,
+                    timeout=30).stdout
+                result = json.loads(output)
+
+                self.assertFalse(result['client_created'])
+                self.assertLess(result['import_ms'], HANDLER_IMPORT_BUDGET_MS)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import unittest
+from unittest.mock import patch
+
+from common import metrics
+from common.metrics import instrument, phase
+
+
+class Context:
+    aws_request_id = 'request-1'
+
+
+@instrument
+def handler(event, context):
+    with phase('parse'):
+        pass
+    with phase('db'):
+        pass
+    with phase('db'):
+        pass
+    return {'statusCode': 201, 'body': ''}
+
+
+class TestMetrics(unittest.TestCase):
+
+    def setUp(self):
+        patcher = patch('common.metrics.emit')
+        self.emit = patcher.start()
+        self.addCleanup(patcher.stop)
+        # Measure every invocation whatever METRICS_* the run inherits.
+        for name, value in (('ENABLED', True), ('SAMPLE_RATE', 1.0)):
+            patcher = patch(f'common.metrics.{name}', value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_emits_emf_record(self):
+        with patch('common.metrics._cold_start', True):
+            response = handler({'routeKey': 'POST /create'}, Context())
+            handler({'routeKey': 'POST /create'}, Context())
+
+        self.assertEqual(response['statusCode'], 201)
+        first, second = [call[0][0] for call in self.emit.call_args_list]
+        self.assertEqual(first['route'], 'POST /create')
+        self.assertEqual(first['status'], '201')
+        self.assertEqual(first['aws_request_id'], 'request-1')
+        self.assertEqual((first['start'], second['start']), ('cold', 'warm'))
+        self.assertEqual(set(first) & set(metrics.PHASES), {'parse', 'db'})
+        definition = first['_aws']['CloudWatchMetrics'][0]
+        self.assertEqual([m['Name'] for m in definition['Metrics']],
+                         ['duration', 'parse', 'db', 'db_round_trips'])
+        self.assertEqual(definition['Dimensions'], metrics.DIMENSIONS)
+
+    def test_route_falls_back_to_handler_name(self):
+        handler({}, {})
+
+        record = self.emit.call_args[0][0]
+        self.assertEqual(record['route'], 'handler')
+        self.assertIsNone(record['aws_request_id'])
+
+    def test_disabled_and_unsampled(self):
+        with patch('common.metrics.ENABLED', False):
+            handler({}, {})
+        with patch('common.metrics.SAMPLE_RATE', 0):
+            handler({}, {})
+
+        self.emit.assert_not_called()
+
+    def test_phase_outside_invocation_is_a_no_op(self):
+        with phase('db'):
+            pass
+
+        self.emit.assert_not_called()
+
+    def test_exception_is_reported_as_500(self):
+        @instrument
+        def failing(event, context):
+            raise RuntimeError("boom")
+
+        with self.assertRaises(RuntimeError):
+            failing({'routeKey': 'GET /'}, {})
+        self.assertEqual(self.emit.call_args[0][0]['status'], '500')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import unittest
+from types import SimpleNamespace
+
+from common.monitoring import (CommandMonitor, command_filter, query_shape,
+                               track)
+
+
+def started(name, command, request_id=1):
+    return SimpleNamespace(command_name=name, command=command,
+                           connection_id=('localhost', 27017),
+                           request_id=request_id)
+
+
+def finished(duration_ms, request_id=1):
+    return SimpleNamespace(duration_micros=int(duration_ms * 1000),
+                           connection_id=('localhost', 27017),
+                           request_id=request_id)
+
+
+class TestCommandMonitor(unittest.TestCase):
+
+    def test_query_shape_hides_values(self):
+        self.assertEqual(
+            query_shape({"_id": "task-1", "version": {"$in": [1, None]},
+                         "$or": [{"status": "todo"}, {"priority": "high"}]}),
+            {"_id": 1, "version": {"$in": 1},
+             "$or": [{"status": 1}, {"priority": 1}]})
+
+    def test_command_filter(self):
+        self.assertEqual(command_filter({"find": "tasks",
+                                         "filter": {"_id": "a"}}),
+                         {"_id": "a"})
+        self.assertEqual(command_filter({"findAndModify": "tasks",
+                                         "query": {"_id": "a"}}),
+                         {"_id": "a"})
+        self.assertEqual(command_filter({"delete": "tasks",
+                                         "deletes": [{"q": {"_id": "a"}}]}),
+                         {"_id": "a"})
+        self.assertEqual(command_filter({"aggregate": "tasks", "pipeline": [
+            {"$match": {"status": "todo"}}, {"$count": "n"}]}),
+            {"status": "todo"})
+        self.assertIsNone(command_filter({"insert": "tasks"}))
+
+    def test_track_counts_commands_of_the_block(self):
+        monitor = CommandMonitor(slow_ms=1000)
+        with track() as stats:
+            monitor.started(started("find", {"find": "tasks"}, 1))
+            monitor.succeeded(finished(2.5, 1))
+            monitor.started(started("getMore", {"getMore": 42,
+                                                "collection": "tasks"}, 2))
+            monitor.failed(finished(1.5, 2))
+        monitor.started(started("find", {"find": "tasks"}, 3))
+        monitor.succeeded(finished(1, 3))
+
+        self.assertEqual(stats, {'round_trips': 2, 'db_ms': 4.0,
+                                 'commands': {'find': 1, 'getMore': 1}})
+
+    def test_slow_commands_are_logged_with_shape(self):
+        monitor = CommandMonitor(slow_ms=50)
+        with self.assertLogs(level='WARNING') as logs:
+            monitor.started(started("find", {
+                "find": "tasks", "filter": {"status": "todo"}}))
+            monitor.succeeded(finished(75))
+
+        self.assertEqual(len(logs.output), 1)
+        self.assertIn("find on tasks took 75.0ms", logs.output[0])
+        self.assertIn("{'status': 1}", logs.output[0])
+        self.assertNotIn("todo", logs.output[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import unittest
+from unittest.mock import patch
+
+import mongomock
+
+from common.schema import build_filter, changed_fields_update
+
+NOW = "2024-01-01T00:00:00.000Z"
+
+
+class TestBuildFilter(unittest.TestCase):
+
+    def test_single_and_multiple_values(self):
+        self.assertEqual(
+            build_filter({"status": "done", "priority": ["low", "high"]}),
+            {"status": "done", "priority": {"$in": ["low", "high"]}})
+
+    def test_duplicate_values_collapse(self):
+        self.assertEqual(build_filter({"status": ["done", "done"]}),
+                         {"status": "done"})
+
+    def test_invalid_criteria(self):
+        for criteria in [{"title": "Task"}, {"status": "pending"},
+                         {"status": []}, {"priority": [{"$ne": "low"}]}]:
+            with self.assertRaises(ValueError):
+                build_filter(criteria)
+
+
+class TestChangedFieldsUpdate(unittest.TestCase):
+
+    def setUp(self):
+        self.tasks = mongomock.MongoClient().tasks_dashboard.tasks
+        self.tasks.insert_many([
+            {"_id": "a", "status": "done", "version": 3, "updated_at": "old"},
+            {"_id": "b", "status": "blocked", "version": 1,
+             "updated_at": "old"},
+            {"_id": "c", "status": "in-review", "updated_at": "old"},
+        ])
+
+    def test_only_changed_tasks_are_bumped(self):
+        with patch('common.schema.utc_timestamp', return_value=NOW):
+            update = changed_fields_update({"status": "done"})
+        result = self.tasks.update_many({}, update)
+
+        self.assertEqual(result.matched_count, 3)
+        self.assertEqual(result.modified_count, 2)
+        self.assertEqual(self.tasks.find_one({"_id": "a"}), {
+            "_id": "a", "status": "done", "version": 3, "updated_at": "old"})
+        self.assertEqual(self.tasks.find_one({"_id": "b"}), {
+            "_id": "b", "status": "done", "version": 2, "updated_at": NOW})
+        # Tasks written before versioning start at 1.
+        self.assertEqual(self.tasks.find_one({"_id": "c"})["version"], 1)
+
+    def test_values_are_not_read_as_field_paths(self):
+        self.tasks.update_one({"_id": "a"},
+                              changed_fields_update({"title": "$status"}))
+
+        self.assertEqual(self.tasks.find_one({"_id": "a"})["title"],
+                         "$status")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import io
+import json
+import unittest
+from datetime import datetime, timezone
+
+from bson import ObjectId, Int64
+from bson.json_util import dumps
+
+from common.serializer import encode, write_json_array
+
+
+class TestEncode(unittest.TestCase):
+
+    def test_matches_json_util_for_task_documents(self):
+        documents = [{"_id": "5f0c3b8e-uuid", "title": "Caf\u00e9 \"quoted\"",
+                      "description": "Line\nbreak", "priority": "high",
+                      "status": "todo", "version": 3}]
+
+        self.assertEqual(encode(documents), dumps(documents))
+
+    def test_falls_back_to_json_util_for_bson_types(self):
+        document = {"_id": ObjectId("65f1c2a4e4b0a1b2c3d4e5f6"),
+                    "created_at": datetime(2024, 1, 2, tzinfo=timezone.utc),
+                    "count": Int64(7), "tags": [{"id": ObjectId()}],
+                    "missing": None}
+
+        self.assertEqual(encode(document), dumps(document))
+        self.assertIn('"$oid"', encode(document))
+
+
+class TestWriteJsonArray(unittest.TestCase):
+
+    def test_empty_iterable(self):
+        buffer = io.StringIO()
+        count, last, has_more = write_json_array([], buffer)
+
+        self.assertEqual(buffer.getvalue(), '[]')
+        self.assertEqual(count, 0)
+        self.assertIsNone(last)
+        self.assertFalse(has_more)
+
+    def test_batches_produce_valid_json(self):
+        documents = [{"_id": str(i), "title": f"Task {i}"} for i in range(7)]
+        buffer = io.StringIO()
+        count, last, has_more = write_json_array(
+            iter(documents), buffer, batch_size=3)
+
+        self.assertEqual(json.loads(buffer.getvalue()), documents)
+        self.assertEqual(count, 7)
+        self.assertEqual(last, documents[-1])
+        self.assertFalse(has_more)
+
+    def test_limit_reports_more_documents(self):
+        documents = [{"_id": str(i)} for i in range(5)]
+        buffer = io.StringIO()
+        count, last, has_more = write_json_array(
+            iter(documents), buffer, limit=2, batch_size=1)
+
+        self.assertEqual(json.loads(buffer.getvalue()), documents[:2])
+        self.assertEqual(count, 2)
+        self.assertEqual(last, {"_id": "1"})
+        self.assertTrue(has_more)
+
+    def test_limit_equal_to_size_has_no_more(self):
+        documents = [{"_id": str(i)} for i in range(2)]
+        buffer = io.StringIO()
+        _, _, has_more = write_json_array(iter(documents), buffer, limit=2)
+
+        self.assertFalse(has_more)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,25 @@
+from common.monitoring import COLLECTION_OPERATIONS
+
+"""
+    Round trip assertions for handler tests
+
+    Handler tests replace the client with a MagicMock, so every command a
+    handler sends shows up as a call to a collection method in the
+    client's mock_calls. A find counts once; the getMore calls of a
+    cursor spanning several batches are not visible to a mock, which is
+    why get-task bounds its batch sizes by the page limit instead.
+"""
+
+
+def round_trips(mock_client):
+    return [name for name, _, _ in mock_client.mock_calls
+            if name.rsplit('.', 1)[-1] in COLLECTION_OPERATIONS]
+
+
+class RoundTripAssertions:
+
+    def assertRoundTripsAtMost(self, mock_client, maximum):
+        calls = round_trips(mock_client)
+        if len(calls) > maximum:
+            self.fail(f"{len(calls)} round trips, expected at most "
+                      f"{maximum}: {calls}")
@@ -0,0 +1,53 @@
+import unittest
+
+from common.validation import validate_task, check_payload, check_fields
+
+VALID_TASK = {
+    "title": "Task Title",
+    "description": "Task Description",
+    "priority": "high",
+    "status": "todo"
+}
+
+
+class TestValidateTask(unittest.TestCase):
+
+    def test_valid_task(self):
+        self.assertEqual(validate_task(VALID_TASK), [])
+        self.assertTrue(check_payload(VALID_TASK))
+
+    def test_full_mode_ignores_unknown_fields(self):
+        self.assertEqual(validate_task(dict(VALID_TASK, _id="x")), [])
+
+    def test_reports_every_error(self):
+        errors = validate_task({"title": "", "priority": "urgent",
+                                "status": 3})
+
+        self.assertEqual(errors, [
+            "description is required",
+            "title must be a non-empty string",
+            "priority must be one of: high, low, medium",
+            "status must be a non-empty string",
+        ])
+
+    def test_not_an_object(self):
+        self.assertEqual(validate_task(["title"]),
+                         ["body must be a JSON object"])
+        self.assertFalse(check_payload(None))
+
+    def test_partial_mode(self):
+        self.assertEqual(validate_task({"status": "done"}, partial=True), [])
+        self.assertTrue(check_fields({"title": "Title", "priority": "low"}))
+        self.assertEqual(validate_task({}, partial=True),
+                         ["at least one task field is required"])
+        self.assertEqual(validate_task({"owner": "me"}, partial=True),
+                         ["owner is not a task field"])
+
+    def test_check_fields_rejects_invalid(self):
+        for fields in [{}, None, {"status": "pending"}, {"title": ""},
+                       {"title": 5}, {"owner": "someone"}]:
+            self.assertFalse(check_fields(fields))
+
+
+if __name__ == '__main__':
+    unittest.main()
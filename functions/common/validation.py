@@ -0,0 +1,93 @@
+from common.schema import TASK_FIELDS, VALID_PRIORITIES, VALID_STATUSES
+
+"""
+    Task validation shared by every write handler
+
+    Rules are compiled once at import: each field maps to the frozenset of
+    values it accepts, or None when any non-empty string is accepted.
+"""
+
+FIELD_RULES = {
+    "title": None,
+    "description": None,
+    "priority": frozenset(VALID_PRIORITIES),
+    "status": frozenset(VALID_STATUSES),
+}
+REQUIRED_FIELDS = frozenset(TASK_FIELDS)
+
+_ENUM_MESSAGES = {
+    field: f"{field} must be one of: {', '.join(sorted(allowed))}"
+    for field, allowed in FIELD_RULES.items() if allowed is not None
+}
+
+
+"""
+    Validates task data and reports every problem in one pass
+
+    Full mode (create, PUT) requires every task field and ignores fields
+    that are not task fields, as those endpoints always have. Partial
+    mode (PATCH, bulk updates) validates only the fields present, needs at
+    least one, and rejects fields that are not task fields.
+
+    Args:
+        payload (dict): Task data to validate
+        partial (bool): Validate a partial update instead of a full task
+
+    Returns:
+        list - error messages, empty when the payload is valid
+"""
+
+
+def validate_task(payload, partial=False):
+    if not isinstance(payload, dict):
+        return ["body must be a JSON object"]
+    errors = []
+    if not partial:
+        errors.extend(f"{field} is required" for field in TASK_FIELDS
+                      if field not in payload)
+    present = 0
+    for field, value in payload.items():
+        if field not in FIELD_RULES:
+            if partial:
+                errors.append(f"{field} is not a task field")
+            continue
+        present += 1
+        if not isinstance(value, str) or not value:
+            errors.append(f"{field} must be a non-empty string")
+            continue
+        allowed = FIELD_RULES[field]
+        if allowed is not None and value not in allowed:
+            errors.append(_ENUM_MESSAGES[field])
+    if partial and present == 0 and not errors:
+        errors.append("at least one task field is required")
+    return errors
+
+
+"""
+    Validates task data for creation or full replacement
+
+    Args:
+        payload (dict): Task data to validate
+
+    Returns:
+        boolean
+"""
+
+
+def check_payload(payload):
+    return not validate_task(payload)
+
+
+"""
+    Validates a partial set of task fields, e.g. the target of a $set
+
+    Args:
+        fields (dict): Task fields to validate
+
+    Returns:
+        boolean
+"""
+
+
+def check_fields(fields):
+    return not validate_task(fields, partial=True)
@@ -0,0 +1,203 @@
+import os
+import json
+import time
+import asyncio
+import logging
+from common.async_db import get_async_client, run
+from common.changes import get_marker_async, save_snapshot_async
+from common.compression import compress_response, negotiate_encoding
+from common.etags import collection_etag, encoded_etag, if_none_match
+from common.metrics import instrument, phase
+from common.serializer import encode
+from common.stats import STATS_PIPELINE, STATS_TTL_SECONDS, tally_stats
+
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+DEFAULT_DASHBOARD_LIMIT = 10
+MAX_DASHBOARD_LIMIT = 50
+
+CACHE_CONTROL = (f"public, max-age={os.environ.get('GET_MAX_AGE', '5')}, "
+                 "must-revalidate")
+
+# Task lists on the dashboard leave out the description.
+SUMMARY_PROJECTION = {
+    "title": 1,
+    "priority": 1,
+    "status": 1,
+    "version": 1,
+    "created_at": 1,
+    "updated_at": 1,
+}
+
+"""
+    GET /dashboard - Newest tasks, blocked tasks and counts in one call
+
+    Query Parameters:
+    - limit: integer (optional) - Tasks per list, 1 to 50 (default 10)
+
+    The collection version marker and both task lists are independent
+    reads, so they are sent concurrently through the AsyncMongoClient and
+    the call waits for the slowest of them rather than their sum. The
+    lists are read newest first on the created_at_-1 and
+    status_1_created_at_-1 indexes.
+    Counts come from the stats stored on the marker by GET /stats; when
+    they are stale they are aggregated and stored again, as GET /stats
+    does. The X-Cache header reports whether the stored counts were used.
+    The ETag covers the time the counts were computed, as on GET /stats.
+
+    Headers:
+    - If-None-Match: string (optional) - ETag of a previous response
+
+    Response Codes:
+    - 200: Success, returns {"recent": [...], "blocked": [...],
+      "stats": {"total": int, "status": {...}, "priority": {...}}}
+    - 304: Not modified since the If-None-Match ETag
+    - 400: Bad request (invalid limit)
+    - 500: Server error
+
+    Returns:
+    - JSON response with status code, headers and body
+"""
+
+
+@instrument
+def dashboard(event, context):
+    try:
+        return run(dashboard_async(event))
+    except Exception as e:
+        logger.error(f"Error getting dashboard: {str(e)}")
+        return {
+            'statusCode': 500,
+            'headers': {
+                'Content-Type': 'application/json',
+            },
+            'body': json.dumps({'error': 'Internal server error'})
+        }
+
+
+async def dashboard_async(event):
+    client = get_async_client()
+    if client is None:
+        logger.error("MongoDB client is not initialized")
+        return {
+            'statusCode': 500,
+            'headers': {
+                'Content-Type': 'application/json',
+            },
+            'body': json.dumps({'error': 'Internal server error'})
+        }
+
+    params = event.get('queryStringParameters') or {}
+    try:
+        with phase('validate'):
+            limit = parse_limit(params.get('limit'))
+    except ValueError as e:
+        logger.error(f"Invalid query parameters: {e}")
+        return {
+            'statusCode': 400,
+            'headers': {
+                'Content-Type': 'application/json',
+            },
+            'body': json.dumps({'error': 'Bad Request'})
+        }
+
+    db = client.tasks_dashboard
+    with phase('db'):
+        marker, recent, blocked = await asyncio.gather(
+            get_marker_async(db),
+            newest_tasks(db.tasks, {}, limit),
+            newest_tasks(db.tasks, {"status": "blocked"}, limit))
+    version = marker.get('version', 0)
+    counts = marker.get('stats')
+    if counts and counts.get('version') == version and \
+            time.time() - counts.get('computed_at', 0) < STATS_TTL_SECONDS:
+        cache_status = 'HIT'
+    else:
+        with phase('db'):
+            cursor = await db.tasks.aggregate(STATS_PIPELINE)
+            counts = tally_stats(await cursor.to_list())
+            counts.update(version=version, computed_at=time.time())
+            await save_snapshot_async(db, version, 'stats', counts)
+        cache_status = 'MISS'
+
+    encoding = negotiate_encoding(event)
+    etag = encoded_etag(collection_etag(version, dict(
+        params, computed_at=counts['computed_at'])), encoding)
+    if if_none_match(event, etag):
+        return {
+            'statusCode': 304,
+            'headers': {
+                'ETag': etag,
+                'Cache-Control': CACHE_CONTROL,
+                'Vary': 'Accept-Encoding',
+            },
+            'body': ''
+        }
+
+    with phase('serialize'):
+        return compress_response({
+            'statusCode': 200,
+            'headers': {
+                'Content-Type': 'application/json',
+                'ETag': etag,
+                'Cache-Control': CACHE_CONTROL,
+                'X-Cache': cache_status,
+            },
+            'body': encode({
+                'recent': recent,
+                'blocked': blocked,
+                'stats': {
+                    'total': counts['total'],
+                    'status': counts['status'],
+                    'priority': counts['priority'],
+                },
+            })
+        }, encoding)
+
+
+"""
+    Reads the newest tasks matching a filter
+
+    Sorts on created_at rather than _id: uuid4 ids of older tasks are
+    random, so _id order is not creation order across both id schemes.
+    Tasks written before created_at was added have none and sort last.
+
+    Args:
+        tasks (AsyncCollection): Tasks collection
+        query (dict): Filter
+        limit (int): Tasks to return
+
+    Returns:
+        list
+"""
+
+
+async def newest_tasks(tasks, query, limit):
+    cursor = tasks.find(query, SUMMARY_PROJECTION, sort=[("created_at", -1)],
+                        limit=limit, batch_size=limit)
+    return await cursor.to_list()
+
+
+"""
+    Parses the limit query parameter
+
+    Args:
+        value (str|None): Raw query parameter
+
+    Returns:
+        int
+
+    Raises:
+        ValueError: when the value is not an integer in range
+"""
+
+
+def parse_limit(value):
+    if value is None:
+        return DEFAULT_DASHBOARD_LIMIT
+    limit = int(value)
+    if limit < 1 or limit > MAX_DASHBOARD_LIMIT:
+        raise ValueError(
+            f"limit must be between 1 and {MAX_DASHBOARD_LIMIT}")
+    return limit
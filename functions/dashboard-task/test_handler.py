@@ -0,0 +1,224 @@
+import unittest
+from unittest.mock import patch, MagicMock, AsyncMock
+import asyncio
+import json
+import os
+import time
+import uuid
+import logging
+
+logging.disable(logging.CRITICAL)
+
+os.environ['MONGO_HOST'] = 'mongodb://mockhost:27017'
+
+import mongomock
+
+from handler import dashboard, newest_tasks, SUMMARY_PROJECTION
+from common.ids import new_task_id
+from common.stats import STATS_PIPELINE
+from common.test_support import RoundTripAssertions
+
+STATS = {"total": 3, "status": {"todo": 2, "blocked": 1},
+         "priority": {"high": 3}}
+RECENT = [{"_id": "t3", "title": "C", "status": "todo"},
+          {"_id": "t2", "title": "B", "status": "blocked"}]
+BLOCKED = [{"_id": "t2", "title": "B", "status": "blocked"}]
+
+
+def async_client(marker, recent=RECENT, blocked=BLOCKED, delay=0):
+    client = MagicMock()
+    db = client.tasks_dashboard
+
+    async def find_one(*args, **kwargs):
+        await asyncio.sleep(delay)
+        return marker
+
+    def find(query, *args, **kwargs):
+        cursor = MagicMock()
+
+        async def to_list(*args):
+            await asyncio.sleep(delay)
+            return blocked if query else recent
+        cursor.to_list = to_list
+        return cursor
+
+    db.meta.find_one = AsyncMock(side_effect=find_one)
+    db.meta.update_one = AsyncMock(return_value=MagicMock(matched_count=1))
+    db.tasks.find = MagicMock(side_effect=find)
+    groups = MagicMock()
+    groups.to_list = AsyncMock(return_value=[
+        {"_id": {"status": "todo", "priority": "high"}, "count": 2},
+        {"_id": {"status": "blocked", "priority": "high"}, "count": 1}])
+    db.tasks.aggregate = AsyncMock(return_value=groups)
+    return client
+
+
+class TestDashboardHandler(RoundTripAssertions, unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        logging.disable(logging.CRITICAL)
+
+    @classmethod
+    def tearDownClass(cls):
+        logging.disable(logging.NOTSET)
+
+    def test_stored_stats_are_used(self):
+        marker = {"_id": "tasks", "version": 4,
+                  "stats": dict(STATS, version=4, computed_at=990)}
+        mock_client = async_client(marker)
+        with patch('handler.get_async_client', return_value=mock_client), \
+                patch('handler.time.time', return_value=1000):
+            response = dashboard({"queryStringParameters": {"limit": "5"}},
+                                 {})
+
+        self.assertEqual(response['statusCode'], 200)
+        self.assertEqual(response['headers']['X-Cache'], 'HIT')
+        self.assertIn('ETag', response['headers'])
+        self.assertEqual(json.loads(response['body']), {
+            "recent": RECENT, "blocked": BLOCKED, "stats": STATS})
+        tasks = mock_client.tasks_dashboard.tasks
+        self.assertEqual(
+            [c[0] for c in tasks.find.call_args_list],
+            [({}, SUMMARY_PROJECTION), ({"status": "blocked"},
+                                        SUMMARY_PROJECTION)])
+        kwargs = tasks.find.call_args[1]
+        self.assertEqual(kwargs['sort'], [("created_at", -1)])
+        self.assertEqual(kwargs['limit'], 5)
+        tasks.aggregate.assert_not_called()
+        self.assertRoundTripsAtMost(mock_client, 3)
+
+    def test_stale_stats_are_recomputed_and_stored(self):
+        marker = {"_id": "tasks", "version": 5,
+                  "stats": dict(STATS, version=4, computed_at=990)}
+        mock_client = async_client(marker)
+        with patch('handler.get_async_client', return_value=mock_client), \
+                patch('handler.time.time', return_value=1000):
+            response = dashboard({}, {})
+
+        self.assertEqual(response['statusCode'], 200)
+        self.assertEqual(response['headers']['X-Cache'], 'MISS')
+        body = json.loads(response['body'])
+        self.assertEqual(body['stats']['total'], 3)
+        self.assertEqual(body['stats']['status']['blocked'], 1)
+        db = mock_client.tasks_dashboard
+        db.tasks.aggregate.assert_awaited_once_with(STATS_PIPELINE)
+        query, update = db.meta.update_one.call_args[0]
+        self.assertEqual(query, {"_id": "tasks", "version": 5})
+        self.assertEqual(update['$set']['stats']['version'], 5)
+        self.assertEqual(db.tasks.find.call_args[1]['limit'], 10)
+
+    def test_reads_run_concurrently(self):
+        marker = {"_id": "tasks", "version": 1,
+                  "stats": dict(STATS, version=1, computed_at=time.time())}
+        mock_client = async_client(marker, delay=0.1)
+        with patch('handler.get_async_client', return_value=mock_client):
+            started = time.perf_counter()
+            response = dashboard({}, {})
+            elapsed = time.perf_counter() - started
+
+        self.assertEqual(response['statusCode'], 200)
+        # One read's delay, not the three in sequence.
+        self.assertLess(elapsed, 0.25)
+
+    def test_not_modified(self):
+        marker = {"_id": "tasks", "version": 2,
+                  "stats": dict(STATS, version=2, computed_at=time.time())}
+        mock_client = async_client(marker)
+        with patch('handler.get_async_client', return_value=mock_client):
+            etag = dashboard({}, {})['headers']['ETag']
+            response = dashboard({"headers": {"if-none-match": etag}}, {})
+
+        self.assertEqual(response['statusCode'], 304)
+        self.assertEqual(response['body'], '')
+
+    def test_expired_stats_are_not_304(self):
+        marker = {"_id": "tasks", "version": 2,
+                  "stats": dict(STATS, version=2, computed_at=990)}
+        mock_client = async_client(marker)
+        with patch('handler.get_async_client', return_value=mock_client), \
+                patch('handler.STATS_TTL_SECONDS', 60):
+            with patch('handler.time.time', return_value=1000):
+                etag = dashboard({}, {})['headers']['ETag']
+            with patch('handler.time.time', return_value=1100):
+                response = dashboard(
+                    {"headers": {"if-none-match": etag}}, {})
+
+        self.assertEqual(response['statusCode'], 200)
+        self.assertEqual(response['headers']['X-Cache'], 'MISS')
+        self.assertNotEqual(response['headers']['ETag'], etag)
+
+    def test_etag_per_content_coding(self):
+        marker = {"_id": "tasks", "version": 2,
+                  "stats": dict(STATS, version=2, computed_at=time.time())}
+        mock_client = async_client(marker)
+        gzip_event = {"headers": {"accept-encoding": "gzip"}}
+        with patch('handler.get_async_client', return_value=mock_client):
+            identity_etag = dashboard({}, {})['headers']['ETag']
+            gzip_etag = dashboard(gzip_event, {})['headers']['ETag']
+            stale = dashboard({"headers": {"accept-encoding": "gzip",
+                                           "if-none-match": identity_etag}},
+                              {})
+            fresh = dashboard({"headers": {"accept-encoding": "gzip",
+                                           "if-none-match": gzip_etag}}, {})
+
+        self.assertNotEqual(identity_etag, gzip_etag)
+        self.assertEqual(stale['statusCode'], 200)
+        self.assertEqual(fresh['statusCode'], 304)
+        self.assertEqual(fresh['headers']['Vary'], 'Accept-Encoding')
+
+    def test_newest_tasks_with_mixed_id_schemes(self):
+        tasks = mongomock.MongoClient().tasks_dashboard.tasks
+        # uuid4 ids of tasks created before UUIDv7 sort at random
+        # against the newer ids, so only created_at gives the order.
+        tasks.insert_many([
+            {"_id": "ffffffff-0000-4000-8000-000000000000",
+             "title": "Oldest", "created_at": "2024-01-01T00:00:00.000Z"},
+            {"_id": new_task_id(), "title": "Newest",
+             "created_at": "2024-03-01T00:00:00.000Z"},
+            {"_id": "00000000-0000-4000-8000-000000000000",
+             "title": "Middle", "created_at": "2024-02-01T00:00:00.000Z"},
+            {"_id": str(uuid.uuid4()), "title": "Untimed"},
+        ])
+
+        class AsyncTasks:
+            def find(self, *args, **kwargs):
+                return MagicMock(to_list=AsyncMock(
+                    return_value=list(tasks.find(*args, **kwargs))))
+
+        newest = asyncio.run(newest_tasks(AsyncTasks(), {}, 4))
+
+        self.assertEqual([task['title'] for task in newest],
+                         ["Newest", "Middle", "Oldest", "Untimed"])
+
+    def test_invalid_limit(self):
+        mock_client = async_client({})
+        with patch('handler.get_async_client', return_value=mock_client):
+            for limit in ("0", "51", "ten"):
+                response = dashboard(
+                    {"queryStringParameters": {"limit": limit}}, {})
+
+                self.assertEqual(response['statusCode'], 400)
+                self.assertIn('Bad Request', response['body'])
+        mock_client.tasks_dashboard.tasks.find.assert_not_called()
+
+    def test_client_not_initialized(self):
+        with patch('handler.get_async_client', return_value=None):
+            response = dashboard({}, {})
+
+            self.assertEqual(response['statusCode'], 500)
+            self.assertIn('Internal server error', response['body'])
+
+    def test_database_error(self):
+        mock_client = async_client({})
+        mock_client.tasks_dashboard.meta.find_one.side_effect = Exception(
+            "Database error")
+        with patch('handler.get_async_client', return_value=mock_client):
+            response = dashboard({}, {})
+
+            self.assertEqual(response['statusCode'], 500)
+            self.assertIn('Internal server error', response['body'])
+
+
+if __name__ == '__main__':
+    unittest.main()
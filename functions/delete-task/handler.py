@@ -1,29 +1,28 @@
-import os
 import json
 import logging
-from pymongo import MongoClient
+from common.changes import bump_collection_version
+from common.db import get_client
+from common.etags import parse_if_match, version_condition
+from common.metrics import instrument, phase
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
-try:
-    client = MongoClient(host=os.environ.get('MONGO_HOST'))
-    client.admin.command('ping')
-    logger.info("MongoDB connection successful")
-except Exception as e:
-    logger.error(f"MongoDB connection error: {e}")
-    client = None
-
 """
     DELETE /delete/{task_id} - Delete a task
 
     Path Parameters:
     - task_id: string (required) - ID of the task to delete
 
+    Headers:
+    - If-Match: string (optional) - ETag of the version being deleted; the
+      task is only deleted if it is still at that version
+
     Response Codes:
     - 200: Deleted successfully
     - 400: Bad request (missing task_id)
     - 404: Task not found
+    - 412: Task changed since the If-Match version
     - 500: Server error
 
     Returns:
@@ -31,8 +30,10 @@ except Exception as e:
 """
 
 
+@instrument
 def delete(event, context):
     try:
+        client = get_client()
         if client is None:
             logger.error("MongoDB client is not initialized")
             return {
@@ -43,22 +44,33 @@ def delete(event, context):
                 'body': json.dumps({'error': 'Internal server error'})
             }
         task_id = event['pathParameters']['task_id']
+        versions = parse_if_match(event)
         db = client.tasks_dashboard
         tasks = db.tasks
-        task = tasks.find_one({"_id": task_id})
-        if not task:
+        query = {"_id": task_id}
+        if versions is not None:
+            query["version"] = version_condition(versions)
+        with phase('db'):
+            result = tasks.delete_one(query)
+        if result.deleted_count == 0:
+            # Only a failed precondition needs a second look to tell a
+            # stale version apart from a missing task.
+            with phase('db'):
+                stale = versions is not None and \
+                    tasks.find_one({"_id": task_id}, {"_id": 1})
+            if stale:
+                return {
+                    "statusCode": 412,
+                    "headers": {"Content-Type": "application/json"},
+                    "body": json.dumps({"error": "Precondition failed"})
+                }
             return {
                 "statusCode": 404,
                 "headers": {"Content-Type": "application/json"},
                 "body": json.dumps({"error": "Task not found"})
             }
-        result = tasks.delete_one({"_id": task_id})
-        if result.deleted_count == 0:
-            return {
-                "statusCode": 500,
-                "headers": {"Content-Type": "application/json"},
-                "body": json.dumps({"error": "Failed to delete task"})
-            }
+        with phase('db'):
+            bump_collection_version(db)
         return {
             'statusCode': 200,
             'headers': {
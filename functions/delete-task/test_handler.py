@@ -8,14 +8,11 @@ logging.disable(logging.CRITICAL)
 
 os.environ['MONGO_HOST'] = 'mongodb://mockhost:27017'
 
-with patch('pymongo.MongoClient') as mock_mongo:
-    mock_client = MagicMock()
-    mock_mongo.return_value = mock_client
+from handler import delete
+from common.test_support import RoundTripAssertions
 
-    from handler import delete
 
-
-class TestDeleteHandler(unittest.TestCase):
+class TestDeleteHandler(RoundTripAssertions, unittest.TestCase):
 
     @classmethod
     def setUpClass(cls):
@@ -26,7 +23,8 @@ class TestDeleteHandler(unittest.TestCase):
         logging.disable(logging.NOTSET)
 
     def test_successful_delete(self):
-        with patch('handler.client') as mock_client:
+        with patch('handler.get_client') as mock_get_client:
+            mock_client = mock_get_client.return_value
             mock_db = MagicMock()
             mock_client.tasks_dashboard = mock_db
 
@@ -58,14 +56,17 @@ class TestDeleteHandler(unittest.TestCase):
             self.assertEqual(response_body['task_id'], "task-123")
 
     def test_task_not_found(self):
-        with patch('handler.client') as mock_client:
+        with patch('handler.get_client') as mock_get_client:
+            mock_client = mock_get_client.return_value
             mock_db = MagicMock()
             mock_client.tasks_dashboard = mock_db
 
             mock_collection = MagicMock()
             mock_db.tasks = mock_collection
 
-            mock_collection.find_one.return_value = None
+            mock_delete_result = MagicMock()
+            mock_delete_result.deleted_count = 0
+            mock_collection.delete_one.return_value = mock_delete_result
 
             event = {
                 "pathParameters": {"task_id": "non-existent-task"}
@@ -75,38 +76,95 @@ class TestDeleteHandler(unittest.TestCase):
 
             self.assertEqual(response['statusCode'], 404)
             self.assertIn('Task not found', response['body'])
+            mock_collection.find_one.assert_not_called()
+            mock_db.meta.update_one.assert_not_called()
 
-    def test_delete_failure(self):
-        with patch('handler.client') as mock_client:
-            mock_db = MagicMock()
-            mock_client.tasks_dashboard = mock_db
+    def test_single_round_trip(self):
+        with patch('handler.get_client') as mock_get_client:
+            mock_client = mock_get_client.return_value
+            mock_collection = MagicMock()
+            mock_client.tasks_dashboard.tasks = mock_collection
 
+            mock_delete_result = MagicMock()
+            mock_delete_result.deleted_count = 1
+            mock_collection.delete_one.return_value = mock_delete_result
+
+            event = {
+                "pathParameters": {"task_id": "task-123"}
+            }
+            context = {}
+            response = delete(event, context)
+
+            self.assertEqual(response['statusCode'], 200)
+            mock_collection.delete_one.assert_called_once_with(
+                {"_id": "task-123"})
+            mock_collection.find_one.assert_not_called()
+            mock_client.tasks_dashboard.meta.update_one.assert_called_once()
+
+    def test_if_match_deletes_matching_version(self):
+        with patch('handler.get_client') as mock_get_client:
+            mock_client = mock_get_client.return_value
             mock_collection = MagicMock()
-            mock_db.tasks = mock_collection
+            mock_client.tasks_dashboard.tasks = mock_collection
 
-            mock_collection.find_one.return_value = {
-                "_id": "task-123",
-                "title": "Task to Delete",
-                "description": "This task will be deleted",
-                "priority": "low",
-                "status": "todo"
+            mock_delete_result = MagicMock()
+            mock_delete_result.deleted_count = 1
+            mock_collection.delete_one.return_value = mock_delete_result
+
+            event = {
+                "pathParameters": {"task_id": "task-123"},
+                "headers": {"if-match": '"3"'}
             }
+            context = {}
+            response = delete(event, context)
+
+            self.assertEqual(response['statusCode'], 200)
+            mock_collection.delete_one.assert_called_once_with(
+                {"_id": "task-123", "version": {"$in": [3]}})
+
+    def test_if_match_stale_version(self):
+        with patch('handler.get_client') as mock_get_client:
+            mock_client = mock_get_client.return_value
+            mock_collection = MagicMock()
+            mock_client.tasks_dashboard.tasks = mock_collection
 
             mock_delete_result = MagicMock()
             mock_delete_result.deleted_count = 0
             mock_collection.delete_one.return_value = mock_delete_result
+            mock_collection.find_one.return_value = {"_id": "task-123"}
 
             event = {
-                "pathParameters": {"task_id": "task-123"}
+                "pathParameters": {"task_id": "task-123"},
+                "headers": {"if-match": '"3"'}
             }
             context = {}
             response = delete(event, context)
 
-            self.assertEqual(response['statusCode'], 500)
-            self.assertIn('Failed to delete task', response['body'])
+            self.assertEqual(response['statusCode'], 412)
+            self.assertIn('Precondition failed', response['body'])
+
+    def test_if_match_missing_task(self):
+        with patch('handler.get_client') as mock_get_client:
+            mock_client = mock_get_client.return_value
+            mock_collection = MagicMock()
+            mock_client.tasks_dashboard.tasks = mock_collection
+
+            mock_delete_result = MagicMock()
+            mock_delete_result.deleted_count = 0
+            mock_collection.delete_one.return_value = mock_delete_result
+            mock_collection.find_one.return_value = None
+
+            event = {
+                "pathParameters": {"task_id": "task-123"},
+                "headers": {"if-match": '"3"'}
+            }
+            context = {}
+            response = delete(event, context)
+
+            self.assertEqual(response['statusCode'], 404)
 
     def test_client_not_initialized(self):
-        with patch('handler.client', None):
+        with patch('handler.get_client', return_value=None):
             event = {
                 "pathParameters": {"task_id": "task-123"}
             }
@@ -117,7 +175,8 @@ class TestDeleteHandler(unittest.TestCase):
             self.assertIn('Internal server error', response['body'])
 
     def test_missing_path_parameters(self):
-        with patch('handler.client') as mock_client:
+        with patch('handler.get_client') as mock_get_client:
+            mock_client = mock_get_client.return_value
             mock_db = MagicMock()
             mock_client.tasks_dashboard = mock_db
 
@@ -133,7 +192,8 @@ class TestDeleteHandler(unittest.TestCase):
             self.assertIn('Internal server error', response['body'])
 
     def test_database_error_during_deletion(self):
-        with patch('handler.client') as mock_client:
+        with patch('handler.get_client') as mock_get_client:
+            mock_client = mock_get_client.return_value
             mock_db = MagicMock()
             mock_client.tasks_dashboard = mock_db
 
@@ -160,6 +220,24 @@ class TestDeleteHandler(unittest.TestCase):
             self.assertEqual(response['statusCode'], 500)
             self.assertIn('Internal server error', response['body'])
 
+    def test_round_trips_per_request(self):
+        with patch('handler.get_client') as mock_get_client:
+            mock_client = mock_get_client.return_value
+            mock_collection = mock_client.tasks_dashboard.tasks
+            mock_collection.delete_one.return_value.deleted_count = 1
+            event = {"pathParameters": {"task_id": "task-123"},
+                     "headers": {"if-match": '"1"'}}
+
+            # No read before the delete: the delete and the version bump.
+            delete(event, {})
+            self.assertRoundTripsAtMost(mock_client, 2)
+
+            # A stale If-Match costs one lookup and no bump.
+            mock_client.reset_mock()
+            mock_collection.delete_one.return_value.deleted_count = 0
+            delete(event, {})
+            self.assertRoundTripsAtMost(mock_client, 2)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -1,25 +1,73 @@
+import io
 import os
 import json
+import base64
+import binascii
 import logging
-from pymongo import MongoClient
-from bson.json_util import dumps
+from common.cache import ResponseCache
+from common.changes import get_collection_version
+from common.compression import compress_response, negotiate_encoding
+from common.db import get_client
+from common.etags import (collection_etag, encoded_etag, format_etag,
+                          if_none_match)
+from common.metrics import instrument, phase
+from common.schema import (TASK_FIELDS, TIMESTAMP_FIELDS, FILTER_FIELDS,
+                           build_filter)
+from common.serializer import encode, write_json_array, DEFAULT_BATCH_SIZE
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
-try:
-    client = MongoClient(host=os.environ.get('MONGO_HOST'))
-    client.admin.command('ping')
-    logger.info("MongoDB connection successful")
-except Exception as e:
-    logger.error(f"MongoDB connection error: {e}")
-    client = None
+DEFAULT_PAGE_LIMIT = 50
+MAX_PAGE_LIMIT = 500
+
+# Serialized responses keyed by collection version and query parameters,
+# shared by every invocation of this container.
+response_cache = ResponseCache(
+    max_entries=int(os.environ.get('GET_CACHE_MAX_ENTRIES', '128')),
+    max_bytes=int(os.environ.get('GET_CACHE_MAX_BYTES', '33554432')),
+    ttl_seconds=float(os.environ.get('GET_CACHE_TTL_SECONDS', '30')))
+
+CACHE_CONTROL = (f"public, max-age={os.environ.get('GET_MAX_AGE', '5')}, "
+                 "must-revalidate")
 
 """
-    GET / - Retrieve all tasks
+    GET / - Retrieve a page of tasks
+
+    Query Parameters:
+    - limit: integer (optional) - Page size, 1 to 500 (default 50)
+    - cursor: string (optional) - Opaque next_cursor from a previous page
+    - all: "true" (optional) - Return every task as a plain array, unpaged
+    - status: string (optional) - Comma separated statuses to match
+    - priority: string (optional) - Comma separated priorities to match
+    - fields: string (optional) - Comma separated fields to return, _id is
+      always included
+
+    Tasks are paged by keyset on the _id index, so every page costs the
+    same regardless of collection size. Documents are streamed from the
+    cursor into the response buffer instead of being collected first.
+
+    Responses are cached in the container until the collection version
+    bumped by every write changes, so a repeated poll costs one point
+    read. The X-Cache header reports HIT or MISS.
+
+    Headers:
+    - If-None-Match: string (optional) - ETag of a previous response
+    - Accept-Encoding: string (optional) - br or gzip compress bodies over
+      COMPRESSION_MIN_BYTES, returned base64 encoded
+
+    The ETag is derived from the collection version and the query
+    parameters, so a matching If-None-Match is answered with 304 before
+    any task is read. Cache-Control lets HTTP caches reuse responses for
+    GET_MAX_AGE seconds (default 5).
+
+    Documents are encoded as they are read from the cursor, so the db
+    phase of this route's metrics includes their serialization.
 
     Response Codes:
-    - 200: Success, returns array of tasks
+    - 200: Success, returns {"tasks": [...], "next_cursor": string|null}
+    - 304: Not modified since the If-None-Match ETag
+    - 400: Bad request (invalid limit, cursor, filter or fields)
     - 404: No tasks found
     - 500: Server error (DB connection issues, etc)
 
@@ -28,8 +76,10 @@ except Exception as e:
 """
 
 
+@instrument
 def get(event, context):
     try:
+        client = get_client()
         if client is None:
             logger.error("MongoDB client is not initialized")
             return {
@@ -40,10 +90,193 @@ def get(event, context):
                 'body': json.dumps({'error': 'Internal server error'})
             }
 
+        params = event.get('queryStringParameters') or {}
+        try:
+            with phase('validate'):
+                query = build_query(params)
+                projection = build_projection(params.get('fields'))
+                limit = parse_limit(params.get('limit'))
+                after_id = decode_cursor(params.get('cursor'))
+        except ValueError as e:
+            logger.error(f"Invalid query parameters: {e}")
+            return {
+                'statusCode': 400,
+                'headers': {
+                    'Content-Type': 'application/json',
+                },
+                'body': json.dumps({'error': 'Bad Request'})
+            }
+
+        db = client.tasks_dashboard
+        with phase('db'):
+            collection_version = get_collection_version(db)
+        encoding = negotiate_encoding(event)
+        etag = encoded_etag(collection_etag(collection_version, params),
+                            encoding)
+        if if_none_match(event, etag):
+            return {
+                'statusCode': 304,
+                'headers': {
+                    'ETag': etag,
+                    'Cache-Control': CACHE_CONTROL,
+                    'Vary': 'Accept-Encoding',
+                },
+                'body': ''
+            }
+
+        cache_key = (collection_version, tuple(sorted(params.items())),
+                     encoding)
+        response = response_cache.get(cache_key)
+        if response is None:
+            with phase('db'):
+                response = fetch_tasks(db.tasks, params, query, projection,
+                                       limit, after_id)
+            with phase('serialize'):
+                response = compress_response(response, encoding)
+            response_cache.put(cache_key, response)
+            cache_status = 'MISS'
+            logger.info(f"GET cache miss: {response_cache.stats()}")
+        else:
+            cache_status = 'HIT'
+        return dict(response, headers={**response['headers'],
+                                       'ETag': etag,
+                                       'Cache-Control': CACHE_CONTROL,
+                                       'X-Cache': cache_status})
+    except Exception as e:
+        logger.error(f"Error getting tasks: {str(e)}")
+        return {
+            'statusCode': 500,
+            'headers': {
+                'Content-Type': 'application/json',
+            },
+            'body': json.dumps({'error': 'Internal server error'})
+        }
+
+
+"""
+    GET /task/{task_id} - Retrieve a single task
+
+    Path Parameters:
+    - task_id: string (required) - ID of the task to retrieve
+
+    Query Parameters:
+    - fields: string (optional) - Comma separated fields to return, _id and
+      version are always included
+
+    Headers:
+    - If-None-Match: string (optional) - ETag of a previous response
+
+    The task is read with one find_one on _id. Its version is returned as
+    the ETag, the same one PUT and DELETE accept in If-Match.
+
+    Response Codes:
+    - 200: Success, returns the task
+    - 304: Not modified since the If-None-Match ETag
+    - 400: Bad request (invalid fields)
+    - 404: Task not found
+    - 500: Server error
+
+    Returns:
+    - JSON response with status code, headers and body
+"""
+
+
+@instrument
+def get_one(event, context):
+    try:
+        client = get_client()
+        if client is None:
+            logger.error("MongoDB client is not initialized")
+            return {
+                'statusCode': 500,
+                'headers': {
+                    'Content-Type': 'application/json',
+                },
+                'body': json.dumps({'error': 'Internal server error'})
+            }
+
+        task_id = event['pathParameters']['task_id']
+        params = event.get('queryStringParameters') or {}
+        try:
+            with phase('validate'):
+                projection = build_projection(params.get('fields'))
+        except ValueError as e:
+            logger.error(f"Invalid query parameters: {e}")
+            return {
+                'statusCode': 400,
+                'headers': {
+                    'Content-Type': 'application/json',
+                },
+                'body': json.dumps({'error': 'Bad Request'})
+            }
+        if projection is not None:
+            projection['version'] = 1
+
         db = client.tasks_dashboard
         tasks = db.tasks
-        tasks_list = list(tasks.find())
-        if not tasks_list:
+        with phase('db'):
+            task = tasks.find_one({"_id": task_id}, projection)
+        if not task:
+            return {
+                "statusCode": 404,
+                "headers": {"Content-Type": "application/json"},
+                "body": json.dumps({"error": "Task not found"})
+            }
+
+        encoding = negotiate_encoding(event)
+        etag = encoded_etag(format_etag(task.get('version')), encoding)
+        if if_none_match(event, etag):
+            return {
+                'statusCode': 304,
+                'headers': {
+                    'ETag': etag,
+                    'Vary': 'Accept-Encoding',
+                },
+                'body': ''
+            }
+        with phase('serialize'):
+            return compress_response({
+                'statusCode': 200,
+                'headers': {
+                    'Content-Type': 'application/json',
+                    'ETag': etag
+                },
+                'body': encode(task)
+            }, encoding)
+    except Exception as e:
+        logger.error(f"Error getting task: {str(e)}")
+        return {
+            'statusCode': 500,
+            'headers': {
+                'Content-Type': 'application/json',
+            },
+            'body': json.dumps({'error': 'Internal server error'})
+        }
+
+
+"""
+    Reads and serializes the tasks for one GET / request
+
+    Args:
+        tasks (pymongo.collection.Collection): Tasks collection
+        params (dict): Query string parameters
+        query (dict): Filter built from the parameters
+        projection (dict|None): Projection built from the fields parameter
+        limit (int): Page size
+        after_id (str|None): _id decoded from the cursor
+
+    Returns:
+        dict - response for a 200 or 404
+"""
+
+
+def fetch_tasks(tasks, params, query, projection, limit, after_id):
+    if params.get('all') == 'true':
+        buffer = io.StringIO()
+        count, _, _ = write_json_array(
+            tasks.find(query, projection, batch_size=DEFAULT_BATCH_SIZE),
+            buffer)
+        if count == 0:
             logger.info("No tasks found")
             return {
                 'statusCode': 404,
@@ -52,21 +285,152 @@ def get(event, context):
                 },
                 'body': json.dumps({'error': 'No tasks found'})
             }
-
-        result = dumps(tasks_list)
         return {
             'statusCode': 200,
             'headers': {
                 'Content-Type': 'application/json',
             },
-            'body': result
+            'body': buffer.getvalue()
         }
-    except Exception as e:
-        logger.error(f"Error getting tasks: {str(e)}")
+
+    if after_id is not None:
+        query['_id'] = {'$gt': after_id}
+    # One extra document tells us whether another page exists.
+    cursor = tasks.find(query, projection, sort=[('_id', 1)],
+                        limit=limit + 1,
+                        batch_size=min(limit + 1, DEFAULT_BATCH_SIZE))
+    buffer = io.StringIO()
+    buffer.write('{"tasks": ')
+    count, last_task, has_more = write_json_array(cursor, buffer, limit)
+    if count == 0 and after_id is None:
+        logger.info("No tasks found")
         return {
-            'statusCode': 500,
+            'statusCode': 404,
             'headers': {
                 'Content-Type': 'application/json',
             },
-            'body': json.dumps({'error': 'Internal server error'})
+            'body': json.dumps({'error': 'No tasks found'})
         }
+
+    next_cursor = None
+    if has_more:
+        next_cursor = encode_cursor(last_task['_id'])
+    buffer.write(f', "next_cursor": {json.dumps(next_cursor)}}}')
+    result = buffer.getvalue()
+    return {
+        'statusCode': 200,
+        'headers': {
+            'Content-Type': 'application/json',
+        },
+        'body': result
+    }
+
+
+"""
+    Parses the limit query parameter
+
+    Args:
+        value (str|None): Raw query parameter
+
+    Returns:
+        int
+
+    Raises:
+        ValueError: when the value is not an integer in range
+"""
+
+
+def parse_limit(value):
+    if value is None:
+        return DEFAULT_PAGE_LIMIT
+    limit = int(value)
+    if limit < 1 or limit > MAX_PAGE_LIMIT:
+        raise ValueError(f"limit must be between 1 and {MAX_PAGE_LIMIT}")
+    return limit
+
+
+"""
+    Builds the Mongo filter for the status and priority parameters
+
+    Args:
+        params (dict): Query string parameters
+
+    Returns:
+        dict
+
+    Raises:
+        ValueError: when a value is not a valid status or priority
+"""
+
+
+def build_query(params):
+    return build_filter({field: params[field].split(',')
+                         for field in FILTER_FIELDS if field in params})
+
+
+"""
+    Builds the Mongo projection for the fields parameter
+
+    Args:
+        fields (str|None): Raw query parameter
+
+    Returns:
+        dict|None - None returns whole documents
+
+    Raises:
+        ValueError: when a field is not a task field
+"""
+
+
+def build_projection(fields):
+    if fields is None:
+        return None
+    projection = {}
+    for field in fields.split(','):
+        if field not in TASK_FIELDS and field not in TIMESTAMP_FIELDS:
+            raise ValueError(f"invalid field: {field}")
+        projection[field] = 1
+    return projection
+
+
+"""
+    Encodes the last _id of a page into an opaque cursor
+
+    Args:
+        task_id (str): _id of the last task on the page
+
+    Returns:
+        str
+"""
+
+
+def encode_cursor(task_id):
+    raw = json.dumps({'_id': task_id}).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+"""
+    Decodes a cursor produced by encode_cursor
+
+    Args:
+        cursor (str|None): Raw query parameter
+
+    Returns:
+        str|None - the _id to resume after
+
+    Raises:
+        ValueError: when the cursor is malformed
+"""
+
+
+def decode_cursor(cursor):
+    if not cursor:
+        return None
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        decoded = json.loads(base64.urlsafe_b64decode(padded))
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError):
+        raise ValueError("malformed cursor")
+    if not isinstance(decoded, dict) or not isinstance(decoded.get('_id'), str):
+        raise ValueError("malformed cursor")
+    return decoded['_id']
@@ -1,5 +1,8 @@
 import unittest
 from unittest.mock import patch, MagicMock
+import base64
+import gzip
+import json
 import os
 import logging
 
@@ -7,14 +10,13 @@ logging.disable(logging.CRITICAL)
 
 os.environ['MONGO_HOST'] = 'mongodb://mockhost:27017'
 
-with patch('pymongo.MongoClient') as mock_mongo:
-    mock_client = MagicMock()
-    mock_mongo.return_value = mock_client
+from handler import (get, get_one, encode_cursor, decode_cursor,
+                     response_cache)
+from common.serializer import DEFAULT_BATCH_SIZE
+from common.test_support import RoundTripAssertions
 
-    from handler import get
 
-
-class TestGetHandler(unittest.TestCase):
+class TestGetHandler(RoundTripAssertions, unittest.TestCase):
 
     @classmethod
     def setUpClass(cls):
@@ -24,8 +26,12 @@ class TestGetHandler(unittest.TestCase):
     def tearDownClass(cls):
         logging.disable(logging.NOTSET)
 
+    def setUp(self):
+        response_cache.clear()
+
     def test_successful_get_tasks(self):
-        with patch('handler.client') as mock_client:
+        with patch('handler.get_client') as mock_get_client:
+            mock_client = mock_get_client.return_value
             mock_db = MagicMock()
             mock_client.tasks_dashboard = mock_db
 
@@ -52,7 +58,8 @@ class TestGetHandler(unittest.TestCase):
             self.assertIn('Task 2', response['body'])
 
     def test_no_tasks_found(self):
-        with patch('handler.client') as mock_client:
+        with patch('handler.get_client') as mock_get_client:
+            mock_client = mock_get_client.return_value
             mock_db = MagicMock()
             mock_client.tasks_dashboard = mock_db
 
@@ -70,8 +77,234 @@ class TestGetHandler(unittest.TestCase):
                              ['Content-Type'], 'application/json')
             self.assertIn('No tasks found', response['body'])
 
+    def test_next_cursor_when_more_tasks_exist(self):
+        with patch('handler.get_client') as mock_get_client:
+            mock_client = mock_get_client.return_value
+            mock_db = MagicMock()
+            mock_client.tasks_dashboard = mock_db
+
+            mock_collection = MagicMock()
+            mock_db.tasks = mock_collection
+
+            mock_collection.find.return_value = [
+                {"_id": "1", "title": "Task 1"},
+                {"_id": "2", "title": "Task 2"},
+                {"_id": "3", "title": "Task 3"}
+            ]
+
+            event = {"queryStringParameters": {"limit": "2"}}
+            context = {}
+            response = get(event, context)
+
+            self.assertEqual(response['statusCode'], 200)
+            body = json.loads(response['body'])
+            self.assertEqual([t['_id'] for t in body['tasks']], ["1", "2"])
+            self.assertEqual(decode_cursor(body['next_cursor']), "2")
+            mock_collection.find.assert_called_once_with(
+                {}, None, sort=[('_id', 1)], limit=3, batch_size=3)
+
+    def test_cursor_resumes_after_last_id(self):
+        with patch('handler.get_client') as mock_get_client:
+            mock_client = mock_get_client.return_value
+            mock_db = MagicMock()
+            mock_client.tasks_dashboard = mock_db
+
+            mock_collection = MagicMock()
+            mock_db.tasks = mock_collection
+
+            mock_collection.find.return_value = []
+
+            event = {"queryStringParameters": {
+                "cursor": encode_cursor("2")}}
+            context = {}
+            response = get(event, context)
+
+            self.assertEqual(response['statusCode'], 200)
+            body = json.loads(response['body'])
+            self.assertEqual(body['tasks'], [])
+            self.assertIsNone(body['next_cursor'])
+            mock_collection.find.assert_called_once_with(
+                {'_id': {'$gt': "2"}}, None, sort=[('_id', 1)], limit=51,
+                batch_size=51)
+
+    def test_invalid_pagination_parameters(self):
+        with patch('handler.get_client') as mock_get_client:
+            mock_client = mock_get_client.return_value
+            for params in [{"limit": "0"}, {"limit": "abc"},
+                           {"limit": "100000"}, {"cursor": "not-a-cursor"}]:
+                event = {"queryStringParameters": params}
+                context = {}
+                response = get(event, context)
+
+                self.assertEqual(response['statusCode'], 400)
+                self.assertIn('Bad Request', response['body'])
+            mock_client.tasks_dashboard.tasks.find.assert_not_called()
+
+    def test_all_flag_returns_unpaged_array(self):
+        with patch('handler.get_client') as mock_get_client:
+            mock_client = mock_get_client.return_value
+            mock_db = MagicMock()
+            mock_client.tasks_dashboard = mock_db
+
+            mock_collection = MagicMock()
+            mock_db.tasks = mock_collection
+
+            mock_collection.find.return_value = [
+                {"_id": "1", "title": "Task 1"}]
+
+            event = {"queryStringParameters": {"all": "true"}}
+            context = {}
+            response = get(event, context)
+
+            self.assertEqual(response['statusCode'], 200)
+            body = json.loads(response['body'])
+            self.assertEqual(body, [{"_id": "1", "title": "Task 1"}])
+            mock_collection.find.assert_called_once_with(
+                {}, None, batch_size=DEFAULT_BATCH_SIZE)
+
+    def test_filters_and_projection(self):
+        with patch('handler.get_client') as mock_get_client:
+            mock_client = mock_get_client.return_value
+            mock_db = MagicMock()
+            mock_client.tasks_dashboard = mock_db
+
+            mock_collection = MagicMock()
+            mock_db.tasks = mock_collection
+
+            mock_collection.find.return_value = [
+                {"_id": "1", "title": "Task 1", "status": "done"}]
+
+            event = {"queryStringParameters": {
+                "status": "done,in-review",
+                "priority": "high",
+                "fields": "title,status"
+            }}
+            context = {}
+            response = get(event, context)
+
+            self.assertEqual(response['statusCode'], 200)
+            mock_collection.find.assert_called_once_with(
+                {"status": {"$in": ["done", "in-review"]}, "priority": "high"},
+                {"title": 1, "status": 1},
+                sort=[('_id', 1)], limit=51, batch_size=51)
+
+    def test_invalid_filters_and_fields(self):
+        with patch('handler.get_client') as mock_get_client:
+            mock_client = mock_get_client.return_value
+            for params in [{"status": "pending"}, {"priority": "urgent"},
+                           {"status": ""}, {"fields": "title,owner"}]:
+                event = {"queryStringParameters": params}
+                context = {}
+                response = get(event, context)
+
+                self.assertEqual(response['statusCode'], 400)
+                self.assertIn('Bad Request', response['body'])
+            mock_client.tasks_dashboard.tasks.find.assert_not_called()
+
+    def test_cached_until_collection_version_changes(self):
+        with patch('handler.get_client') as mock_get_client:
+            mock_client = mock_get_client.return_value
+            mock_db = mock_client.tasks_dashboard
+            mock_db.meta.find_one.return_value = {"_id": "tasks",
+                                                  "version": 7}
+            mock_collection = mock_db.tasks
+            mock_collection.find.return_value = [
+                {"_id": "1", "title": "Task 1"}]
+
+            event = {"queryStringParameters": {"limit": "10"}}
+            context = {}
+            first = get(event, context)
+            second = get(event, context)
+
+            self.assertEqual(first['headers']['X-Cache'], 'MISS')
+            self.assertEqual(second['headers']['X-Cache'], 'HIT')
+            self.assertEqual(first['body'], second['body'])
+            self.assertEqual(mock_collection.find.call_count, 1)
+
+            mock_db.meta.find_one.return_value = {"_id": "tasks",
+                                                  "version": 8}
+            third = get(event, context)
+
+            self.assertEqual(third['headers']['X-Cache'], 'MISS')
+            self.assertEqual(mock_collection.find.call_count, 2)
+
+    def test_cache_is_keyed_by_query_parameters(self):
+        with patch('handler.get_client') as mock_get_client:
+            mock_client = mock_get_client.return_value
+            mock_db = mock_client.tasks_dashboard
+            mock_db.meta.find_one.return_value = None
+            mock_db.tasks.find.return_value = [{"_id": "1"}]
+
+            get({"queryStringParameters": {"status": "done"}}, {})
+            response = get({"queryStringParameters": {"status": "todo"}}, {})
+
+            self.assertEqual(response['headers']['X-Cache'], 'MISS')
+            self.assertEqual(mock_db.tasks.find.call_count, 2)
+
+    def test_etag_and_cache_control_headers(self):
+        with patch('handler.get_client') as mock_get_client:
+            mock_client = mock_get_client.return_value
+            mock_db = mock_client.tasks_dashboard
+            mock_db.meta.find_one.return_value = {"_id": "tasks",
+                                                  "version": 3}
+            mock_db.tasks.find.return_value = [{"_id": "1"}]
+
+            response = get({}, {})
+            other = get({"queryStringParameters": {"status": "done"}}, {})
+
+            self.assertEqual(response['statusCode'], 200)
+            self.assertTrue(response['headers']['ETag'].startswith('"c3-'))
+            self.assertNotEqual(response['headers']['ETag'],
+                                other['headers']['ETag'])
+            self.assertIn('max-age=', response['headers']['Cache-Control'])
+
+    def test_if_none_match_returns_304_without_reading_tasks(self):
+        with patch('handler.get_client') as mock_get_client:
+            mock_client = mock_get_client.return_value
+            mock_db = mock_client.tasks_dashboard
+            mock_db.meta.find_one.return_value = {"_id": "tasks",
+                                                  "version": 3}
+            mock_db.tasks.find.return_value = [{"_id": "1"}]
+            etag = get({}, {})['headers']['ETag']
+            response_cache.clear()
+
+            response = get({"headers": {"if-none-match": etag}}, {})
+
+            self.assertEqual(response['statusCode'], 304)
+            self.assertEqual(response['body'], '')
+            self.assertEqual(response['headers']['ETag'], etag)
+            self.assertEqual(mock_db.tasks.find.call_count, 1)
+
+            mock_db.meta.find_one.return_value = {"_id": "tasks",
+                                                  "version": 4}
+            response = get({"headers": {"if-none-match": etag}}, {})
+
+            self.assertEqual(response['statusCode'], 200)
+            self.assertNotEqual(response['headers']['ETag'], etag)
+
+    def test_round_trips_per_request(self):
+        with patch('handler.get_client') as mock_get_client:
+            mock_client = mock_get_client.return_value
+            mock_db = mock_client.tasks_dashboard
+            mock_db.meta.find_one.return_value = {"_id": "tasks",
+                                                  "version": 3}
+            mock_db.tasks.find.return_value = [{"_id": "1"}]
+            mock_db.tasks.find_one.return_value = {"_id": "1", "version": 1}
+
+            # Collection version and one page of tasks.
+            etag = get({}, {})['headers']['ETag']
+            self.assertRoundTripsAtMost(mock_client, 2)
+            for event in [{}, {"headers": {"if-none-match": etag}}]:
+                mock_client.reset_mock()
+                get(event, {})
+                self.assertRoundTripsAtMost(mock_client, 1)
+
+            mock_client.reset_mock()
+            get_one({"pathParameters": {"task_id": "1"}}, {})
+            self.assertRoundTripsAtMost(mock_client, 1)
+
     def test_client_not_initialized(self):
-        with patch('handler.client', None):
+        with patch('handler.get_client', return_value=None):
             event = {}
             context = {}
             response = get(event, context)
@@ -82,7 +315,8 @@ class TestGetHandler(unittest.TestCase):
             self.assertIn('Internal server error', response['body'])
 
     def test_database_error_during_query(self):
-        with patch('handler.client') as mock_client:
+        with patch('handler.get_client') as mock_get_client:
+            mock_client = mock_get_client.return_value
             mock_db = MagicMock()
             mock_client.tasks_dashboard = mock_db
 
@@ -102,5 +336,119 @@ class TestGetHandler(unittest.TestCase):
             self.assertIn('Internal server error', response['body'])
 
 
+    def test_large_response_is_compressed(self):
+        with patch('handler.get_client') as mock_get_client:
+            mock_client = mock_get_client.return_value
+            mock_collection = mock_client.tasks_dashboard.tasks
+            mock_collection.find.return_value = [
+                {"_id": str(i), "description": "Description " * 10}
+                for i in range(50)]
+
+            event = {"headers": {"accept-encoding": "gzip, deflate"}}
+            response = get(event, {})
+            plain = get({}, {})
+
+            self.assertEqual(response['statusCode'], 200)
+            self.assertTrue(response['isBase64Encoded'])
+            self.assertEqual(response['headers']['Content-Encoding'], 'gzip')
+            self.assertEqual(
+                gzip.decompress(base64.b64decode(response['body'])).decode(),
+                plain['body'])
+            self.assertNotIn('Content-Encoding', plain['headers'])
+            # Each content-coding is its own strong validator.
+            self.assertTrue(response['headers']['ETag'].endswith('-gzip"'))
+            self.assertNotEqual(response['headers']['ETag'],
+                                plain['headers']['ETag'])
+
+            event['headers']['if-none-match'] = plain['headers']['ETag']
+            self.assertEqual(get(event, {})['statusCode'], 200)
+            event['headers']['if-none-match'] = response['headers']['ETag']
+            not_modified = get(event, {})
+            self.assertEqual(not_modified['statusCode'], 304)
+            self.assertEqual(not_modified['headers']['Vary'],
+                             'Accept-Encoding')
+
+    def test_get_one(self):
+        with patch('handler.get_client') as mock_get_client:
+            mock_client = mock_get_client.return_value
+            mock_collection = mock_client.tasks_dashboard.tasks
+            mock_collection.find_one.return_value = {
+                "_id": "task-123", "title": "Task", "version": 2}
+
+            event = {"pathParameters": {"task_id": "task-123"}}
+            context = {}
+            response = get_one(event, context)
+
+            self.assertEqual(response['statusCode'], 200)
+            self.assertEqual(response['headers']['ETag'], '"2"')
+            self.assertEqual(json.loads(response['body'])['title'], "Task")
+            mock_collection.find_one.assert_called_once_with(
+                {"_id": "task-123"}, None)
+            mock_collection.find.assert_not_called()
+
+    def test_get_one_with_fields(self):
+        with patch('handler.get_client') as mock_get_client:
+            mock_client = mock_get_client.return_value
+            mock_collection = mock_client.tasks_dashboard.tasks
+            mock_collection.find_one.return_value = {
+                "_id": "task-123", "status": "done"}
+
+            event = {"pathParameters": {"task_id": "task-123"},
+                     "queryStringParameters": {"fields": "status"}}
+            context = {}
+            response = get_one(event, context)
+
+            self.assertEqual(response['statusCode'], 200)
+            self.assertEqual(response['headers']['ETag'], '"0"')
+            mock_collection.find_one.assert_called_once_with(
+                {"_id": "task-123"}, {"status": 1, "version": 1})
+
+    def test_get_one_not_found(self):
+        with patch('handler.get_client') as mock_get_client:
+            mock_client = mock_get_client.return_value
+            mock_client.tasks_dashboard.tasks.find_one.return_value = None
+
+            event = {"pathParameters": {"task_id": "missing"}}
+            context = {}
+            response = get_one(event, context)
+
+            self.assertEqual(response['statusCode'], 404)
+            self.assertIn('Task not found', response['body'])
+
+    def test_get_one_not_modified(self):
+        with patch('handler.get_client') as mock_get_client:
+            mock_client = mock_get_client.return_value
+            mock_client.tasks_dashboard.tasks.find_one.return_value = {
+                "_id": "task-123", "version": 2}
+
+            event = {"pathParameters": {"task_id": "task-123"},
+                     "headers": {"if-none-match": '"2"'}}
+            context = {}
+            response = get_one(event, context)
+
+            self.assertEqual(response['statusCode'], 304)
+            self.assertEqual(response['body'], '')
+            self.assertEqual(response['headers']['Vary'], 'Accept-Encoding')
+
+            event['headers']['accept-encoding'] = 'gzip'
+            self.assertEqual(get_one(event, context)['statusCode'], 200)
+            event['headers']['if-none-match'] = '"2-gzip"'
+            response = get_one(event, context)
+            self.assertEqual(response['statusCode'], 304)
+            self.assertEqual(response['headers']['ETag'], '"2-gzip"')
+
+    def test_get_one_invalid_fields(self):
+        with patch('handler.get_client') as mock_get_client:
+            mock_client = mock_get_client.return_value
+
+            event = {"pathParameters": {"task_id": "task-123"},
+                     "queryStringParameters": {"fields": "owner"}}
+            context = {}
+            response = get_one(event, context)
+
+            self.assertEqual(response['statusCode'], 400)
+            mock_client.tasks_dashboard.tasks.find_one.assert_not_called()
+
+
 if __name__ == '__main__':
     unittest.main()
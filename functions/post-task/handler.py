@@ -1,20 +1,21 @@
-import os
 import json
-import uuid
 import logging
-from pymongo import MongoClient
-from bson.json_util import dumps
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+from common.changes import bump_collection_version
+from common.db import get_client
+from common.etags import format_etag
+from common.idempotency import (DONE, claim_key, complete_key, find_key,
+                                fingerprint, idempotency_key, lease_expired,
+                                release_key, take_over_key)
+from common.ids import new_task_id, utc_timestamp
+from common.metrics import instrument, phase
+from common.validation import validate_task
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
-try:
-    client = MongoClient(host=os.environ.get('MONGO_HOST'))
-    client.admin.command('ping')
-    logger.info("MongoDB connection successful")
-except Exception as e:
-    logger.error(f"MongoDB connection error: {e}")
-    client = None
+MAX_BATCH_SIZE = 1000
+INSERT_CHUNK_SIZE = 500
 
 """
     POST /create - Create a new task
@@ -25,9 +26,19 @@ except Exception as e:
     - priority: number (required) - Task priority (high, medium, low)
     - status: string (required) - Task status (todo, in-progress, in-review, done, blocked)
 
+    Headers:
+    - Idempotency-Key: string (optional) - Unique per logical request,
+      1 to 255 characters. A retry with the same key and body gets the
+      first 201 response back, with Idempotent-Replayed: true, and creates
+      nothing. A retry after the first request's lease ran out without a
+      task being written creates the task instead (see
+      common.idempotency)
+
     Response Codes:
     - 201: Created successfully
-    - 400: Bad request (validation errors)
+    - 400: Bad request (validation errors or invalid Idempotency-Key)
+    - 409: A request with the same Idempotency-Key is still in progress
+    - 422: The Idempotency-Key was used with a different body
     - 500: Server error
 
     Returns:
@@ -35,8 +46,10 @@ except Exception as e:
 """
 
 
+@instrument
 def post(event, context):
     try:
+        client = get_client()
         if client is None:
             logger.error("MongoDB client is not initialized")
             return {
@@ -55,10 +68,146 @@ def post(event, context):
                 },
                 'body': json.dumps({'error': 'Bad Request'})
             }
-        payload = json.loads(event['body'])
-        valid_paylod = check_payload(payload)
-        if not valid_paylod:
-            logger.error("Invalid payload")
+        with phase('parse'):
+            payload = json.loads(event['body'])
+        with phase('validate'):
+            errors = validate_task(payload)
+            try:
+                key = idempotency_key(event)
+            except ValueError as e:
+                errors.append(str(e))
+        if errors:
+            logger.error(f"Invalid payload: {errors}")
+            return {
+                'statusCode': 400,
+                'headers': {
+                    'Content-Type': 'application/json',
+                },
+                'body': json.dumps({'error': 'Bad Request',
+                                    'details': errors})
+            }
+        db = client.tasks_dashboard
+        tasks = db.tasks
+        document = build_task(payload)
+        response = {
+            'statusCode': 201,
+            'headers': {
+                'Content-Type': 'application/json',
+                'ETag': format_etag(1)
+            },
+            'body': json.dumps({
+                'task_id': document['_id'],
+            })
+        }
+        lease = None
+        if key is not None:
+            request_fingerprint = fingerprint(event['body'])
+            with phase('db'):
+                record = find_key(db, key)
+                if record is None:
+                    lease = claim_key(db, key, request_fingerprint, response)
+                    if lease is None:
+                        # Claimed by a concurrent request since the read.
+                        record = find_key(db, key) or {}
+            if record is not None:
+                replayed = replay(db, key, record, request_fingerprint)
+                if replayed is not None:
+                    return replayed
+                with phase('db'):
+                    lease = take_over_key(db, key, record)
+                if lease is None:
+                    return in_progress(key)
+                # Create the task the stored response already announces.
+                response = record['response']
+                document['_id'] = json.loads(response['body'])['task_id']
+
+        try:
+            with phase('db'):
+                tasks.insert_one(document)
+        except DuplicateKeyError:
+            if key is None:
+                raise
+            # The other holder of this key's lease wrote the task after all.
+        except Exception:
+            if key is not None:
+                release_key(db, key, lease)
+            raise
+        try:
+            with phase('db'):
+                bump_collection_version(db)
+        except Exception as e:
+            # The task exists: failing now would let a retry create it again.
+            # Cached reads catch up through their TTL.
+            logger.error(f"Error bumping collection version: {str(e)}")
+        if key is not None:
+            with phase('db'):
+                complete_key(db, key)
+        return response
+    except Exception as e:
+        logger.error(f"Error creating task: {str(e)}")
+        return {
+            'statusCode': 500,
+            'headers': {
+                'Content-Type': 'application/json',
+            },
+            'body': json.dumps({'error': 'Internal server error'})
+        }
+
+
+"""
+    POST /create/batch - Create many tasks in one request
+
+    Request Body:
+    - array of task objects, each shaped like the POST /create body
+      (at most 1000 tasks)
+
+    Valid tasks are written with unordered insert_many calls of up to 500
+    documents; invalid tasks are skipped and do not block the others. A
+    chunk that fails outright, e.g. on a network error, marks its tasks
+    as failed and the others are still reported, so a client can retry
+    only the failed ones.
+
+    Response Codes:
+    - 201: Every task was created
+    - 207: Some tasks were created, see results
+    - 400: Bad request (body is not a non-empty array, too many tasks,
+      or no task is valid)
+    - 500: Server error
+
+    Returns:
+    - JSON response with status code, headers and body
+      {"inserted_count": int, "results": [{"index": int,
+       "task_id": string} or {"index": int, "error": string}]}
+"""
+
+
+@instrument
+def post_batch(event, context):
+    try:
+        client = get_client()
+        if client is None:
+            logger.error("MongoDB client is not initialized")
+            return {
+                'statusCode': 500,
+                'headers': {
+                    'Content-Type': 'application/json',
+                },
+                'body': json.dumps({'error': 'Internal server error'})
+            }
+        if "body" not in event:
+            logger.error("No body in the event")
+            return {
+                'statusCode': 400,
+                'headers': {
+                    'Content-Type': 'application/json',
+                },
+                'body': json.dumps({'error': 'Bad Request'})
+            }
+        with phase('parse'):
+            payload = json.loads(event['body'])
+        if (not isinstance(payload, list) or not payload
+                or len(payload) > MAX_BATCH_SIZE):
+            logger.error("Invalid batch payload")
             return {
                 'statusCode': 400,
                 'headers': {
@@ -66,27 +215,81 @@ def post(event, context):
                 },
                 'body': json.dumps({'error': 'Bad Request'})
             }
+
+        results = [None] * len(payload)
+        documents = []
+        positions = []
+        with phase('validate'):
+            for index, item in enumerate(payload):
+                errors = validate_task(item)
+                if errors:
+                    results[index] = {'index': index,
+                                      'error': 'Invalid task',
+                                      'details': errors}
+                    continue
+                documents.append(build_task(item))
+                positions.append(index)
+        if not documents:
+            logger.error("No valid task in batch")
+            return {
+                'statusCode': 400,
+                'headers': {
+                    'Content-Type': 'application/json',
+                },
+                'body': json.dumps({'error': 'Bad Request',
+                                    'results': results})
+            }
+
         db = client.tasks_dashboard
         tasks = db.tasks
-        task_id = tasks.insert_one({
-            "_id": str(uuid.uuid4()),
-            "title": payload["title"],
-            "description": payload["description"],
-            "priority": payload["priority"],
-            "status": payload["status"]
-        })
+        inserted_count = 0
+        chunk_error = None
+        for start in range(0, len(documents), INSERT_CHUNK_SIZE):
+            chunk = documents[start:start + INSERT_CHUNK_SIZE]
+            failed = set()
+            try:
+                with phase('db'):
+                    tasks.insert_many(chunk, ordered=False)
+            except BulkWriteError as e:
+                for error in e.details.get('writeErrors', []):
+                    logger.error(f"Error creating task: {error.get('errmsg')}")
+                    failed.add(error['index'])
+            except Exception as e:
+                logger.error(f"Error creating tasks: {str(e)}")
+                chunk_error = e
+                failed = set(range(len(chunk)))
+            for offset, document in enumerate(chunk):
+                index = positions[start + offset]
+                if offset in failed:
+                    results[index] = {'index': index,
+                                      'error': 'Failed to create task'}
+                else:
+                    results[index] = {'index': index,
+                                      'task_id': document['_id']}
+                    inserted_count += 1
+        if not inserted_count and chunk_error is not None:
+            raise chunk_error
+        if inserted_count:
+            try:
+                with phase('db'):
+                    bump_collection_version(db)
+            except Exception as e:
+                # Tasks were written: the results must still reach the
+                # client so it does not retry them.
+                logger.error(f"Error bumping collection version: {str(e)}")
 
         return {
-            'statusCode': 201,
+            'statusCode': 201 if inserted_count == len(payload) else 207,
             'headers': {
                 'Content-Type': 'application/json'
             },
             'body': json.dumps({
-                'task_id': dumps(task_id.inserted_id),
+                'inserted_count': inserted_count,
+                'results': results
             })
         }
     except Exception as e:
-        logger.error(f"Error creating task: {str(e)}")
+        logger.error(f"Error creating tasks: {str(e)}")
         return {
             'statusCode': 500,
             'headers': {
@@ -97,31 +300,88 @@ def post(event, context):
 
 
 """
-    Validates task data for creation
+    Answers a request whose Idempotency-Key was already claimed
+
+    A key left pending by a request that inserted its task but did not
+    get to mark the key done is completed here, so the retry still gets
+    the 201 back. A key left pending without a task is in progress until
+    its lease runs out; after that None is returned and the caller may
+    take the key over.
+
+    Args:
+        db (pymongo.database.Database): Tasks database
+        key (str): Idempotency key
+        record (dict): Stored key document
+        request_fingerprint (str): Fingerprint of this request's body
+
+    Returns:
+        dict|None - stored response, 409 or 422, None when the lease of
+        a pending key without a task has run out
+"""
+
+
+def replay(db, key, record, request_fingerprint):
+    if record.get('fingerprint', request_fingerprint) != request_fingerprint:
+        logger.error(f"Idempotency-Key reused with another body: {key}")
+        return {
+            'statusCode': 422,
+            'headers': {
+                'Content-Type': 'application/json',
+            },
+            'body': json.dumps({'error': 'Unprocessable Entity'})
+        }
+    response = record.get('response')
+    if record.get('status') != DONE:
+        created = None
+        if response is not None:
+            task_id = json.loads(response['body'])['task_id']
+            with phase('db'):
+                created = db.tasks.find_one({"_id": task_id}, {"_id": 1})
+                if created:
+                    complete_key(db, key)
+        if not created:
+            if response is not None and lease_expired(record):
+                return None
+            return in_progress(key)
+    return dict(response, headers=dict(response['headers'],
+                                       **{'Idempotent-Replayed': 'true'}))
+
+
+def in_progress(key):
+    logger.error(f"Idempotency-Key in progress: {key}")
+    return {
+        'statusCode': 409,
+        'headers': {
+            'Content-Type': 'application/json',
+            'Retry-After': '1',
+        },
+        'body': json.dumps({'error': 'Conflict'})
+    }
+
+
+"""
+    Builds the document stored for a validated task payload
+
+    The _id is a UUIDv7 (see common.ids) and created_at and updated_at
+    both start at the time of the insert.
 
     Args:
-        payload (dict): Task data to validate
+        payload (dict): Validated task data
 
     Returns:
-        boolean
+        dict
 """
 
 
-def check_payload(payload):
-    if not payload:
-        return False
-    required_fields = ["title", "description", "priority", "status"]
-    for field in required_fields:
-        if field not in payload:
-            return False
-    if len(payload["title"]) == 0:
-        return False
-    if len(payload["description"]) == 0:
-        return False
-    valid_priorities = ["low", "medium", "high"]
-    if payload["priority"] not in valid_priorities:
-        return False
-    valid_statuses = ["todo", "in-progress", "in-review", "done", "blocked"]
-    if payload["status"] not in valid_statuses:
-        return False
-    return True
+def build_task(payload):
+    now = utc_timestamp()
+    return {
+        "_id": new_task_id(),
+        "title": payload["title"],
+        "description": payload["description"],
+        "priority": payload["priority"],
+        "status": payload["status"],
+        "version": 1,
+        "created_at": now,
+        "updated_at": now
+    }
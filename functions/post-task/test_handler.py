@@ -2,20 +2,34 @@ import unittest
 from unittest.mock import patch, MagicMock
 import json
 import os
+import datetime
 import logging
 
 logging.disable(logging.CRITICAL)
 
 os.environ['MONGO_HOST'] = 'mongodb://mockhost:27017'
 
-with patch('pymongo.MongoClient') as mock_mongo:
-    mock_client = MagicMock()
-    mock_mongo.return_value = mock_client
+from handler import post, post_batch
+from common.idempotency import fingerprint
+from common.test_support import RoundTripAssertions
+from common.validation import check_payload
 
-    from handler import post, check_payload
+from pymongo.errors import BulkWriteError, DuplicateKeyError
 
+TASK = {"title": "Task", "description": "Description", "priority": "high",
+        "status": "todo"}
+EXPIRED = datetime.datetime(2024, 1, 1, 0, 0, 30)
+STORED_RESPONSE = {'statusCode': 201,
+                   'headers': {'Content-Type': 'application/json',
+                               'ETag': '"1"'},
+                   'body': json.dumps({'task_id': 'first-id'})}
 
-class TestPostHandler(unittest.TestCase):
+
+def keyed_event(key="retry-1", task=TASK):
+    return {"headers": {"idempotency-key": key}, "body": json.dumps(task)}
+
+
+class TestPostHandler(RoundTripAssertions, unittest.TestCase):
 
     @classmethod
     def setUpClass(cls):
@@ -83,11 +97,11 @@ class TestPostHandler(unittest.TestCase):
             "status": "todo"
         }
 
-        with patch('handler.client') as mock_client, \
-                patch('handler.uuid') as mock_uuid:
-
-            # Mock UUID generation
-            mock_uuid.uuid4.return_value = "mocked-uuid"
+        with patch('handler.get_client') as mock_get_client, \
+                patch('handler.new_task_id', return_value="mocked-uuid"), \
+                patch('handler.utc_timestamp',
+                      return_value="2024-01-01T00:00:00.000Z"):
+            mock_client = mock_get_client.return_value
 
             mock_db = MagicMock()
             mock_client.tasks_dashboard = mock_db
@@ -108,10 +122,22 @@ class TestPostHandler(unittest.TestCase):
             self.assertEqual(response['statusCode'], 201)
             self.assertEqual(response['headers']
                              ['Content-Type'], 'application/json')
-            self.assertIn('task_id', response['body'])
+            self.assertEqual(response['headers']['ETag'], '"1"')
+            # The id is a plain JSON string, not JSON encoded twice.
+            self.assertEqual(json.loads(response['body'])['task_id'],
+                             "mocked-uuid")
+            document = mock_collection.insert_one.call_args[0][0]
+            self.assertEqual(document['_id'], "mocked-uuid")
+            self.assertEqual(document['version'], 1)
+            self.assertEqual(document['created_at'],
+                             "2024-01-01T00:00:00.000Z")
+            self.assertEqual(document['updated_at'], document['created_at'])
+            mock_db.meta.update_one.assert_called_once_with(
+                {"_id": "tasks"}, {"$inc": {"version": 1}}, upsert=True)
 
     def test_missing_request_body(self):
-        with patch('handler.client') as mock_client:
+        with patch('handler.get_client') as mock_get_client:
+            mock_client = mock_get_client.return_value
             mock_db = MagicMock()
             mock_client.tasks_dashboard = mock_db
 
@@ -126,7 +152,8 @@ class TestPostHandler(unittest.TestCase):
             self.assertIn('Bad Request', response['body'])
 
     def test_invalid_payload(self):
-        with patch('handler.client') as mock_client:
+        with patch('handler.get_client') as mock_get_client:
+            mock_client = mock_get_client.return_value
             mock_db = MagicMock()
             mock_client.tasks_dashboard = mock_db
 
@@ -151,7 +178,7 @@ class TestPostHandler(unittest.TestCase):
             "status": "todo"
         }
 
-        with patch('handler.client', None):
+        with patch('handler.get_client', return_value=None):
             event = {
                 "body": json.dumps(payload)
             }
@@ -168,7 +195,8 @@ class TestPostHandler(unittest.TestCase):
             "status": "todo"
         }
 
-        with patch('handler.client') as mock_client:
+        with patch('handler.get_client') as mock_get_client:
+            mock_client = mock_get_client.return_value
             mock_db = MagicMock()
             mock_client.tasks_dashboard = mock_db
 
@@ -188,5 +216,354 @@ class TestPostHandler(unittest.TestCase):
             self.assertIn('Internal server error', response['body'])
 
 
+    def test_successful_post_batch(self):
+        payload = [
+            {"title": "Task 1", "description": "Description 1",
+             "priority": "high", "status": "todo"},
+            {"title": "Task 2", "description": "Description 2",
+             "priority": "low", "status": "done"}
+        ]
+
+        with patch('handler.get_client') as mock_get_client:
+            mock_client = mock_get_client.return_value
+            mock_collection = MagicMock()
+            mock_client.tasks_dashboard.tasks = mock_collection
+
+            event = {"body": json.dumps(payload)}
+            context = {}
+            response = post_batch(event, context)
+
+            self.assertEqual(response['statusCode'], 201)
+            body = json.loads(response['body'])
+            self.assertEqual(body['inserted_count'], 2)
+            documents = mock_collection.insert_many.call_args[0][0]
+            self.assertEqual([r['task_id'] for r in body['results']],
+                             [d['_id'] for d in documents])
+            self.assertFalse(
+                mock_collection.insert_many.call_args[1]['ordered'])
+
+    def test_post_batch_reports_invalid_and_failed_tasks(self):
+        valid = {"title": "Task", "description": "Description",
+                 "priority": "high", "status": "todo"}
+        payload = [valid, {"title": "Only Title"}, valid, "not-a-task"]
+
+        with patch('handler.get_client') as mock_get_client:
+            mock_client = mock_get_client.return_value
+            mock_collection = MagicMock()
+            mock_client.tasks_dashboard.tasks = mock_collection
+            mock_collection.insert_many.side_effect = BulkWriteError({
+                'writeErrors': [{'index': 1, 'errmsg': 'duplicate key'}]})
+
+            event = {"body": json.dumps(payload)}
+            context = {}
+            response = post_batch(event, context)
+
+            self.assertEqual(response['statusCode'], 207)
+            body = json.loads(response['body'])
+            self.assertEqual(body['inserted_count'], 1)
+            results = body['results']
+            self.assertIn('task_id', results[0])
+            self.assertEqual(results[1]['error'], 'Invalid task')
+            self.assertEqual(results[2]['error'], 'Failed to create task')
+            self.assertEqual(results[3]['error'], 'Invalid task')
+
+    def test_post_batch_is_chunked(self):
+        task = {"title": "Task", "description": "Description",
+                "priority": "high", "status": "todo"}
+
+        with patch('handler.get_client') as mock_get_client, \
+                patch('handler.INSERT_CHUNK_SIZE', 2):
+            mock_client = mock_get_client.return_value
+            mock_collection = MagicMock()
+            mock_client.tasks_dashboard.tasks = mock_collection
+
+            event = {"body": json.dumps([task] * 5)}
+            context = {}
+            response = post_batch(event, context)
+
+            self.assertEqual(response['statusCode'], 201)
+            self.assertEqual(
+                [len(call[0][0]) for call in
+                 mock_collection.insert_many.call_args_list], [2, 2, 1])
+
+    def test_post_batch_chunk_error_keeps_earlier_chunks(self):
+        task = {"title": "Task", "description": "Description",
+                "priority": "high", "status": "todo"}
+
+        with patch('handler.get_client') as mock_get_client, \
+                patch('handler.INSERT_CHUNK_SIZE', 2):
+            mock_db = mock_get_client.return_value.tasks_dashboard
+            mock_db.tasks.insert_many.side_effect = [
+                None, Exception("Network error"), None]
+
+            response = post_batch({"body": json.dumps([task] * 5)}, {})
+
+            self.assertEqual(response['statusCode'], 207)
+            body = json.loads(response['body'])
+            self.assertEqual(body['inserted_count'], 3)
+            self.assertEqual(
+                ['task_id' in result for result in body['results']],
+                [True, True, False, False, True])
+            self.assertEqual(body['results'][2]['error'],
+                             'Failed to create task')
+            # Cached listings must see the tasks that were written.
+            mock_db.meta.update_one.assert_called_once()
+
+    def test_post_batch_nothing_written(self):
+        task = {"title": "Task", "description": "Description",
+                "priority": "high", "status": "todo"}
+
+        with patch('handler.get_client') as mock_get_client:
+            mock_db = mock_get_client.return_value.tasks_dashboard
+            mock_db.tasks.insert_many.side_effect = Exception("Network error")
+
+            response = post_batch({"body": json.dumps([task] * 2)}, {})
+
+            self.assertEqual(response['statusCode'], 500)
+            mock_db.meta.update_one.assert_not_called()
+
+    def test_post_batch_bad_request(self):
+        with patch('handler.get_client') as mock_get_client:
+            mock_client = mock_get_client.return_value
+            for body in [json.dumps({"title": "Not a list"}), "[]",
+                         json.dumps([{"title": "Only Title"}])]:
+                event = {"body": body}
+                context = {}
+                response = post_batch(event, context)
+
+                self.assertEqual(response['statusCode'], 400)
+                self.assertIn('Bad Request', response['body'])
+            mock_client.tasks_dashboard.tasks.insert_many.assert_not_called()
+
+    def test_idempotency_key_is_claimed_and_completed(self):
+        with patch('handler.get_client') as mock_get_client, \
+                patch('handler.new_task_id', return_value="new-id"):
+            mock_client = mock_get_client.return_value
+            mock_db = mock_client.tasks_dashboard
+            mock_db.idempotency_keys.find_one.return_value = None
+
+            response = post(keyed_event(), {})
+
+            self.assertEqual(response['statusCode'], 201)
+            self.assertNotIn('Idempotent-Replayed', response['headers'])
+            claim = mock_db.idempotency_keys.insert_one.call_args[0][0]
+            self.assertEqual(claim['_id'], "retry-1")
+            self.assertEqual(claim['status'], "pending")
+            self.assertEqual(claim['fingerprint'],
+                             fingerprint(json.dumps(TASK)))
+            self.assertEqual(claim['response'], response)
+            mock_db.tasks.insert_one.assert_called_once()
+            mock_db.idempotency_keys.update_one.assert_called_once_with(
+                {"_id": "retry-1"}, {"$set": {"status": "done"}})
+
+    def test_retry_replays_stored_response(self):
+        with patch('handler.get_client') as mock_get_client:
+            mock_client = mock_get_client.return_value
+            mock_db = mock_client.tasks_dashboard
+            mock_db.idempotency_keys.find_one.return_value = {
+                "_id": "retry-1", "status": "done",
+                "fingerprint": fingerprint(json.dumps(TASK)),
+                "response": STORED_RESPONSE}
+
+            response = post(keyed_event(), {})
+
+            self.assertEqual(response['statusCode'], 201)
+            self.assertEqual(response['body'], STORED_RESPONSE['body'])
+            self.assertEqual(response['headers']['Idempotent-Replayed'],
+                             'true')
+            mock_db.tasks.insert_one.assert_not_called()
+            mock_db.meta.update_one.assert_not_called()
+            # One point read of the key.
+            self.assertRoundTripsAtMost(mock_client, 1)
+
+    def test_pending_key(self):
+        record = {"_id": "retry-1", "status": "pending",
+                  "fingerprint": fingerprint(json.dumps(TASK)),
+                  "response": STORED_RESPONSE}
+        with patch('handler.get_client') as mock_get_client:
+            mock_db = mock_get_client.return_value.tasks_dashboard
+            mock_db.idempotency_keys.find_one.return_value = record
+
+            # The first request has not inserted its task yet.
+            mock_db.tasks.find_one.return_value = None
+            response = post(keyed_event(), {})
+
+            self.assertEqual(response['statusCode'], 409)
+            self.assertEqual(response['headers']['Retry-After'], '1')
+            mock_db.idempotency_keys.update_one.assert_not_called()
+
+            # It inserted the task but did not mark the key done.
+            mock_db.tasks.find_one.return_value = {"_id": "first-id"}
+            response = post(keyed_event(), {})
+
+            self.assertEqual(response['statusCode'], 201)
+            self.assertEqual(response['headers']['Idempotent-Replayed'],
+                             'true')
+            mock_db.tasks.find_one.assert_called_with({"_id": "first-id"},
+                                                      {"_id": 1})
+            mock_db.idempotency_keys.update_one.assert_called_once_with(
+                {"_id": "retry-1"}, {"$set": {"status": "done"}})
+            mock_db.tasks.insert_one.assert_not_called()
+
+    def test_key_claimed_concurrently(self):
+        with patch('handler.get_client') as mock_get_client:
+            mock_db = mock_get_client.return_value.tasks_dashboard
+            mock_db.idempotency_keys.find_one.side_effect = [None, {
+                "_id": "retry-1", "status": "pending",
+                "fingerprint": fingerprint(json.dumps(TASK)),
+                "response": STORED_RESPONSE}]
+            mock_db.idempotency_keys.insert_one.side_effect = \
+                DuplicateKeyError("E11000")
+            mock_db.tasks.find_one.return_value = None
+
+            response = post(keyed_event(), {})
+
+            self.assertEqual(response['statusCode'], 409)
+            mock_db.tasks.insert_one.assert_not_called()
+
+    def test_key_reused_with_another_body(self):
+        with patch('handler.get_client') as mock_get_client:
+            mock_db = mock_get_client.return_value.tasks_dashboard
+            mock_db.idempotency_keys.find_one.return_value = {
+                "_id": "retry-1", "status": "done",
+                "fingerprint": fingerprint(json.dumps(TASK)),
+                "response": STORED_RESPONSE}
+
+            response = post(keyed_event(task=dict(TASK, title="Other")), {})
+
+            self.assertEqual(response['statusCode'], 422)
+            mock_db.tasks.insert_one.assert_not_called()
+
+    def test_invalid_idempotency_key(self):
+        with patch('handler.get_client') as mock_get_client:
+            mock_db = mock_get_client.return_value.tasks_dashboard
+            for key in ("", " ", "k" * 256):
+                response = post(keyed_event(key), {})
+
+                self.assertEqual(response['statusCode'], 400)
+                self.assertIn('Idempotency-Key',
+                              json.loads(response['body'])['details'][0])
+            mock_db.idempotency_keys.find_one.assert_not_called()
+
+    def test_failed_insert_releases_key(self):
+        with patch('handler.get_client') as mock_get_client:
+            mock_db = mock_get_client.return_value.tasks_dashboard
+            mock_db.idempotency_keys.find_one.return_value = None
+            mock_db.tasks.insert_one.side_effect = Exception("Database error")
+
+            response = post(keyed_event(), {})
+
+            self.assertEqual(response['statusCode'], 500)
+            claim = mock_db.idempotency_keys.insert_one.call_args[0][0]
+            # Only the lease this request holds is released.
+            mock_db.idempotency_keys.delete_one.assert_called_once_with(
+                {"_id": "retry-1", "status": "pending",
+                 "locked_until": claim['locked_until']})
+            mock_db.idempotency_keys.update_one.assert_not_called()
+
+    def test_expired_claim_is_taken_over(self):
+        record = {"_id": "retry-1", "status": "pending",
+                  "fingerprint": fingerprint(json.dumps(TASK)),
+                  "response": STORED_RESPONSE, "locked_until": EXPIRED}
+        with patch('handler.get_client') as mock_get_client:
+            mock_db = mock_get_client.return_value.tasks_dashboard
+            mock_db.idempotency_keys.find_one.return_value = record
+            mock_db.tasks.find_one.return_value = None
+            mock_db.idempotency_keys.update_one.return_value = MagicMock(
+                modified_count=1)
+
+            response = post(keyed_event(), {})
+
+            # The task announced by the stored response is created.
+            self.assertEqual(response, STORED_RESPONSE)
+            self.assertEqual(
+                mock_db.tasks.insert_one.call_args[0][0]['_id'], "first-id")
+            take_over, complete = \
+                mock_db.idempotency_keys.update_one.call_args_list
+            self.assertEqual(take_over[0][0], {
+                "_id": "retry-1", "status": "pending",
+                "locked_until": EXPIRED})
+            self.assertGreater(
+                take_over[0][1]['$set']['locked_until'],
+                datetime.datetime.now(datetime.timezone.utc))
+            self.assertEqual(complete[0], ({"_id": "retry-1"},
+                                           {"$set": {"status": "done"}}))
+
+    def test_expired_claim_taken_by_another_retry(self):
+        record = {"_id": "retry-1", "status": "pending",
+                  "fingerprint": fingerprint(json.dumps(TASK)),
+                  "response": STORED_RESPONSE, "locked_until": EXPIRED}
+        with patch('handler.get_client') as mock_get_client:
+            mock_db = mock_get_client.return_value.tasks_dashboard
+            mock_db.idempotency_keys.find_one.return_value = record
+            mock_db.tasks.find_one.return_value = None
+            mock_db.idempotency_keys.update_one.return_value = MagicMock(
+                modified_count=0)
+
+            response = post(keyed_event(), {})
+
+            self.assertEqual(response['statusCode'], 409)
+            mock_db.tasks.insert_one.assert_not_called()
+
+    def test_task_written_by_previous_lease_holder(self):
+        record = {"_id": "retry-1", "status": "pending",
+                  "fingerprint": fingerprint(json.dumps(TASK)),
+                  "response": STORED_RESPONSE, "locked_until": EXPIRED}
+        with patch('handler.get_client') as mock_get_client:
+            mock_db = mock_get_client.return_value.tasks_dashboard
+            mock_db.idempotency_keys.find_one.return_value = record
+            mock_db.tasks.find_one.return_value = None
+            mock_db.idempotency_keys.update_one.return_value = MagicMock(
+                modified_count=1)
+            mock_db.tasks.insert_one.side_effect = DuplicateKeyError(
+                "E11000")
+
+            response = post(keyed_event(), {})
+
+            self.assertEqual(response, STORED_RESPONSE)
+            mock_db.idempotency_keys.delete_one.assert_not_called()
+            mock_db.idempotency_keys.update_one.assert_called_with(
+                {"_id": "retry-1"}, {"$set": {"status": "done"}})
+
+    def test_failed_version_bump_keeps_key(self):
+        with patch('handler.get_client') as mock_get_client:
+            mock_db = mock_get_client.return_value.tasks_dashboard
+            mock_db.idempotency_keys.find_one.return_value = None
+            mock_db.meta.update_one.side_effect = Exception("Database error")
+
+            response = post(keyed_event(), {})
+
+            # The task was written, so a retry must replay, not insert.
+            self.assertEqual(response['statusCode'], 201)
+            mock_db.tasks.insert_one.assert_called_once()
+            mock_db.idempotency_keys.delete_one.assert_not_called()
+            mock_db.idempotency_keys.update_one.assert_called_once_with(
+                {"_id": "retry-1"}, {"$set": {"status": "done"}})
+
+    def test_round_trips_per_request(self):
+        task = {"title": "Task", "description": "Description",
+                "priority": "high", "status": "todo"}
+
+        with patch('handler.get_client') as mock_get_client, \
+                patch('handler.INSERT_CHUNK_SIZE', 2):
+            mock_client = mock_get_client.return_value
+
+            # Insert and collection version bump.
+            post({"body": json.dumps(task)}, {})
+            self.assertRoundTripsAtMost(mock_client, 2)
+
+            # Key read and claim, insert, bump, key marked done.
+            mock_client.reset_mock()
+            mock_client.tasks_dashboard.idempotency_keys.find_one \
+                .return_value = None
+            post(keyed_event(task=task), {})
+            self.assertRoundTripsAtMost(mock_client, 5)
+
+            # One insert_many per chunk plus the bump.
+            mock_client.reset_mock()
+            post_batch({"body": json.dumps([task] * 5)}, {})
+            self.assertRoundTripsAtMost(mock_client, 4)
+
+
 if __name__ == '__main__':
     unittest.main()
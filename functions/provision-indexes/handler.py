@@ -0,0 +1,60 @@
+import json
+import logging
+from common.db import get_client
+from common.indexes import ensure_indexes
+
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+"""
+    Provision indexes - one-off function, invoked after deploy
+
+    Event (all optional):
+    - dry_run: boolean - Report changes without applying them
+    - repair: boolean - Drop and recreate indexes that drifted from the spec
+
+    Response Codes:
+    - 200: Indexes match the spec (after any creation)
+    - 409: Drift detected and left unrepaired
+    - 500: Server error
+
+    Returns:
+    - JSON response with status code, headers and a per collection report
+      of created, unchanged, drifted, recreated and extra indexes
+"""
+
+
+def provision(event, context):
+    try:
+        client = get_client()
+        if client is None:
+            logger.error("MongoDB client is not initialized")
+            return {
+                'statusCode': 500,
+                'headers': {
+                    'Content-Type': 'application/json',
+                },
+                'body': json.dumps({'error': 'Internal server error'})
+            }
+        event = event or {}
+        report = ensure_indexes(client.tasks_dashboard,
+                                dry_run=bool(event.get('dry_run')),
+                                repair=bool(event.get('repair')))
+        logger.info(f"Index provisioning report: {json.dumps(report)}")
+        drifted = any(result['drifted'] for result in report.values())
+        return {
+            'statusCode': 409 if drifted else 200,
+            'headers': {
+                'Content-Type': 'application/json'
+            },
+            'body': json.dumps(report)
+        }
+    except Exception as e:
+        logger.error(f"Error provisioning indexes: {str(e)}")
+        return {
+            'statusCode': 500,
+            'headers': {
+                'Content-Type': 'application/json',
+            },
+            'body': json.dumps({'error': 'Internal server error'})
+        }
@@ -0,0 +1,210 @@
+import unittest
+from unittest.mock import patch, MagicMock
+import json
+import os
+import logging
+
+logging.disable(logging.CRITICAL)
+
+os.environ['MONGO_HOST'] = 'mongodb://mockhost:27017'
+
+from handler import provision
+
+
+def live_indexes(*specs):
+    info = {"_id_": {"v": 2, "key": [("_id", 1)]}}
+    for name, keys, *options in specs:
+        info[name] = dict({"v": 2, "key": keys}, **(options or [{}])[0])
+    return info
+
+
+def use_collections(mock_client, tasks, idempotency_keys=None):
+    if idempotency_keys is None:
+        idempotency_keys = MagicMock()
+        idempotency_keys.index_information.return_value = live_indexes(
+            TTL_INDEX)
+    collections = {"tasks": tasks, "idempotency_keys": idempotency_keys}
+    mock_client.tasks_dashboard.__getitem__.side_effect = \
+        collections.__getitem__
+
+
+CREATED_AT_INDEXES = (
+    ("created_at_-1", [("created_at", -1)]),
+    ("status_1_created_at_-1", [("status", 1), ("created_at", -1)]),
+)
+
+TTL_INDEX = ("created_at_1", [("created_at", 1)],
+             {"expireAfterSeconds": 86400})
+
+# The text index as index_information reports it.
+TEXT_INDEX = ("title_text_description_text",
+              [("_fts", "text"), ("_ftsx", 1)],
+              {"weights": {"title": 3, "description": 1},
+               "default_language": "english",
+               "language_override": "language", "textIndexVersion": 3})
+
+
+class TestProvisionHandler(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        logging.disable(logging.CRITICAL)
+
+    @classmethod
+    def tearDownClass(cls):
+        logging.disable(logging.NOTSET)
+
+    def test_creates_missing_indexes(self):
+        with patch('handler.get_client') as mock_get_client:
+            mock_client = mock_get_client.return_value
+            mock_collection = MagicMock()
+            use_collections(mock_client, mock_collection)
+            mock_collection.index_information.return_value = live_indexes(
+                ("status_1__id_1", [("status", 1), ("_id", 1)]))
+
+            response = provision({}, {})
+
+            self.assertEqual(response['statusCode'], 200)
+            report = json.loads(response['body'])['tasks']
+            self.assertEqual(report['unchanged'], ["status_1__id_1"])
+            self.assertEqual(report['created'], [
+                "priority_1__id_1", "status_1_priority_1__id_1",
+                "created_at_-1", "status_1_created_at_-1",
+                "title_text_description_text"])
+            created = mock_collection.create_indexes.call_args[0][0]
+            self.assertEqual([model.document['name'] for model in created],
+                             report['created'])
+
+    def test_is_idempotent(self):
+        with patch('handler.get_client') as mock_get_client:
+            mock_client = mock_get_client.return_value
+            mock_collection = MagicMock()
+            use_collections(mock_client, mock_collection)
+            mock_collection.index_information.return_value = live_indexes(
+                ("status_1__id_1", [("status", 1.0), ("_id", 1)]),
+                ("priority_1__id_1", [("priority", 1), ("_id", 1)]),
+                ("status_1_priority_1__id_1",
+                 [("status", 1), ("priority", 1), ("_id", 1)]),
+                *CREATED_AT_INDEXES,
+                TEXT_INDEX,
+                ("legacy_title", [("title", 1)]))
+
+            response = provision({}, {})
+
+            self.assertEqual(response['statusCode'], 200)
+            report = json.loads(response['body'])['tasks']
+            self.assertEqual(report['created'], [])
+            self.assertEqual(len(report['unchanged']), 6)
+            self.assertEqual(report['extra'], ["legacy_title"])
+            mock_collection.create_indexes.assert_not_called()
+
+    def test_reports_drift_without_repair(self):
+        with patch('handler.get_client') as mock_get_client:
+            mock_client = mock_get_client.return_value
+            mock_collection = MagicMock()
+            use_collections(mock_client, mock_collection)
+            mock_collection.index_information.return_value = live_indexes(
+                ("status_1__id_1", [("status", -1), ("_id", 1)]),
+                ("priority_1__id_1", [("priority", 1), ("_id", 1)]),
+                ("status_1_priority_1__id_1",
+                 [("status", 1), ("priority", 1), ("_id", 1)]),
+                *CREATED_AT_INDEXES,
+                TEXT_INDEX)
+
+            response = provision({}, {})
+
+            self.assertEqual(response['statusCode'], 409)
+            report = json.loads(response['body'])['tasks']
+            self.assertEqual(report['drifted'][0]['name'], "status_1__id_1")
+            mock_collection.drop_index.assert_not_called()
+            mock_collection.create_indexes.assert_not_called()
+
+    def test_repairs_drift(self):
+        with patch('handler.get_client') as mock_get_client:
+            mock_client = mock_get_client.return_value
+            mock_collection = MagicMock()
+            use_collections(mock_client, mock_collection)
+            mock_collection.index_information.return_value = live_indexes(
+                ("status_1__id_1", [("status", 1), ("_id", 1)]),
+                ("priority_1__id_1", [("priority", 1), ("_id", 1)]),
+                ("status_1_priority_1__id_1",
+                 [("status", 1), ("priority", 1)]),
+                *CREATED_AT_INDEXES,
+                TEXT_INDEX)
+
+            response = provision({"repair": True}, {})
+
+            self.assertEqual(response['statusCode'], 200)
+            report = json.loads(response['body'])['tasks']
+            self.assertEqual(report['recreated'],
+                             ["status_1_priority_1__id_1"])
+            mock_collection.drop_index.assert_called_once_with(
+                "status_1_priority_1__id_1")
+            mock_collection.create_indexes.assert_called_once()
+
+    def test_text_index_weight_drift(self):
+        name, keys, options = TEXT_INDEX
+        with patch('handler.get_client') as mock_get_client:
+            mock_client = mock_get_client.return_value
+            mock_collection = MagicMock()
+            use_collections(mock_client, mock_collection)
+            mock_collection.index_information.return_value = live_indexes(
+                ("status_1__id_1", [("status", 1), ("_id", 1)]),
+                ("priority_1__id_1", [("priority", 1), ("_id", 1)]),
+                ("status_1_priority_1__id_1",
+                 [("status", 1), ("priority", 1), ("_id", 1)]),
+                *CREATED_AT_INDEXES,
+                (name, keys, dict(options, weights={"title": 1,
+                                                    "description": 1})))
+
+            response = provision({}, {})
+
+            self.assertEqual(response['statusCode'], 409)
+            drifted = json.loads(response['body'])['tasks']['drifted']
+            self.assertEqual([d['name'] for d in drifted], [name])
+            self.assertEqual(drifted[0]['expected']['weights'],
+                             {"title": 3, "description": 1})
+
+    def test_dry_run_does_not_write(self):
+        with patch('handler.get_client') as mock_get_client:
+            mock_client = mock_get_client.return_value
+            mock_collection = MagicMock()
+            use_collections(mock_client, mock_collection)
+            mock_collection.index_information.return_value = live_indexes()
+
+            response = provision({"dry_run": True}, {})
+
+            self.assertEqual(response['statusCode'], 200)
+            report = json.loads(response['body'])['tasks']
+            self.assertEqual(len(report['created']), 6)
+            mock_collection.create_indexes.assert_not_called()
+
+    def test_ttl_index_for_idempotency_keys(self):
+        with patch('handler.get_client') as mock_get_client:
+            mock_client = mock_get_client.return_value
+            mock_collection = MagicMock()
+            keys_collection = MagicMock()
+            use_collections(mock_client, mock_collection, keys_collection)
+            mock_collection.index_information.return_value = live_indexes()
+            keys_collection.index_information.return_value = live_indexes(
+                (TTL_INDEX[0], TTL_INDEX[1], {"expireAfterSeconds": 60}))
+
+            response = provision({"repair": True}, {})
+
+            self.assertEqual(response['statusCode'], 200)
+            report = json.loads(response['body'])['idempotency_keys']
+            self.assertEqual(report['recreated'], ["created_at_1"])
+            created = keys_collection.create_indexes.call_args[0][0]
+            self.assertEqual(created[0].document['expireAfterSeconds'],
+                             86400)
+
+    def test_client_not_initialized(self):
+        with patch('handler.get_client', return_value=None):
+            response = provision({}, {})
+
+            self.assertEqual(response['statusCode'], 500)
+            self.assertIn('Internal server error', response['body'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,36 +1,77 @@
-import os
 import json
 import logging
-from pymongo import MongoClient
+from pymongo import ReturnDocument
+from common.changes import bump_collection_version
+from common.db import get_client
+from common.etags import format_etag, parse_if_match, version_condition
+from common.ids import utc_timestamp
+from common.metrics import instrument, phase
+from common.schema import TASK_FIELDS, build_filter, changed_fields_update
+from common.validation import check_fields, validate_task
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
-try:
-    client = MongoClient(host=os.environ.get('MONGO_HOST'))
-    client.admin.command('ping')
-    logger.info("MongoDB connection successful")
-except Exception as e:
-    logger.error(f"MongoDB connection error: {e}")
-    client = None
 
+"""
+    PUT /edit/{task_id} - Replace the fields of an existing task
+
+    Path Parameters:
+    - task_id: string (required) - ID of the task to update
+
+    Headers:
+    - If-Match: string (optional) - ETag of the version being edited; the
+      update only applies if the task is still at that version
+
+    Request Body (every field is required):
+    - title: string - Task title
+    - description: string - Task description
+    - priority: string - Task priority (high, medium, low)
+    - status: string - Task status (todo, in-review, in-progress, done, blocked)
+
+    Response Codes:
+    - 200: Updated successfully
+    - 400: Bad request, {"error": "Bad Request", "details": [...]}
+    - 404: Task not found
+    - 412: Task changed since the If-Match version
+    - 500: Server error
+
+    The update is a single find_one_and_update that also increments the
+    task version; the new version is returned in the ETag header.
 
+    Returns:
+    - JSON response with status code, headers and body
 """
-    PUT /edit/{task_id} - Update an existing task
+
+
+@instrument
+def put(event, context):
+    return update_task(event, partial=False)
+
+
+"""
+    PATCH /edit/{task_id} - Update some fields of an existing task
 
     Path Parameters:
     - task_id: string (required) - ID of the task to update
 
+    Headers:
+    - If-Match: string (optional) - ETag of the version being edited
+
     Request Body (at least one of these fields must be provided):
     - title: string - Task title
     - description: string - Task description
-    - priority: number - Task priority (high, medium, low)
+    - priority: string - Task priority (high, medium, low)
     - status: string - Task status (todo, in-review, in-progress, done, blocked)
 
+    Only the fields sent are validated and written, so the $set stays as
+    small as the change. Fields that are not task fields are rejected.
+
     Response Codes:
     - 200: Updated successfully
-    - 400: Bad request (validation errors)
+    - 400: Bad request, {"error": "Bad Request", "details": [...]}
     - 404: Task not found
+    - 412: Task changed since the If-Match version
     - 500: Server error
 
     Returns:
@@ -38,8 +79,26 @@ except Exception as e:
 """
 
 
-def put(event, context):
+@instrument
+def patch(event, context):
+    return update_task(event, partial=True)
+
+
+"""
+    Validates and applies a PUT or PATCH to one task
+
+    Args:
+        event (dict): API Gateway event
+        partial (bool): Apply the body as a partial update
+
+    Returns:
+        dict - JSON response with status code, headers and body
+"""
+
+
+def update_task(event, partial):
     try:
+        client = get_client()
         if client is None:
             logger.error("MongoDB client is not initialized")
             return {
@@ -58,44 +117,67 @@ def put(event, context):
                 },
                 'body': json.dumps({'error': 'Bad Request'})
             }
-        payload = json.loads(event['body'])
-        valid_paylod = check_payload(payload)
-        if not valid_paylod:
-            logger.error("Invalid payload")
+        with phase('parse'):
+            payload = json.loads(event['body'])
+        with phase('validate'):
+            errors = validate_task(payload, partial=partial)
+        if errors:
+            logger.error(f"Invalid payload: {errors}")
             return {
                 'statusCode': 400,
                 'headers': {
                     'Content-Type': 'application/json',
                 },
-                'body': json.dumps({'error': 'Bad Request'})
+                'body': json.dumps({'error': 'Bad Request',
+                                    'details': errors})
             }
 
         task_id = event['pathParameters']['task_id']
+        versions = parse_if_match(event)
         db = client.tasks_dashboard
         tasks = db.tasks
 
-        task = tasks.find_one({"_id": task_id})
+        query = {"_id": task_id}
+        if versions is not None:
+            query["version"] = version_condition(versions)
+        update_data = {key: value for key,
+                       value in payload.items() if key in TASK_FIELDS}
+        update_data["updated_at"] = utc_timestamp()
+        with phase('db'):
+            task = tasks.find_one_and_update(
+                query,
+                {"$set": update_data, "$inc": {"version": 1}},
+                projection={"version": 1},
+                return_document=ReturnDocument.AFTER
+            )
         if not task:
+            # Only a failed precondition needs a second look to tell a
+            # stale version apart from a missing task.
+            with phase('db'):
+                stale = versions is not None and \
+                    tasks.find_one({"_id": task_id}, {"_id": 1})
+            if stale:
+                return {
+                    "statusCode": 412,
+                    "headers": {"Content-Type": "application/json"},
+                    "body": json.dumps({"error": "Precondition failed"})
+                }
             return {
                 "statusCode": 404,
                 "headers": {"Content-Type": "application/json"},
                 "body": json.dumps({"error": "Task not found"})
             }
+        with phase('db'):
+            bump_collection_version(db)
 
-        valid_fields = ["title", "description", "priority", "status"]
-        update_data = {key: value for key,
-                       value in payload.items() if key in valid_fields}
-        result = tasks.update_one(
-            {"_id": task_id},
-            {"$set": update_data}
-        )
         return {
             'statusCode': 200,
             'headers': {
-                'Content-Type': 'application/json'
+                'Content-Type': 'application/json',
+                'ETag': format_etag(task['version'])
             },
             'body': json.dumps({
-                'modified_count': result.modified_count,
+                'modified_count': 1,
                 'task_id': task_id
             })
         }
@@ -111,21 +193,98 @@ def put(event, context):
         }
 
 
-def check_payload(payload):
-    if not payload:
-        return False
-    required_fields = ["title", "description", "priority", "status"]
-    for field in required_fields:
-        if field not in payload:
-            return False
-    if len(payload["title"]) == 0:
-        return False
-    if len(payload["description"]) == 0:
-        return False
-    valid_priorities = ["low", "medium", "high"]
-    if payload["priority"] not in valid_priorities:
-        return False
-    valid_statuses = ["todo", "in-progress", "in-review", "done", "blocked"]
-    if payload["status"] not in valid_statuses:
-        return False
-    return True
+"""
+    PUT /edit - Update every task matching a filter
+
+    Request Body:
+    - filter: object (required) - Non-empty filter on status and/or
+      priority, each a value or a list of values
+    - set: object (required) - Task fields to set, validated like PATCH
+      /edit/{task_id}
+
+    Tasks that already hold every value in set are matched but left as
+    they are, so their version and updated_at do not move (see
+    common.schema.changed_fields_update).
+
+    Response Codes:
+    - 200: Updated successfully
+    - 400: Bad request (validation errors)
+    - 500: Server error
+
+    Returns:
+    - JSON response with status code, headers and body
+      {"matched_count": int, "modified_count": int}
+"""
+
+
+@instrument
+def put_many(event, context):
+    try:
+        client = get_client()
+        if client is None:
+            logger.error("MongoDB client is not initialized")
+            return {
+                'statusCode': 500,
+                'headers': {
+                    'Content-Type': 'application/json',
+                },
+                'body': json.dumps({'error': 'Internal server error'})
+            }
+        if "body" not in event:
+            logger.error("No body in the event")
+            return {
+                'statusCode': 400,
+                'headers': {
+                    'Content-Type': 'application/json',
+                },
+                'body': json.dumps({'error': 'Bad Request'})
+            }
+        with phase('parse'):
+            payload = json.loads(event['body'])
+        try:
+            with phase('validate'):
+                if not isinstance(payload, dict):
+                    raise ValueError("body must be an object")
+                criteria = payload.get('filter')
+                if not isinstance(criteria, dict) or not criteria:
+                    raise ValueError("filter must be a non-empty object")
+                query = build_filter(criteria)
+                if not check_fields(payload.get('set')):
+                    raise ValueError("invalid set")
+        except ValueError as e:
+            logger.error(f"Invalid payload: {e}")
+            return {
+                'statusCode': 400,
+                'headers': {
+                    'Content-Type': 'application/json',
+                },
+                'body': json.dumps({'error': 'Bad Request'})
+            }
+
+        db = client.tasks_dashboard
+        tasks = db.tasks
+        with phase('db'):
+            result = tasks.update_many(
+                query, changed_fields_update(payload['set']))
+            if result.modified_count:
+                bump_collection_version(db)
+        return {
+            'statusCode': 200,
+            'headers': {
+                'Content-Type': 'application/json'
+            },
+            'body': json.dumps({
+                'matched_count': result.matched_count,
+                'modified_count': result.modified_count
+            })
+        }
+
+    except Exception as e:
+        logger.error(f"Error updating tasks: {str(e)}")
+        return {
+            'statusCode': 500,
+            'headers': {
+                'Content-Type': 'application/json',
+            },
+            'body': json.dumps({'error': 'Internal server error'})
+        }
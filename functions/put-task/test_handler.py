@@ -8,14 +8,15 @@ logging.disable(logging.CRITICAL)
 
 os.environ['MONGO_HOST'] = 'mongodb://mockhost:27017'
 
-with patch('pymongo.MongoClient') as mock_mongo:
-    mock_client = MagicMock()
-    mock_mongo.return_value = mock_client
+from handler import put, put_many, patch as patch_task
+from common.test_support import RoundTripAssertions
+from common.schema import changed_fields_update
+from common.validation import check_payload
 
-    from handler import put, check_payload
+NOW = "2024-01-01T00:00:00.000Z"
 
 
-class TestPutHandler(unittest.TestCase):
+class TestPutHandler(RoundTripAssertions, unittest.TestCase):
 
     @classmethod
     def setUpClass(cls):
@@ -79,25 +80,20 @@ class TestPutHandler(unittest.TestCase):
             "status": "in-progress"
         }
 
-        with patch('handler.client') as mock_client:
+        with patch('handler.get_client') as mock_get_client, \
+                patch('handler.utc_timestamp', return_value=NOW):
+            mock_client = mock_get_client.return_value
             mock_db = MagicMock()
             mock_client.tasks_dashboard = mock_db
 
             mock_collection = MagicMock()
             mock_db.tasks = mock_collection
 
-            mock_collection.find_one.return_value = {
+            mock_collection.find_one_and_update.return_value = {
                 "_id": "task-123",
-                "title": "Original Title",
-                "description": "Original Description",
-                "priority": "low",
-                "status": "todo"
+                "version": 2
             }
 
-            mock_update_result = MagicMock()
-            mock_update_result.modified_count = 1
-            mock_collection.update_one.return_value = mock_update_result
-
             event = {
                 "pathParameters": {"task_id": "task-123"},
                 "body": json.dumps(payload)
@@ -108,9 +104,17 @@ class TestPutHandler(unittest.TestCase):
             self.assertEqual(response['statusCode'], 200)
             self.assertEqual(response['headers']
                              ['Content-Type'], 'application/json')
+            self.assertEqual(response['headers']['ETag'], '"2"')
             response_body = json.loads(response['body'])
             self.assertEqual(response_body['modified_count'], 1)
             self.assertEqual(response_body['task_id'], "task-123")
+            query, update = \
+                mock_collection.find_one_and_update.call_args[0]
+            self.assertEqual(query, {"_id": "task-123"})
+            self.assertEqual(update, {"$set": dict(payload, updated_at=NOW),
+                                      "$inc": {"version": 1}})
+            mock_collection.find_one.assert_not_called()
+            mock_db.meta.update_one.assert_called_once()
 
     def test_task_not_found(self):
         payload = {
@@ -120,14 +124,15 @@ class TestPutHandler(unittest.TestCase):
             "status": "in-progress"
         }
 
-        with patch('handler.client') as mock_client:
+        with patch('handler.get_client') as mock_get_client:
+            mock_client = mock_get_client.return_value
             mock_db = MagicMock()
             mock_client.tasks_dashboard = mock_db
 
             mock_collection = MagicMock()
             mock_db.tasks = mock_collection
 
-            mock_collection.find_one.return_value = None
+            mock_collection.find_one_and_update.return_value = None
 
             event = {
                 "pathParameters": {"task_id": "non-existent-task"},
@@ -138,9 +143,70 @@ class TestPutHandler(unittest.TestCase):
 
             self.assertEqual(response['statusCode'], 404)
             self.assertIn('Task not found', response['body'])
+            mock_collection.find_one.assert_not_called()
+
+    def test_if_match_updates_matching_version(self):
+        payload = {
+            "title": "Updated Title",
+            "description": "Updated Description",
+            "priority": "medium",
+            "status": "in-progress"
+        }
+
+        with patch('handler.get_client') as mock_get_client:
+            mock_client = mock_get_client.return_value
+            mock_collection = MagicMock()
+            mock_client.tasks_dashboard.tasks = mock_collection
+
+            mock_collection.find_one_and_update.return_value = {
+                "_id": "task-123",
+                "version": 1
+            }
+
+            event = {
+                "pathParameters": {"task_id": "task-123"},
+                "headers": {"if-match": '"0"'},
+                "body": json.dumps(payload)
+            }
+            context = {}
+            response = put(event, context)
+
+            self.assertEqual(response['statusCode'], 200)
+            self.assertEqual(response['headers']['ETag'], '"1"')
+            query = mock_collection.find_one_and_update.call_args[0][0]
+            self.assertEqual(query, {"_id": "task-123",
+                                     "version": {"$in": [0, None]}})
+
+    def test_if_match_stale_version(self):
+        payload = {
+            "title": "Updated Title",
+            "description": "Updated Description",
+            "priority": "medium",
+            "status": "in-progress"
+        }
+
+        with patch('handler.get_client') as mock_get_client:
+            mock_client = mock_get_client.return_value
+            mock_collection = MagicMock()
+            mock_client.tasks_dashboard.tasks = mock_collection
+
+            mock_collection.find_one_and_update.return_value = None
+            mock_collection.find_one.return_value = {"_id": "task-123"}
+
+            event = {
+                "pathParameters": {"task_id": "task-123"},
+                "headers": {"if-match": '"4"'},
+                "body": json.dumps(payload)
+            }
+            context = {}
+            response = put(event, context)
+
+            self.assertEqual(response['statusCode'], 412)
+            self.assertIn('Precondition failed', response['body'])
 
     def test_missing_request_body(self):
-        with patch('handler.client') as mock_client:
+        with patch('handler.get_client') as mock_get_client:
+            mock_client = mock_get_client.return_value
             mock_db = MagicMock()
             mock_client.tasks_dashboard = mock_db
 
@@ -158,7 +224,8 @@ class TestPutHandler(unittest.TestCase):
             self.assertIn('Bad Request', response['body'])
 
     def test_invalid_payload(self):
-        with patch('handler.client') as mock_client:
+        with patch('handler.get_client') as mock_get_client:
+            mock_client = mock_get_client.return_value
             mock_db = MagicMock()
             mock_client.tasks_dashboard = mock_db
 
@@ -174,7 +241,67 @@ class TestPutHandler(unittest.TestCase):
             response = put(event, context)
 
             self.assertEqual(response['statusCode'], 400)
-            self.assertIn('Bad Request', response['body'])
+            body = json.loads(response['body'])
+            self.assertEqual(body['error'], 'Bad Request')
+            self.assertIn('status is required', body['details'])
+            mock_collection.find_one_and_update.assert_not_called()
+
+    def test_successful_patch(self):
+        with patch('handler.get_client') as mock_get_client, \
+                patch('handler.utc_timestamp', return_value=NOW):
+            mock_client = mock_get_client.return_value
+            mock_db = MagicMock()
+            mock_client.tasks_dashboard = mock_db
+
+            mock_collection = MagicMock()
+            mock_db.tasks = mock_collection
+
+            mock_collection.find_one_and_update.return_value = {
+                "_id": "task-123",
+                "version": 4
+            }
+
+            event = {
+                "pathParameters": {"task_id": "task-123"},
+                "headers": {"if-match": '"3"'},
+                "body": json.dumps({"status": "done"})
+            }
+            context = {}
+            response = patch_task(event, context)
+
+            self.assertEqual(response['statusCode'], 200)
+            self.assertEqual(response['headers']['ETag'], '"4"')
+            query, update = \
+                mock_collection.find_one_and_update.call_args[0]
+            self.assertEqual(query, {"_id": "task-123",
+                                     "version": {"$in": [3]}})
+            # Only the fields sent are written.
+            self.assertEqual(update, {"$set": {"status": "done",
+                                              "updated_at": NOW},
+                                      "$inc": {"version": 1}})
+            mock_db.meta.update_one.assert_called_once()
+
+    def test_patch_invalid_payload(self):
+        with patch('handler.get_client') as mock_get_client:
+            mock_client = mock_get_client.return_value
+            mock_collection = mock_client.tasks_dashboard.tasks
+
+            for body, details in [
+                    ({}, ["at least one task field is required"]),
+                    ({"status": "pending", "owner": "me"},
+                     ["status must be one of: blocked, done, in-progress, "
+                      "in-review, todo", "owner is not a task field"])]:
+                event = {
+                    "pathParameters": {"task_id": "task-123"},
+                    "body": json.dumps(body)
+                }
+                context = {}
+                response = patch_task(event, context)
+
+                self.assertEqual(response['statusCode'], 400)
+                self.assertEqual(json.loads(response['body'])['details'],
+                                 details)
+            mock_collection.find_one_and_update.assert_not_called()
 
     def test_client_not_initialized(self):
         payload = {
@@ -184,7 +311,7 @@ class TestPutHandler(unittest.TestCase):
             "status": "in-progress"
         }
 
-        with patch('handler.client', None):
+        with patch('handler.get_client', return_value=None):
             event = {
                 "pathParameters": {"task_id": "task-123"},
                 "body": json.dumps(payload)
@@ -203,7 +330,8 @@ class TestPutHandler(unittest.TestCase):
             "status": "in-progress"
         }
 
-        with patch('handler.client') as mock_client:
+        with patch('handler.get_client') as mock_get_client:
+            mock_client = mock_get_client.return_value
             mock_db = MagicMock()
             mock_client.tasks_dashboard = mock_db
 
@@ -218,7 +346,7 @@ class TestPutHandler(unittest.TestCase):
                 "status": "todo"
             }
 
-            mock_collection.update_one.side_effect = Exception(
+            mock_collection.find_one_and_update.side_effect = Exception(
                 "Database update error")
 
             event = {
@@ -232,5 +360,94 @@ class TestPutHandler(unittest.TestCase):
             self.assertIn('Internal server error', response['body'])
 
 
+    def test_successful_put_many(self):
+        with patch('handler.get_client') as mock_get_client, \
+                patch('common.schema.utc_timestamp', return_value=NOW):
+            mock_client = mock_get_client.return_value
+            mock_collection = MagicMock()
+            mock_client.tasks_dashboard.tasks = mock_collection
+
+            mock_update_result = MagicMock()
+            mock_update_result.matched_count = 3
+            mock_update_result.modified_count = 2
+            mock_collection.update_many.return_value = mock_update_result
+
+            event = {
+                "body": json.dumps({
+                    "filter": {"status": "in-review",
+                               "priority": ["high", "medium"]},
+                    "set": {"status": "done"}
+                })
+            }
+            context = {}
+            response = put_many(event, context)
+
+            self.assertEqual(response['statusCode'], 200)
+            response_body = json.loads(response['body'])
+            self.assertEqual(response_body['matched_count'], 3)
+            self.assertEqual(response_body['modified_count'], 2)
+            mock_collection.update_many.assert_called_once_with(
+                {"status": "in-review",
+                 "priority": {"$in": ["high", "medium"]}},
+                changed_fields_update({"status": "done"}))
+
+    def test_put_many_invalid_payload(self):
+        bodies = [
+            # Empty filter would update every task
+            {"filter": {}, "set": {"status": "done"}},
+            # Filter on a field that is not indexed
+            {"filter": {"title": "Task"}, "set": {"status": "done"}},
+            # Invalid filter value
+            {"filter": {"status": "pending"}, "set": {"status": "done"}},
+            # Invalid set value
+            {"filter": {"status": "todo"}, "set": {"status": "pending"}},
+            # Unknown set field
+            {"filter": {"status": "todo"}, "set": {"_id": "other"}},
+            # Missing set
+            {"filter": {"status": "todo"}},
+            ["not", "an", "object"]
+        ]
+
+        with patch('handler.get_client') as mock_get_client:
+            mock_client = mock_get_client.return_value
+            for body in bodies:
+                event = {"body": json.dumps(body)}
+                context = {}
+                response = put_many(event, context)
+
+                self.assertEqual(response['statusCode'], 400)
+                self.assertIn('Bad Request', response['body'])
+            mock_client.tasks_dashboard.tasks.update_many.assert_not_called()
+
+    def test_round_trips_per_request(self):
+        task = {"title": "Task", "description": "Description",
+                "priority": "high", "status": "todo"}
+
+        with patch('handler.get_client') as mock_get_client:
+            mock_client = mock_get_client.return_value
+            mock_collection = mock_client.tasks_dashboard.tasks
+            mock_collection.find_one_and_update.return_value = {
+                "_id": "task-123", "version": 2}
+            event = {"pathParameters": {"task_id": "task-123"},
+                     "headers": {"if-match": '"1"'}}
+
+            # No read before the write: the update and the version bump.
+            for handler, body in [(put, task), (patch_task, {"title": "T"})]:
+                mock_client.reset_mock()
+                handler(dict(event, body=json.dumps(body)), {})
+                self.assertRoundTripsAtMost(mock_client, 2)
+
+            # A stale If-Match costs one lookup and no bump.
+            mock_client.reset_mock()
+            mock_collection.find_one_and_update.return_value = None
+            put(dict(event, body=json.dumps(task)), {})
+            self.assertRoundTripsAtMost(mock_client, 2)
+
+            mock_client.reset_mock()
+            body = {"filter": {"status": "todo"}, "set": {"status": "done"}}
+            put_many({"body": json.dumps(body)}, {})
+            self.assertRoundTripsAtMost(mock_client, 2)
+
+
 if __name__ == '__main__':
     unittest.main()
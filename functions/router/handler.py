@@ -0,0 +1,109 @@
+import json
+import logging
+from importlib import import_module
+
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+"""
+    Route table: HTTP API route key to (handler module, function)
+
+    Modules are imported on first use, so a warm router container only
+    loads the handlers it has served and they all share one MongoClient.
+"""
+
+ROUTES = {
+    "GET /": ("get-task.handler", "get"),
+    "GET /task/{task_id}": ("get-task.handler", "get_one"),
+    "GET /stats": ("stats-task.handler", "stats"),
+    "GET /search": ("search-task.handler", "search"),
+    "GET /dashboard": ("dashboard-task.handler", "dashboard"),
+    "POST /create": ("post-task.handler", "post"),
+    "POST /create/batch": ("post-task.handler", "post_batch"),
+    "PUT /edit": ("put-task.handler", "put_many"),
+    "PUT /edit/{task_id}": ("put-task.handler", "put"),
+    "PATCH /edit/{task_id}": ("put-task.handler", "patch"),
+    "DELETE /delete/{task_id}": ("delete-task.handler", "delete"),
+    "POST /batch": ("batch-task.handler", "batch"),
+}
+
+"""
+    Router - single entry point serving every route from one function
+
+    Dispatches on the event routeKey when API Gateway matched a declared
+    route, or on method and path (filling pathParameters) when the event
+    came through a catch-all route such as $default.
+
+    Response Codes:
+    - 404: No route matches the request
+    - 500: Server error
+    - any code returned by the target handler
+
+    Returns:
+    - JSON response with status code, headers and body
+"""
+
+
+def route(event, context):
+    try:
+        route_key = event.get('routeKey')
+        if route_key not in ROUTES:
+            route_key, path_parameters = match_route(event)
+            if route_key is None:
+                return {
+                    'statusCode': 404,
+                    'headers': {
+                        'Content-Type': 'application/json',
+                    },
+                    'body': json.dumps({'error': 'Not Found'})
+                }
+            event = dict(event, routeKey=route_key,
+                         pathParameters=path_parameters or None)
+        module_name, function_name = ROUTES[route_key]
+        target = getattr(import_module(module_name), function_name)
+        return target(event, context)
+    except Exception as e:
+        logger.error(f"Error routing request: {str(e)}")
+        return {
+            'statusCode': 500,
+            'headers': {
+                'Content-Type': 'application/json',
+            },
+            'body': json.dumps({'error': 'Internal server error'})
+        }
+
+
+"""
+    Matches an event's method and path against the route templates
+
+    Args:
+        event (dict): API Gateway HTTP API (v2) event
+
+    Returns:
+        tuple (route_key, path_parameters) - (None, None) when no route
+        matches
+"""
+
+
+def match_route(event):
+    method = event.get('requestContext', {}).get('http', {}).get('method')
+    path = event.get('rawPath') or '/'
+    segments = path.rstrip('/').split('/')
+    for route_key in ROUTES:
+        route_method, template = route_key.split(' ', 1)
+        if route_method != method:
+            continue
+        template_segments = template.rstrip('/').split('/')
+        if len(template_segments) != len(segments):
+            continue
+        path_parameters = {}
+        for expected, actual in zip(template_segments, segments):
+            if expected.startswith('{') and expected.endswith('}'):
+                if not actual:
+                    break
+                path_parameters[expected[1:-1]] = actual
+            elif expected != actual:
+                break
+        else:
+            return route_key, path_parameters
+    return None, None
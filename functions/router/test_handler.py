@@ -0,0 +1,96 @@
+import unittest
+from unittest.mock import patch
+from importlib import import_module
+import os
+import logging
+
+logging.disable(logging.CRITICAL)
+
+os.environ['MONGO_HOST'] = 'mongodb://mockhost:27017'
+
+from handler import route, match_route, ROUTES
+
+
+def http_event(method, path, route_key=None):
+    event = {
+        "rawPath": path,
+        "requestContext": {"http": {"method": method, "path": path}}
+    }
+    if route_key is not None:
+        event["routeKey"] = route_key
+    return event
+
+
+class TestRouterHandler(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        logging.disable(logging.CRITICAL)
+
+    @classmethod
+    def tearDownClass(cls):
+        logging.disable(logging.NOTSET)
+
+    def test_every_route_resolves_to_a_handler(self):
+        for route_key, (module_name, function_name) in ROUTES.items():
+            module = import_module(module_name)
+            self.assertTrue(callable(getattr(module, function_name)),
+                            route_key)
+
+    def test_dispatches_on_route_key(self):
+        module = import_module("put-task.handler")
+        expected = {'statusCode': 200}
+        with patch.object(module, 'put', return_value=expected) as mock_put:
+            event = http_event("PUT", "/edit/task-123",
+                               route_key="PUT /edit/{task_id}")
+            event["pathParameters"] = {"task_id": "task-123"}
+            context = {}
+            response = route(event, context)
+
+            self.assertIs(response, expected)
+            mock_put.assert_called_once_with(event, context)
+
+    def test_catch_all_route_fills_path_parameters(self):
+        module = import_module("delete-task.handler")
+        with patch.object(module, 'delete',
+                          return_value={'statusCode': 200}) as mock_delete:
+            event = http_event("DELETE", "/delete/task-123",
+                               route_key="$default")
+            route(event, {})
+
+            routed_event = mock_delete.call_args[0][0]
+            self.assertEqual(routed_event['routeKey'],
+                             "DELETE /delete/{task_id}")
+            self.assertEqual(routed_event['pathParameters'],
+                             {"task_id": "task-123"})
+
+    def test_match_route(self):
+        self.assertEqual(match_route(http_event("GET", "/")), ("GET /", {}))
+        self.assertEqual(match_route(http_event("PUT", "/edit")),
+                         ("PUT /edit", {}))
+        self.assertEqual(match_route(http_event("POST", "/create/batch")),
+                         ("POST /create/batch", {}))
+        self.assertEqual(match_route(http_event("PATCH", "/edit/task-1")),
+                         ("PATCH /edit/{task_id}", {"task_id": "task-1"}))
+        self.assertEqual(match_route(http_event("GET", "/edit/task-1")),
+                         (None, None))
+        self.assertEqual(match_route(http_event("PUT", "/edit/")),
+                         ("PUT /edit", {}))
+
+    def test_unknown_route(self):
+        response = route(http_event("GET", "/unknown"), {})
+
+        self.assertEqual(response['statusCode'], 404)
+        self.assertIn('Not Found', response['body'])
+
+    def test_handler_error(self):
+        module = import_module("get-task.handler")
+        with patch.object(module, 'get', side_effect=Exception("boom")):
+            response = route(http_event("GET", "/", route_key="GET /"), {})
+
+            self.assertEqual(response['statusCode'], 500)
+            self.assertIn('Internal server error', response['body'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,151 @@
+import json
+import logging
+from common.compression import compress_response, negotiate_encoding
+from common.db import get_client
+from common.metrics import instrument, phase
+from common.schema import FILTER_FIELDS, build_filter
+from common.serializer import encode
+
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+DEFAULT_SEARCH_LIMIT = 20
+MAX_SEARCH_LIMIT = 100
+MAX_QUERY_LENGTH = 200
+
+# Hits leave out the description; the score is the text relevance.
+SEARCH_PROJECTION = {
+    "title": 1,
+    "priority": 1,
+    "status": 1,
+    "version": 1,
+    "score": {"$meta": "textScore"},
+}
+
+"""
+    GET /search - Find tasks by keyword in their title and description
+
+    Query Parameters:
+    - q: string (required) - Words to search for; "quoted phrases" and
+      -excluded words follow MongoDB $text syntax
+    - limit: integer (optional) - Hits to return, 1 to 100 (default 20)
+    - status: string (optional) - Comma separated statuses to match
+    - priority: string (optional) - Comma separated priorities to match
+
+    The query runs on the title_text_description_text index, with title
+    matches weighted three times higher than description matches. Hits
+    are sorted by relevance score and only the best limit of them are
+    kept while sorting, so cost follows the number of matching tasks
+    rather than the collection size. Hits do not include description.
+
+    Response Codes:
+    - 200: Success, returns {"tasks": [{..., "score": float}], "count": int}
+    - 400: Bad request (missing q, invalid limit or filter)
+    - 500: Server error
+
+    Returns:
+    - JSON response with status code, headers and body
+"""
+
+
+@instrument
+def search(event, context):
+    try:
+        client = get_client()
+        if client is None:
+            logger.error("MongoDB client is not initialized")
+            return {
+                'statusCode': 500,
+                'headers': {
+                    'Content-Type': 'application/json',
+                },
+                'body': json.dumps({'error': 'Internal server error'})
+            }
+
+        params = event.get('queryStringParameters') or {}
+        try:
+            with phase('validate'):
+                query = build_search_query(params)
+                limit = parse_limit(params.get('limit'))
+        except ValueError as e:
+            logger.error(f"Invalid query parameters: {e}")
+            return {
+                'statusCode': 400,
+                'headers': {
+                    'Content-Type': 'application/json',
+                },
+                'body': json.dumps({'error': 'Bad Request'})
+            }
+
+        tasks = client.tasks_dashboard.tasks
+        with phase('db'):
+            hits = list(tasks.find(
+                query, SEARCH_PROJECTION,
+                sort=[("score", {"$meta": "textScore"})],
+                limit=limit, batch_size=limit))
+        with phase('serialize'):
+            return compress_response({
+                'statusCode': 200,
+                'headers': {
+                    'Content-Type': 'application/json',
+                },
+                'body': encode({'tasks': hits, 'count': len(hits)})
+            }, negotiate_encoding(event))
+    except Exception as e:
+        logger.error(f"Error searching tasks: {str(e)}")
+        return {
+            'statusCode': 500,
+            'headers': {
+                'Content-Type': 'application/json',
+            },
+            'body': json.dumps({'error': 'Internal server error'})
+        }
+
+
+"""
+    Builds the $text query with the optional status and priority filter
+
+    Args:
+        params (dict): Query string parameters
+
+    Returns:
+        dict
+
+    Raises:
+        ValueError: when q is missing or too long, or the filter is invalid
+"""
+
+
+def build_search_query(params):
+    text = (params.get('q') or '').strip()
+    if not text:
+        raise ValueError("q is required")
+    if len(text) > MAX_QUERY_LENGTH:
+        raise ValueError(f"q is longer than {MAX_QUERY_LENGTH} characters")
+    query = build_filter({field: params[field].split(',')
+                          for field in FILTER_FIELDS if field in params})
+    query["$text"] = {"$search": text}
+    return query
+
+
+"""
+    Parses the limit query parameter
+
+    Args:
+        value (str|None): Raw query parameter
+
+    Returns:
+        int
+
+    Raises:
+        ValueError: when the value is not an integer in range
+"""
+
+
+def parse_limit(value):
+    if value is None:
+        return DEFAULT_SEARCH_LIMIT
+    limit = int(value)
+    if limit < 1 or limit > MAX_SEARCH_LIMIT:
+        raise ValueError(f"limit must be between 1 and {MAX_SEARCH_LIMIT}")
+    return limit
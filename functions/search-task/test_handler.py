@@ -0,0 +1,108 @@
+import unittest
+from unittest.mock import patch
+import json
+import os
+import logging
+
+logging.disable(logging.CRITICAL)
+
+os.environ['MONGO_HOST'] = 'mongodb://mockhost:27017'
+
+from handler import search, SEARCH_PROJECTION
+from common.test_support import RoundTripAssertions
+
+
+class TestSearchHandler(RoundTripAssertions, unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        logging.disable(logging.CRITICAL)
+
+    @classmethod
+    def tearDownClass(cls):
+        logging.disable(logging.NOTSET)
+
+    def test_successful_search(self):
+        with patch('handler.get_client') as mock_get_client:
+            mock_client = mock_get_client.return_value
+            mock_collection = mock_client.tasks_dashboard.tasks
+            mock_collection.find.return_value = [
+                {"_id": "1", "title": "Fix login", "priority": "high",
+                 "status": "todo", "version": 1, "score": 1.5}]
+
+            event = {"queryStringParameters": {"q": " login "}}
+            context = {}
+            response = search(event, context)
+
+            self.assertEqual(response['statusCode'], 200)
+            body = json.loads(response['body'])
+            self.assertEqual(body['count'], 1)
+            self.assertEqual(body['tasks'][0]['score'], 1.5)
+            query, projection = mock_collection.find.call_args[0]
+            self.assertEqual(query, {"$text": {"$search": "login"}})
+            self.assertEqual(projection, SEARCH_PROJECTION)
+            self.assertNotIn('description', projection)
+            kwargs = mock_collection.find.call_args[1]
+            self.assertEqual(kwargs['sort'],
+                             [("score", {"$meta": "textScore"})])
+            self.assertEqual(kwargs['limit'], 20)
+            self.assertRoundTripsAtMost(mock_client, 1)
+
+    def test_search_with_filter_and_limit(self):
+        with patch('handler.get_client') as mock_get_client:
+            mock_client = mock_get_client.return_value
+            mock_collection = mock_client.tasks_dashboard.tasks
+            mock_collection.find.return_value = []
+
+            event = {"queryStringParameters": {
+                "q": "report", "status": "todo,blocked", "priority": "high",
+                "limit": "5"}}
+            context = {}
+            response = search(event, context)
+
+            self.assertEqual(response['statusCode'], 200)
+            self.assertEqual(json.loads(response['body']),
+                             {"tasks": [], "count": 0})
+            query = mock_collection.find.call_args[0][0]
+            self.assertEqual(query, {
+                "status": {"$in": ["todo", "blocked"]},
+                "priority": "high",
+                "$text": {"$search": "report"}})
+            self.assertEqual(mock_collection.find.call_args[1]['limit'], 5)
+
+    def test_invalid_parameters(self):
+        with patch('handler.get_client') as mock_get_client:
+            mock_client = mock_get_client.return_value
+            for params in [None, {"q": "  "}, {"q": "x" * 201},
+                           {"q": "a", "limit": "0"},
+                           {"q": "a", "limit": "101"},
+                           {"q": "a", "status": "pending"}]:
+                event = {"queryStringParameters": params}
+                context = {}
+                response = search(event, context)
+
+                self.assertEqual(response['statusCode'], 400)
+                self.assertIn('Bad Request', response['body'])
+            mock_client.tasks_dashboard.tasks.find.assert_not_called()
+
+    def test_client_not_initialized(self):
+        with patch('handler.get_client', return_value=None):
+            response = search({"queryStringParameters": {"q": "a"}}, {})
+
+            self.assertEqual(response['statusCode'], 500)
+            self.assertIn('Internal server error', response['body'])
+
+    def test_database_error(self):
+        with patch('handler.get_client') as mock_get_client:
+            mock_client = mock_get_client.return_value
+            mock_client.tasks_dashboard.tasks.find.side_effect = Exception(
+                "text index required for $text query")
+
+            response = search({"queryStringParameters": {"q": "a"}}, {})
+
+            self.assertEqual(response['statusCode'], 500)
+            self.assertIn('Internal server error', response['body'])
+
+
+if __name__ == '__main__':
+    unittest.main()
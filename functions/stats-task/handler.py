@@ -0,0 +1,151 @@
+import os
+import json
+import time
+import logging
+from common.changes import get_marker, save_snapshot
+from common.db import get_client
+from common.etags import collection_etag, if_none_match
+from common.metrics import instrument, phase
+from common.stats import STATS_PIPELINE, STATS_TTL_SECONDS, tally_stats
+
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+CACHE_CONTROL = (f"public, max-age={os.environ.get('GET_MAX_AGE', '5')}, "
+                 "must-revalidate")
+
+"""
+    GET /stats - Task counts by status and priority
+
+    Query Parameters:
+    - breakdown: "false" (optional) - Only return the total, estimated
+      from collection metadata
+
+    The counts are stored on the collection version marker together with
+    the version they were computed at, so a call costs one point read of
+    the marker however many tasks there are. They are recomputed with one
+    index-backed $group aggregation after a write bumps the version, or
+    after STATS_TTL_SECONDS. The X-Cache header reports HIT or MISS.
+
+    The ETag covers the time the counts were computed as well as the
+    collection version, so counts recomputed after the TTL to pick up
+    writes made outside the API get a new ETag instead of a 304.
+
+    Headers:
+    - If-None-Match: string (optional) - ETag of a previous response
+
+    Response Codes:
+    - 200: Success, returns {"total": int, "status": {...},
+      "priority": {...}}, every status and priority included
+    - 304: Not modified since the If-None-Match ETag
+    - 400: Bad request (invalid breakdown)
+    - 500: Server error
+
+    Returns:
+    - JSON response with status code, headers and body
+"""
+
+
+@instrument
+def stats(event, context):
+    try:
+        client = get_client()
+        if client is None:
+            logger.error("MongoDB client is not initialized")
+            return {
+                'statusCode': 500,
+                'headers': {
+                    'Content-Type': 'application/json',
+                },
+                'body': json.dumps({'error': 'Internal server error'})
+            }
+
+        params = event.get('queryStringParameters') or {}
+        breakdown = params.get('breakdown', 'true')
+        if breakdown not in ('true', 'false'):
+            logger.error(f"Invalid breakdown: {breakdown}")
+            return {
+                'statusCode': 400,
+                'headers': {
+                    'Content-Type': 'application/json',
+                },
+                'body': json.dumps({'error': 'Bad Request'})
+            }
+
+        db = client.tasks_dashboard
+        if breakdown == 'false':
+            with phase('db'):
+                total = db.tasks.estimated_document_count()
+            return {
+                'statusCode': 200,
+                'headers': {
+                    'Content-Type': 'application/json',
+                    'Cache-Control': CACHE_CONTROL,
+                },
+                'body': json.dumps({'total': total})
+            }
+
+        with phase('db'):
+            marker = get_marker(db)
+        version = marker.get('version', 0)
+        counts = marker.get('stats')
+        if counts and counts.get('version') == version and \
+                time.time() - counts.get('computed_at', 0) < STATS_TTL_SECONDS:
+            cache_status = 'HIT'
+        else:
+            with phase('db'):
+                counts = compute_stats(db.tasks)
+                counts.update(version=version, computed_at=time.time())
+                save_snapshot(db, version, 'stats', counts)
+            cache_status = 'MISS'
+
+        etag = collection_etag(version, dict(
+            params, computed_at=counts['computed_at']))
+        if if_none_match(event, etag):
+            return {
+                'statusCode': 304,
+                'headers': {
+                    'ETag': etag,
+                    'Cache-Control': CACHE_CONTROL,
+                },
+                'body': ''
+            }
+
+        return {
+            'statusCode': 200,
+            'headers': {
+                'Content-Type': 'application/json',
+                'ETag': etag,
+                'Cache-Control': CACHE_CONTROL,
+                'X-Cache': cache_status,
+            },
+            'body': json.dumps({
+                'total': counts['total'],
+                'status': counts['status'],
+                'priority': counts['priority'],
+            })
+        }
+    except Exception as e:
+        logger.error(f"Error getting stats: {str(e)}")
+        return {
+            'statusCode': 500,
+            'headers': {
+                'Content-Type': 'application/json',
+            },
+            'body': json.dumps({'error': 'Internal server error'})
+        }
+
+
+"""
+    Counts tasks by status and priority with one aggregation
+
+    Args:
+        tasks (pymongo.collection.Collection): Tasks collection
+
+    Returns:
+        dict - {"total": int, "status": {...}, "priority": {...}}
+"""
+
+
+def compute_stats(tasks):
+    return tally_stats(tasks.aggregate(STATS_PIPELINE))
@@ -0,0 +1,181 @@
+import unittest
+from unittest.mock import patch
+import json
+import os
+import logging
+
+logging.disable(logging.CRITICAL)
+
+os.environ['MONGO_HOST'] = 'mongodb://mockhost:27017'
+
+from handler import stats, STATS_PIPELINE
+from common.test_support import RoundTripAssertions
+
+
+def stored_stats(version, computed_at):
+    return {
+        "total": 3,
+        "status": {"todo": 2, "done": 1},
+        "priority": {"high": 3},
+        "version": version,
+        "computed_at": computed_at,
+    }
+
+
+class TestStatsHandler(RoundTripAssertions, unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        logging.disable(logging.CRITICAL)
+
+    @classmethod
+    def tearDownClass(cls):
+        logging.disable(logging.NOTSET)
+
+    def test_stored_stats_cost_one_read(self):
+        with patch('handler.get_client') as mock_get_client, \
+                patch('handler.time.time', return_value=1000):
+            mock_client = mock_get_client.return_value
+            mock_db = mock_client.tasks_dashboard
+            mock_db.meta.find_one.return_value = {
+                "_id": "tasks", "version": 4,
+                "stats": stored_stats(4, 990)}
+
+            response = stats({}, {})
+
+            self.assertEqual(response['statusCode'], 200)
+            self.assertEqual(response['headers']['X-Cache'], 'HIT')
+            self.assertIn('ETag', response['headers'])
+            self.assertEqual(json.loads(response['body']), {
+                "total": 3, "status": {"todo": 2, "done": 1},
+                "priority": {"high": 3}})
+            mock_db.tasks.aggregate.assert_not_called()
+            self.assertRoundTripsAtMost(mock_client, 1)
+
+    def test_stats_are_recomputed_after_a_write(self):
+        with patch('handler.get_client') as mock_get_client, \
+                patch('handler.time.time', return_value=1000):
+            mock_client = mock_get_client.return_value
+            mock_db = mock_client.tasks_dashboard
+            mock_db.meta.find_one.return_value = {
+                "_id": "tasks", "version": 5,
+                "stats": stored_stats(4, 990)}
+            mock_db.tasks.aggregate.return_value = [
+                {"_id": {"status": "todo", "priority": "high"}, "count": 4},
+                {"_id": {"status": "done", "priority": "low"}, "count": 2},
+                {"_id": {"priority": "low"}, "count": 1},
+            ]
+
+            response = stats({}, {})
+
+            self.assertEqual(response['headers']['X-Cache'], 'MISS')
+            body = json.loads(response['body'])
+            self.assertEqual(body['total'], 7)
+            self.assertEqual(body['status'], {
+                "todo": 4, "in-progress": 0, "in-review": 0, "done": 2,
+                "blocked": 0})
+            self.assertEqual(body['priority'], {
+                "high": 4, "medium": 0, "low": 3})
+            mock_db.tasks.aggregate.assert_called_once_with(STATS_PIPELINE)
+            query, update = mock_db.meta.update_one.call_args[0]
+            self.assertEqual(query, {"_id": "tasks", "version": 5})
+            self.assertEqual(update['$set']['stats']['version'], 5)
+            self.assertRoundTripsAtMost(mock_client, 3)
+
+    def test_stats_expire(self):
+        with patch('handler.get_client') as mock_get_client, \
+                patch('handler.time.time', return_value=1000), \
+                patch('handler.STATS_TTL_SECONDS', 60):
+            mock_client = mock_get_client.return_value
+            mock_db = mock_client.tasks_dashboard
+            mock_db.meta.find_one.return_value = {
+                "_id": "tasks", "version": 4,
+                "stats": stored_stats(4, 900)}
+            mock_db.tasks.aggregate.return_value = []
+
+            response = stats({}, {})
+
+            self.assertEqual(response['headers']['X-Cache'], 'MISS')
+            self.assertEqual(json.loads(response['body'])['total'], 0)
+
+    def test_if_none_match_returns_304(self):
+        with patch('handler.get_client') as mock_get_client, \
+                patch('handler.time.time', return_value=1000):
+            mock_client = mock_get_client.return_value
+            mock_db = mock_client.tasks_dashboard
+            mock_db.meta.find_one.return_value = {
+                "_id": "tasks", "version": 2,
+                "stats": stored_stats(2, 990)}
+            etag = stats({}, {})['headers']['ETag']
+
+            response = stats({"headers": {"if-none-match": etag}}, {})
+
+            self.assertEqual(response['statusCode'], 304)
+            mock_db.tasks.aggregate.assert_not_called()
+
+    def test_expired_stats_are_not_304(self):
+        with patch('handler.get_client') as mock_get_client, \
+                patch('handler.STATS_TTL_SECONDS', 60):
+            mock_client = mock_get_client.return_value
+            mock_db = mock_client.tasks_dashboard
+            mock_db.meta.find_one.return_value = {
+                "_id": "tasks", "version": 2,
+                "stats": stored_stats(2, 990)}
+            with patch('handler.time.time', return_value=1000):
+                etag = stats({}, {})['headers']['ETag']
+
+            # No API write since, but the TTL ran out: tasks may have
+            # changed outside the API, so the counts are read again.
+            mock_db.tasks.aggregate.return_value = [
+                {"_id": {"status": "todo", "priority": "high"}, "count": 5}]
+            with patch('handler.time.time', return_value=1100):
+                response = stats({"headers": {"if-none-match": etag}}, {})
+
+            self.assertEqual(response['statusCode'], 200)
+            self.assertEqual(response['headers']['X-Cache'], 'MISS')
+            self.assertNotEqual(response['headers']['ETag'], etag)
+            self.assertEqual(json.loads(response['body'])['total'], 5)
+
+    def test_total_only_is_estimated(self):
+        with patch('handler.get_client') as mock_get_client:
+            mock_client = mock_get_client.return_value
+            mock_tasks = mock_client.tasks_dashboard.tasks
+            mock_tasks.estimated_document_count.return_value = 12345
+
+            response = stats(
+                {"queryStringParameters": {"breakdown": "false"}}, {})
+
+            self.assertEqual(response['statusCode'], 200)
+            self.assertEqual(json.loads(response['body']), {"total": 12345})
+            mock_client.tasks_dashboard.meta.find_one.assert_not_called()
+            self.assertRoundTripsAtMost(mock_client, 1)
+
+    def test_invalid_breakdown(self):
+        with patch('handler.get_client'):
+            response = stats(
+                {"queryStringParameters": {"breakdown": "yes"}}, {})
+
+            self.assertEqual(response['statusCode'], 400)
+            self.assertIn('Bad Request', response['body'])
+
+    def test_client_not_initialized(self):
+        with patch('handler.get_client', return_value=None):
+            response = stats({}, {})
+
+            self.assertEqual(response['statusCode'], 500)
+            self.assertIn('Internal server error', response['body'])
+
+    def test_database_error(self):
+        with patch('handler.get_client') as mock_get_client:
+            mock_client = mock_get_client.return_value
+            mock_client.tasks_dashboard.meta.find_one.side_effect = \
+                Exception("Database error")
+
+            response = stats({}, {})
+
+            self.assertEqual(response['statusCode'], 500)
+            self.assertIn('Internal server error', response['body'])
+
+
+if __name__ == '__main__':
+    unittest.main()